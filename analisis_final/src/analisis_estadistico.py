@@ -4,15 +4,30 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 
-class AnalisisUNO:
-    """Clase para realizar análisis estadístico del dataset UNO"""
+from . import bootstrap
+from .estadisticos import EstadisticosSuficientes
 
-    def __init__(self, df):
-        self.df = df
+class AnalisisUNO:
+    """Clase para realizar análisis estadístico del dataset UNO
+
+    Todos los resultados se derivan de EstadisticosSuficientes (conteos,
+    sumas y sumas de cuadrados por agente), no de las filas: se puede
+    construir con un DataFrame, con estadísticos ya acumulados (p. ej. de
+    un CSV leído por bloques) o con ambos, y actualizar con más partidas.
+    """
+
+    def __init__(self, df=None, estadisticos=None):
+        self.estadisticos = estadisticos if estadisticos is not None else EstadisticosSuficientes()
+        if df is not None:
+            self.estadisticos.actualizar(df)
         self.resultados = {}
 
-    def ejecutar_analisis_completo(self):
-        """Ejecuta todo el análisis estadístico"""
+    def actualizar(self, df):
+        """Añade un bloque de partidas (vuelve a ejecutar el análisis para ver el efecto)"""
+        self.estadisticos.actualizar(df)
+
+    def ejecutar_analisis_completo(self, seed=0, num_workers=1):
+        """Ejecuta todo el análisis estadístico (seed y num_workers son los del bootstrap)"""
         print("\nEJECUTANDO ANÁLISIS ESTADÍSTICO COMPLETO")
 
         # Análisis de victorias
@@ -33,6 +48,9 @@ class AnalisisUNO:
         # Análisis de eficiencia
         self.analizar_eficiencia()
 
+        # Intervalos de confianza bootstrap
+        self.intervalos_bootstrap(seed=seed, num_workers=num_workers)
+
         return self.resultados
 
     def analizar_victorias(self):
@@ -40,9 +58,13 @@ class AnalisisUNO:
         print("Analizando victorias...")
 
         # Calcular estadísticas de victorias
-        victorias_stats = self.df.groupby('agent_name')['wins'].agg([
-            'sum', 'count', 'mean', 'std'
-        ]).round(4)
+        agentes = self.estadisticos.agentes
+        victorias_stats = pd.DataFrame({
+            'sum': [agente.victorias for agente in agentes.values()],
+            'count': [agente.partidas for agente in agentes.values()],
+            'mean': [agente.tasa() for agente in agentes.values()],
+            'std': [np.sqrt(agente.varianza_victorias()) for agente in agentes.values()]
+        }, index=pd.Index(list(agentes), name='agent_name')).round(4)
 
         victorias_stats['tasa_victoria'] = victorias_stats['mean'] * 100
         victorias_stats['partidas'] = victorias_stats['count']
@@ -58,9 +80,8 @@ class AnalisisUNO:
         """Análisis de tiempos de ejecución"""
         print("⏱️ Analizando tiempos de ejecución...")
 
-        tiempo_stats = self.df.groupby('agent_name')['execution_time_ms'].agg([
-            'mean', 'std', 'min', 'max', 'median'
-        ]).round(6)  # Más decimales para tiempos pequeños
+        # Mediana aproximada (boceto de cuantiles, error relativo < 0.5%)
+        tiempo_stats = self.estadisticos.resumen_variable('tiempo').round(6)  # Más decimales para tiempos pequeños
 
         self.resultados['tiempo_stats'] = tiempo_stats
 
@@ -71,9 +92,7 @@ class AnalisisUNO:
         """Análisis de duración de partidas"""
         print("Analizando duración de partidas...")
 
-        turnos_stats = self.df.groupby('agent_name')['total_turns'].agg([
-            'mean', 'std', 'min', 'max', 'median'
-        ]).round(2)
+        turnos_stats = self.estadisticos.resumen_variable('turnos').round(2)
 
         self.resultados['turnos_stats'] = turnos_stats
 
@@ -84,12 +103,18 @@ class AnalisisUNO:
         """Realiza pruebas estadísticas"""
         print("Realizando pruebas estadísticas...")
 
-        # ANOVA para tiempos entre agentes
-        grupos_tiempos = [group['execution_time_ms'].values
-                         for name, group in self.df.groupby('agent_name')]
-
-        if len(grupos_tiempos) > 1:
-            f_stat, p_value = stats.f_oneway(*grupos_tiempos)
+        agentes = list(self.estadisticos.agentes.values())
+
+        # ANOVA para tiempos entre agentes: sumas de cuadrados entre y dentro de grupos
+        if len(agentes) > 1:
+            tiempos = [agente.tiempo for agente in agentes]
+            total = sum(t.n for t in tiempos)
+            media_global = sum(t.suma for t in tiempos) / total
+            ss_entre = sum(t.n * (t.media() - media_global) ** 2 for t in tiempos)
+            ss_dentro = sum(t.suma2 - t.suma ** 2 / t.n for t in tiempos)
+            gl_entre, gl_dentro = len(tiempos) - 1, total - len(tiempos)
+            f_stat = (ss_entre / gl_entre) / (ss_dentro / gl_dentro)
+            p_value = stats.f.sf(f_stat, gl_entre, gl_dentro)
             self.resultados['anova_tiempos'] = (f_stat, p_value)
 
             print(f"ANOVA tiempos: F={f_stat:.4f}, p={p_value:.4f}")
@@ -99,8 +124,10 @@ class AnalisisUNO:
             else:
                 print("  → Sin diferencia significativa en tiempos")
 
-        # Test chi-cuadrado para victorias
-        tabla_contingencia = pd.crosstab(self.df['agent_name'], self.df['wins'])
+        # Test chi-cuadrado para victorias (tabla agente x derrota/victoria)
+        tabla_contingencia = np.array([[agente.partidas - agente.victorias, agente.victorias]
+                                       for agente in agentes])
+        tabla_contingencia = tabla_contingencia[:, tabla_contingencia.sum(axis=0) > 0]
         chi2, p_chi, dof, expected = stats.chi2_contingency(tabla_contingencia)
 
         self.resultados['chi2_victorias'] = (chi2, p_chi)
@@ -116,25 +143,23 @@ class AnalisisUNO:
         """Análisis comparativo entre pares de agentes"""
         print("\nAnálisis comparativo entre agentes...")
 
-        agentes = self.df['agent_name'].unique()
+        agentes = self.estadisticos.nombres()
 
         comparaciones = []
         for i in range(len(agentes)):
             for j in range(i + 1, len(agentes)):
                 agente1, agente2 = agentes[i], agentes[j]
+                est1, est2 = self.estadisticos.agentes[agente1], self.estadisticos.agentes[agente2]
 
-                # Comparar victorias
-                wins1 = self.df[self.df['agent_name'] == agente1]['wins']
-                wins2 = self.df[self.df['agent_name'] == agente2]['wins']
-
-                # Test t para victorias
-                t_stat, p_value = stats.ttest_ind(wins1, wins2)
+                # Test t para victorias (desde medias y desviaciones)
+                t_stat, p_value = stats.ttest_ind_from_stats(
+                    est1.tasa(), np.sqrt(est1.varianza_victorias()), est1.partidas,
+                    est2.tasa(), np.sqrt(est2.varianza_victorias()), est2.partidas)
 
                 # Comparar tiempos
-                tiempo1 = self.df[self.df['agent_name'] == agente1]['execution_time_ms']
-                tiempo2 = self.df[self.df['agent_name'] == agente2]['execution_time_ms']
-                t_tiempo, p_tiempo = stats.ttest_ind(tiempo1, tiempo2)
-
+                t_tiempo, p_tiempo = stats.ttest_ind_from_stats(
+                    est1.tiempo.media(), np.sqrt(est1.tiempo.varianza()), est1.tiempo.n,
+                    est2.tiempo.media(), np.sqrt(est2.tiempo.varianza()), est2.tiempo.n)
                 comparacion = {
                     'agente1': agente1,
                     'agente2': agente2,
@@ -158,11 +183,12 @@ class AnalisisUNO:
         print("\nAnalizando eficiencia...")
 
         # Eficiencia = victorias / tiempo
-        eficiencia_stats = self.df.groupby('agent_name').agg({
-            'wins': 'mean',
-            'execution_time_ms': 'mean',
-            'total_turns': 'mean'
-        })
+        agentes = self.estadisticos.agentes
+        eficiencia_stats = pd.DataFrame({
+            'wins': [agente.tasa() for agente in agentes.values()],
+            'execution_time_ms': [agente.tiempo.media() for agente in agentes.values()],
+            'total_turns': [agente.turnos.media() for agente in agentes.values()]
+        }, index=pd.Index(list(agentes), name='agent_name'))
 
         eficiencia_stats['eficiencia_tiempo'] = eficiencia_stats['wins'] / eficiencia_stats['execution_time_ms']
         eficiencia_stats['eficiencia_turnos'] = eficiencia_stats['wins'] / eficiencia_stats['total_turns']
@@ -178,4 +204,26 @@ class AnalisisUNO:
         self.resultados['eficiencia_stats'] = eficiencia_stats
 
         print("=== MÉTRICAS DE EFICIENCIA ===")
-        print(eficiencia_stats[['eficiencia_tiempo_norm', 'eficiencia_turnos_norm']].round(2))
\ No newline at end of file
+        print(eficiencia_stats[['eficiencia_tiempo_norm', 'eficiencia_turnos_norm']].round(2))
+
+    def intervalos_bootstrap(self, num_remuestreos=2000, nivel=0.95, seed=0, tamano_lote=500,
+                             num_workers=1):
+        """IC bootstrap de tasa de victoria, turnos medios y percentiles de latencia
+
+        Por agente y para la diferencia entre cada par de agentes. Con la
+        misma seed el resultado es el mismo para cualquier num_workers.
+        """
+        print(f"\nCalculando intervalos bootstrap ({num_remuestreos} remuestreos)...")
+
+        distribucion = bootstrap.remuestrear(self.estadisticos, num_remuestreos, seed,
+                                             tamano_lote, num_workers)
+        por_agente, diferencias = bootstrap.intervalos(self.estadisticos, distribucion, nivel)
+
+        self.resultados['bootstrap_agentes'] = por_agente
+        self.resultados['bootstrap_diferencias'] = diferencias
+        self.resultados['bootstrap_nivel'] = nivel
+
+        print(f"=== INTERVALOS BOOTSTRAP ({nivel:.0%}) ===")
+        for _, fila in por_agente.iterrows():
+            print(f"  {fila['agente']} {fila['metrica']}: {fila['estimacion']:.4f} "
+                  f"[{fila['ic_inferior']:.4f}, {fila['ic_superior']:.4f}]")
@@ -0,0 +1,134 @@
+"""Intervalos de confianza bootstrap desde los estadísticos suficientes
+
+Remuestrear n filas con reemplazo solo cambia cuántas veces sale cada valor
+distinto, así que un remuestreo es una extracción multinomial sobre el
+histograma de la variable: el de turnos es exacto y el de tiempos es el del
+boceto de cuantiles (valores con error relativo < 0.5%). Las victorias son
+0/1, así que su remuestreo es binomial. Cada lote genera una matriz de
+conteos (remuestreos x valores) con NumPy, sin recorrer las filas, así que
+el coste no depende del tamaño del dataset.
+
+Los lotes usan semillas hijas de una SeedSequence: el resultado es el mismo
+con cualquier número de procesos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .estadisticos import BocetoCuantiles
+
+# Percentiles de la latencia por jugada con intervalo
+PERCENTILES_TIEMPO = (50, 95)
+
+
+def _histograma(variable):
+    """Valores distintos y sus conteos de una variable de EstadisticosAgente"""
+    cuantiles = variable.cuantiles
+    if isinstance(cuantiles, BocetoCuantiles):
+        indices = sorted(cuantiles.buckets)
+        valores = [0.0] + [2 * cuantiles.gamma ** i / (cuantiles.gamma + 1) for i in indices]
+        conteos = [cuantiles.ceros] + [cuantiles.buckets[i] for i in indices]
+    else:
+        valores = np.flatnonzero(cuantiles.conteos)
+        conteos = cuantiles.conteos[valores]
+    return np.asarray(valores, dtype=np.float64), np.asarray(conteos, dtype=np.int64)
+
+
+def _percentil_conteos(valores, conteos, q):
+    """Percentil q (0-100) de cada fila de una matriz de conteos, interpolando como pandas"""
+    n = conteos[0].sum()
+    rango = q / 100 * (n - 1)
+    abajo = int(np.floor(rango))
+    acumulado = np.cumsum(conteos, axis=1)
+    valor = valores[(acumulado > abajo).argmax(axis=1)]
+    if rango == abajo:
+        return valor
+    siguiente = valores[(acumulado > abajo + 1).argmax(axis=1)]
+    return valor + (rango - abajo) * (siguiente - valor)
+
+
+def _tablas(estadisticos):
+    """Lo que necesita cada lote: por agente, partidas, victorias e histogramas"""
+    return {nombre: (agente.partidas, agente.victorias, _histograma(agente.turnos),
+                     _histograma(agente.tiempo))
+            for nombre, agente in estadisticos.agentes.items()}
+
+
+def _remuestrear_lote(semilla, tamano, tablas):
+    """Métricas de tamano remuestreos de cada agente: {agente: {métrica: array}}"""
+    rng = np.random.default_rng(semilla)
+    resultado = {}
+    for nombre, (partidas, victorias, (v_turnos, c_turnos), (v_tiempo, c_tiempo)) in tablas.items():
+        metricas = {'tasa_victoria': rng.binomial(partidas, victorias / partidas, size=tamano)
+                    / partidas * 100}
+
+        conteos = rng.multinomial(c_turnos.sum(), c_turnos / c_turnos.sum(), size=tamano)
+        metricas['turnos_medios'] = conteos @ v_turnos / c_turnos.sum()
+
+        conteos = rng.multinomial(c_tiempo.sum(), c_tiempo / c_tiempo.sum(), size=tamano)
+        for q in PERCENTILES_TIEMPO:
+            metricas[f'tiempo_p{q}_ms'] = _percentil_conteos(v_tiempo, conteos, q)
+        resultado[nombre] = metricas
+    return resultado
+
+
+def remuestrear(estadisticos, num_remuestreos=2000, seed=0, tamano_lote=500, num_workers=1):
+    """Distribución bootstrap de cada métrica y agente: {agente: {métrica: array}}"""
+    tablas = _tablas(estadisticos)
+    tamanos = [min(tamano_lote, num_remuestreos - inicio)
+               for inicio in range(0, num_remuestreos, tamano_lote)]
+    semillas = np.random.SeedSequence(seed).spawn(len(tamanos))
+
+    if num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            lotes = list(executor.map(_remuestrear_lote, semillas, tamanos, [tablas] * len(tamanos)))
+    else:
+        lotes = [_remuestrear_lote(semilla, tamano, tablas) for semilla, tamano in zip(semillas, tamanos)]
+
+    return {nombre: {metrica: np.concatenate([lote[nombre][metrica] for lote in lotes])
+                     for metrica in lotes[0][nombre]}
+            for nombre in tablas}
+
+
+def _intervalo(muestras, nivel):
+    cola = (1 - nivel) / 2 * 100
+    return np.percentile(muestras, [cola, 100 - cola])
+
+
+def intervalos(estadisticos, distribucion, nivel=0.95):
+    """IC percentil de cada métrica por agente y de las diferencias entre cada par
+
+    Devuelve (por_agente, diferencias) como DataFrames con la estimación
+    puntual y los extremos del intervalo.
+    """
+    puntuales = {}
+    for nombre, agente in estadisticos.agentes.items():
+        puntuales[nombre] = {'tasa_victoria': agente.tasa() * 100,
+                             'turnos_medios': agente.turnos.media()}
+        for q in PERCENTILES_TIEMPO:
+            puntuales[nombre][f'tiempo_p{q}_ms'] = agente.tiempo.cuantiles.cuantil(q / 100)
+
+    filas = []
+    for nombre, metricas in distribucion.items():
+        for metrica, muestras in metricas.items():
+            inferior, superior = _intervalo(muestras, nivel)
+            filas.append({'agente': nombre, 'metrica': metrica, 'estimacion': puntuales[nombre][metrica],
+                          'ic_inferior': inferior, 'ic_superior': superior})
+    por_agente = pd.DataFrame(filas)
+
+    # Los remuestreos de agentes distintos son independientes: la diferencia
+    # remuestreo a remuestreo es una muestra bootstrap de la diferencia
+    filas = []
+    nombres = list(distribucion)
+    for i, agente1 in enumerate(nombres):
+        for agente2 in nombres[i + 1:]:
+            for metrica in distribucion[agente1]:
+                inferior, superior = _intervalo(distribucion[agente1][metrica]
+                                                - distribucion[agente2][metrica], nivel)
+                filas.append({'agente1': agente1, 'agente2': agente2, 'metrica': metrica,
+                              'diferencia': puntuales[agente1][metrica] - puntuales[agente2][metrica],
+                              'ic_inferior': inferior, 'ic_superior': superior,
+                              'significativo': not inferior <= 0 <= superior})
+    return por_agente, pd.DataFrame(filas)
@@ -1,34 +1,150 @@
 """Módulo para carga y exploración de datos"""
 
+import hashlib
+import os
+import time
+
 import pandas as pd
 import numpy as np
 
-def cargar_datos(ruta_archivo):
+# Columnas del CSV detallado y su nombre en el análisis; el resto (p. ej. las
+# columnas vacías del final de dataset_final/uno_agents_detailed.csv) se descarta
+COLUMNAS = {
+    'Agente': 'agent_name',
+    'Partida': 'game_id',
+    'Victoria': 'wins',
+    'Tiempo_Jugada_ms': 'execution_time_ms',
+    'Turnos_Totales': 'total_turns',
+    'Mesa': 'table_id',
+    'Asiento': 'seat'
+}
+
+# Tipos compactos, fijados al leer (sin pasar por int64/float64/object)
+TIPOS = {
+    'Agente': 'category',
+    'Partida': np.int32,
+    'Victoria': np.int8,
+    'Tiempo_Jugada_ms': np.float32,
+    'Turnos_Totales': np.uint16,
+    'Mesa': np.int16,
+    'Asiento': np.int8
+}
+
+# Cambiar si cambian COLUMNAS o TIPOS: invalida las cachés ya escritas
+VERSION_CACHE = 1
+
+
+def huella_archivo(ruta_archivo, bloque=1 << 20):
+    """SHA-256 del contenido de un archivo, leído por bloques"""
+    h = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as f:
+        for datos in iter(lambda: f.read(bloque), b''):
+            h.update(datos)
+    return h.hexdigest()
+
+
+def leer_por_bloques(ruta_archivo, chunksize=100000):
+    """Lee el CSV en bloques de chunksize filas (o entero si es None), ya con nombres y tipos"""
+    lector = pd.read_csv(ruta_archivo, usecols=lambda columna: columna in COLUMNAS,
+                         dtype=TIPOS, chunksize=chunksize)
+    for bloque in ([lector] if chunksize is None else lector):
+        yield bloque.rename(columns=COLUMNAS)
+
+
+def _unir_bloques(bloques):
+    """Concatena bloques manteniendo agent_name como categoría (con todas las de todos)"""
+    if not bloques:
+        return pd.DataFrame(columns=[COLUMNAS[c] for c in ('Agente', 'Partida', 'Victoria',
+                                                           'Tiempo_Jugada_ms', 'Turnos_Totales')])
+    categorias = pd.api.types.union_categoricals([b['agent_name'] for b in bloques],
+                                                    sort_categories=True).categories
+    for bloque in bloques:
+        bloque['agent_name'] = bloque['agent_name'].cat.set_categories(categorias)
+    return pd.concat(bloques, ignore_index=True)
+
+
+def _ruta_cache(ruta_archivo, huella, directorio_cache):
+    nombre = os.path.splitext(os.path.basename(ruta_archivo))[0]
+    return os.path.join(directorio_cache, f"{nombre}-v{VERSION_CACHE}-{huella[:16]}.npz")
+
+
+def guardar_cache(df, ruta):
+    """Guarda df por columnas en un .npz (las categorías como códigos + etiquetas)"""
+    os.makedirs(os.path.dirname(ruta) or '.', exist_ok=True)
+    arrays = {}
+    for columna in df.columns:
+        if isinstance(df[columna].dtype, pd.CategoricalDtype):
+            arrays[f"{columna}.codigos"] = df[columna].cat.codes.to_numpy()
+            arrays[f"{columna}.categorias"] = df[columna].cat.categories.to_numpy(dtype=str)
+        else:
+            arrays[columna] = df[columna].to_numpy()
+    temporal = ruta + '.tmp.npz'
+    np.savez(temporal, **arrays)
+    os.replace(temporal, ruta)
+
+
+def cargar_cache(ruta):
+    """Inverso de guardar_cache"""
+    columnas = {}
+    with np.load(ruta) as datos:
+        for clave in datos.files:
+            if clave.endswith('.categorias'):
+                continue
+            if clave.endswith('.codigos'):
+                columna = clave[:-len('.codigos')]
+                columnas[columna] = pd.Categorical.from_codes(datos[clave],
+                                                              datos[f"{columna}.categorias"])
+            else:
+                columnas[clave] = datos[clave]
+    return pd.DataFrame(columnas)
+
+
+def cargar_datos(ruta_archivo, chunksize=None, usar_cache=True, directorio_cache=None, huella=None):
     """
     Carga el dataset UNO desde un archivo CSV
 
+    Las columnas se leen con tipos compactos (TIPOS) y se descartan las que
+    no están en COLUMNAS. Con usar_cache el resultado se guarda en un .npz
+    columnar con clave el hash del CSV, y las siguientes cargas del mismo
+    archivo lo leen de ahí sin volver a parsear el texto.
+
     Parameters:
     ruta_archivo (str): Ruta al archivo CSV
+    chunksize (int): Si se indica, lee el CSV en bloques de ese número de filas
+    usar_cache (bool): Leer/escribir la caché binaria
+    directorio_cache (str): Carpeta de la caché (por defecto, .cache junto al CSV)
+    huella (str): Hash del CSV si ya se conoce (p. ej. el del manifiesto de runs)
 
     Returns:
     pandas.DataFrame: Dataset cargado
     """
     try:
-        df = pd.read_csv(ruta_archivo)
+        inicio = time.perf_counter()
+        origen = 'CSV'
+
+        ruta_cache = None
+        if usar_cache:
+            if directorio_cache is None:
+                directorio_cache = os.path.join(os.path.dirname(ruta_archivo), '.cache')
+            ruta_cache = _ruta_cache(ruta_archivo, huella or huella_archivo(ruta_archivo), directorio_cache)
 
-        # Renombrar columnas para consistencia
-        df = df.rename(columns={
-            'Agente': 'agent_name',
-            'Victoria': 'wins',
-            'Tiempo_Jugada_ms': 'execution_time_ms',
-            'Turnos_Totales': 'total_turns',
-            'Partida': 'game_id'
-        })
+        if ruta_cache is not None and os.path.exists(ruta_cache):
+            df = cargar_cache(ruta_cache)
+            origen = 'caché'
+        else:
+            df = _unir_bloques(list(leer_por_bloques(ruta_archivo, chunksize)))
+            if ruta_cache is not None:
+                guardar_cache(df, ruta_cache)
 
-        print(f"Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
-        print(f"Agentes encontrados: {df['agent_name'].unique()}")
+        segundos = time.perf_counter() - inicio
+        memoria_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas "
+              f"(desde {origen} en {segundos:.3f} s, {memoria_mb:.2f} MB en memoria)")
+        print(f"Agentes encontrados: {df['agent_name'].unique().tolist()}")
 
         return df
+    except FileNotFoundError:
+        raise
     except Exception as e:
         raise Exception(f"Error cargando datos: {e}")
 
@@ -62,5 +178,5 @@ def explorar_datos(df):
 
     # Estadísticas adicionales por agente
     print("\n=== VICTORIAS POR AGENTE ===")
-    victorias_por_agente = df.groupby('agent_name')['wins'].sum()
+    victorias_por_agente = df.groupby('agent_name', observed=True)['wins'].sum()
     print(victorias_por_agente)
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""Estadísticos suficientes por agente, fusionables y actualizables por bloques
+
+Todo lo que necesita AnalisisUNO (tasas, medias, desviaciones, mínimos,
+máximos, medianas, ANOVA, chi-cuadrado, pruebas t y eficiencia) se deriva
+de conteos, sumas y sumas de cuadrados por agente, más un boceto de
+cuantiles para las medianas. Se acumulan bloque a bloque en una sola pasada
+y dos resúmenes se fusionan sumando, así que el análisis funciona con
+datasets que no caben en memoria y se actualiza a medida que llegan partidas.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class BocetoCuantiles:
+    """Cuantiles aproximados de valores >= 0 con error relativo <= precision
+
+    Buckets logarítmicos de razón gamma = (1 + precision) / (1 - precision);
+    los ceros van aparte. Se fusiona sumando los conteos de cada bucket.
+    """
+
+    def __init__(self, precision=0.005):
+        self.gamma = (1 + precision) / (1 - precision)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.ceros = 0
+        self.count = 0
+
+    def agregar(self, valores):
+        valores = np.asarray(valores, dtype=np.float64)
+        positivos = valores[valores > 0]
+        self.ceros += len(valores) - len(positivos)
+        self.count += len(valores)
+        indices, conteos = np.unique(np.ceil(np.log(positivos) / self.log_gamma).astype(np.int64),
+                                     return_counts=True)
+        for indice, n in zip(indices.tolist(), conteos.tolist()):
+            self.buckets[indice] = self.buckets.get(indice, 0) + n
+
+    def fusionar(self, otro):
+        self.ceros += otro.ceros
+        self.count += otro.count
+        for indice, n in otro.buckets.items():
+            self.buckets[indice] = self.buckets.get(indice, 0) + n
+
+    def _valor(self, rango):
+        """Valor aproximado del estadístico de orden rango (desde 0)"""
+        if rango < self.ceros:
+            return 0.0
+        acumulado = self.ceros
+        for indice in sorted(self.buckets):
+            acumulado += self.buckets[indice]
+            if acumulado > rango:
+                return 2 * self.gamma ** indice / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def cuantil(self, q):
+        """Cuantil q (0-1), interpolando entre estadísticos de orden como pandas"""
+        if self.count == 0:
+            return np.nan
+        rango = q * (self.count - 1)
+        abajo = math.floor(rango)
+        fraccion = rango - abajo
+        valor = self._valor(abajo)
+        return valor if fraccion == 0 else valor + fraccion * (self._valor(abajo + 1) - valor)
+
+
+class HistogramaEnteros:
+    """Conteo exacto de valores enteros >= 0 (turnos): cuantiles exactos y fusionables"""
+
+    def __init__(self):
+        self.conteos = np.zeros(0, dtype=np.int64)
+        self.count = 0
+
+    def agregar(self, valores):
+        nuevos = np.bincount(np.asarray(valores, dtype=np.int64))
+        self._sumar(nuevos)
+        self.count += len(valores)
+
+    def fusionar(self, otro):
+        self._sumar(otro.conteos)
+        self.count += otro.count
+
+    def _sumar(self, conteos):
+        if len(conteos) > len(self.conteos):
+            self.conteos = np.pad(self.conteos, (0, len(conteos) - len(self.conteos)))
+        self.conteos[:len(conteos)] += conteos
+
+    def cuantil(self, q):
+        if self.count == 0:
+            return np.nan
+        acumulado = np.cumsum(self.conteos)
+        rango = q * (self.count - 1)
+        abajo = math.floor(rango)
+        valor = np.searchsorted(acumulado, abajo, side='right')
+        siguiente = np.searchsorted(acumulado, abajo + 1, side='right')
+        return float(valor + (rango - abajo) * (siguiente - valor))
+
+
+class _Variable:
+    """Conteo, suma, suma de cuadrados, extremos y cuantiles de una variable"""
+
+    def __init__(self, cuantiles):
+        self.n = 0
+        self.suma = 0.0
+        self.suma2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.cuantiles = cuantiles
+
+    def agregar(self, valores):
+        if len(valores) == 0:
+            return
+        valores = np.asarray(valores, dtype=np.float64)
+        self.n += len(valores)
+        self.suma += float(valores.sum())
+        self.suma2 += float(np.dot(valores, valores))
+        self.min = min(self.min, float(valores.min()))
+        self.max = max(self.max, float(valores.max()))
+        self.cuantiles.agregar(valores)
+
+    def fusionar(self, otra):
+        self.n += otra.n
+        self.suma += otra.suma
+        self.suma2 += otra.suma2
+        self.min = min(self.min, otra.min)
+        self.max = max(self.max, otra.max)
+        self.cuantiles.fusionar(otra.cuantiles)
+
+    def media(self):
+        return self.suma / self.n if self.n else np.nan
+
+    def varianza(self):
+        """Varianza muestral (ddof=1, como pandas)"""
+        if self.n < 2:
+            return np.nan
+        return max((self.suma2 - self.suma ** 2 / self.n) / (self.n - 1), 0.0)
+
+    def resumen(self):
+        return {
+            'mean': self.media(),
+            'std': math.sqrt(self.varianza()),
+            'min': self.min,
+            'max': self.max,
+            'median': self.cuantiles.cuantil(0.5)
+        }
+
+
+class EstadisticosAgente:
+    """Estadísticos de las partidas de un agente"""
+
+    def __init__(self):
+        self.partidas = 0
+        self.victorias = 0
+        self.tiempo = _Variable(BocetoCuantiles())
+        self.turnos = _Variable(HistogramaEnteros())
+
+    def fusionar(self, otro):
+        self.partidas += otro.partidas
+        self.victorias += otro.victorias
+        self.tiempo.fusionar(otro.tiempo)
+        self.turnos.fusionar(otro.turnos)
+
+    def tasa(self):
+        return self.victorias / self.partidas if self.partidas else np.nan
+
+    def varianza_victorias(self):
+        """Varianza muestral de la columna wins (0/1)"""
+        n = self.partidas
+        if n < 2:
+            return np.nan
+        p = self.tasa()
+        return p * (1 - p) * n / (n - 1)
+
+
+class EstadisticosSuficientes:
+    """EstadisticosAgente de cada agente, en orden alfabético de nombre"""
+
+    def __init__(self):
+        self.agentes = {}
+
+    def actualizar(self, df):
+        """Acumula un bloque de filas (columnas del análisis) en una pasada por columna"""
+        if len(df) == 0:
+            return self
+        nombres = df['agent_name'].astype('category')
+        codigos = nombres.cat.codes.to_numpy()
+        orden = np.argsort(codigos, kind='stable')
+        limites = np.searchsorted(codigos[orden], np.arange(len(nombres.cat.categories) + 1))
+
+        victorias = np.bincount(codigos, weights=df['wins'].to_numpy(dtype=np.float64),
+                                minlength=len(nombres.cat.categories))
+        tiempos = df['execution_time_ms'].to_numpy()[orden]
+        turnos = df['total_turns'].to_numpy()[orden]
+
+        for codigo, nombre in enumerate(nombres.cat.categories):
+            inicio, fin = limites[codigo], limites[codigo + 1]
+            if inicio == fin:
+                continue
+            agente = self.agentes.setdefault(str(nombre), EstadisticosAgente())
+            agente.partidas += int(fin - inicio)
+            agente.victorias += int(victorias[codigo])
+            agente.tiempo.agregar(tiempos[inicio:fin])
+            agente.turnos.agregar(turnos[inicio:fin])
+
+        self.agentes = dict(sorted(self.agentes.items()))
+        return self
+
+    def fusionar(self, otro):
+        """Suma los estadísticos de otro resumen (p. ej. de otro run o bloque)"""
+        for nombre, agente in otro.agentes.items():
+            self.agentes.setdefault(nombre, EstadisticosAgente()).fusionar(agente)
+        self.agentes = dict(sorted(self.agentes.items()))
+        return self
+
+    @classmethod
+    def desde_bloques(cls, bloques):
+        """Resumen de una secuencia de DataFrames (p. ej. carga_datos.leer_por_bloques)"""
+        estadisticos = cls()
+        for bloque in bloques:
+            estadisticos.actualizar(bloque)
+        return estadisticos
+
+    def nombres(self):
+        return list(self.agentes)
+
+    def resumen_variable(self, variable):
+        """DataFrame mean/std/min/max/median por agente de 'tiempo' o 'turnos'"""
+        return pd.DataFrame({nombre: getattr(agente, variable).resumen()
+                             for nombre, agente in self.agentes.items()}).T.rename_axis('agent_name')
@@ -0,0 +1,260 @@
+"""Análisis de varias ejecuciones (runs) con agregados incrementales
+
+Cada CSV detallado es un run; su id sale del prefijo numérico del nombre
+(3_uno_agents_detailed.csv -> '3') o, si no lo tiene, del nombre sin
+extensión. Un manifiesto guarda el hash de cada archivo ya procesado y los
+estadísticos suficientes de cada run (estadisticos.EstadisticosSuficientes),
+así que al añadir un run solo se lee ese archivo y sus estadísticos se
+fusionan con los guardados.
+
+Las rachas dependen del orden de los runs: el manifiesto guarda, tras cada
+run, el estado de rachas.AnalisisRachas (rachas cerradas, la abierta y los
+bloques de cada agente). Un run nuevo al final parte del estado del último;
+si cambia o desaparece un run, se rehace la cadena desde él. Los archivos
+se leen por bloques de filas, sin cargarlos enteros.
+"""
+
+import copy
+import glob
+import json
+import os
+import pickle
+import re
+
+import pandas as pd
+
+from .carga_datos import cargar_datos, huella_archivo, leer_por_bloques
+from .estadisticos import EstadisticosSuficientes
+from .rachas import AnalisisRachas
+
+PATRON_DETALLADO = '*detailed.csv'
+
+# Columnas de los agregados por (run, agente): todas se combinan sumando,
+# salvo los mínimos y máximos
+COLUMNAS_SUMA = ['partidas', 'victorias', 'suma_tiempo', 'suma_tiempo2', 'suma_turnos', 'suma_turnos2']
+COLUMNAS_MIN = ['min_tiempo', 'min_turnos']
+COLUMNAS_MAX = ['max_tiempo', 'max_turnos']
+
+# Un manifiesto de otra versión se descarta y se reprocesan todos los runs
+VERSION_MANIFIESTO = 3
+
+
+class _Unpickler(pickle.Unpickler):
+    """Lee estadísticos guardados con este paquete importado con otro nombre
+
+    main.py lo importa como src y la CLI instalada como analisis_uno.
+    """
+
+    def find_class(self, module, name):
+        paquete, _, modulo = module.rpartition('.')
+        if paquete in ('src', 'analisis_uno'):
+            module = f'{__package__}.{modulo}'
+        return super().find_class(module, name)
+
+
+def _orden_natural(ruta):
+    return [int(parte) if parte.isdigit() else parte for parte in re.split(r'(\d+)', ruta)]
+
+
+def listar_archivos(origen):
+    """CSV detallados de origen: un archivo, un directorio o un patrón glob"""
+    if os.path.isdir(origen):
+        archivos = glob.glob(os.path.join(origen, PATRON_DETALLADO))
+    elif os.path.isfile(origen):
+        archivos = [origen]
+    else:
+        archivos = glob.glob(origen)
+    if not archivos:
+        raise FileNotFoundError(f"No hay CSV detallados en {origen}")
+    return sorted(archivos, key=_orden_natural)
+
+
+def id_run(ruta_archivo):
+    """Id del run de un archivo: su prefijo numérico o su nombre"""
+    nombre = os.path.splitext(os.path.basename(ruta_archivo))[0]
+    prefijo = re.match(r'(\d+)_', nombre)
+    return prefijo.group(1) if prefijo else nombre
+
+
+def cargar_runs(origen, huellas=None, **kwargs):
+    """Todos los runs de origen en un DataFrame, con la columna run_id
+
+    Cada archivo pasa por cargar_datos (kwargs incluidos), así que los ya
+    leídos antes salen de su caché binaria. huellas ({ruta absoluta: hash},
+    p. ej. ManifiestoRuns.huellas()) evita volver a calcular el hash de
+    cada archivo.
+    """
+    huellas = huellas or {}
+    partes = []
+    for ruta in listar_archivos(origen):
+        df = cargar_datos(ruta, huella=huellas.get(os.path.abspath(ruta)), **kwargs)
+        df.insert(0, 'run_id', id_run(ruta))
+        partes.append(df)
+
+    categorias = pd.api.types.union_categoricals([df['agent_name'] for df in partes],
+                                                 sort_categories=True).categories
+    for df in partes:
+        df['agent_name'] = df['agent_name'].cat.set_categories(categorias)
+    df = pd.concat(partes, ignore_index=True)
+    df['run_id'] = pd.Categorical(df['run_id'], categories=list(dict.fromkeys(df['run_id'])))
+    return df
+
+
+def agregar_run(estadisticos):
+    """Agregados por agente de un run (conteos, sumas, sumas de cuadrados, extremos)"""
+    filas = []
+    for nombre, agente in estadisticos.agentes.items():
+        filas.append({
+            'agent_name': nombre,
+            'partidas': agente.partidas,
+            'victorias': agente.victorias,
+            'suma_tiempo': agente.tiempo.suma,
+            'suma_tiempo2': agente.tiempo.suma2,
+            'min_tiempo': agente.tiempo.min,
+            'max_tiempo': agente.tiempo.max,
+            'suma_turnos': int(agente.turnos.suma),
+            'suma_turnos2': int(agente.turnos.suma2),
+            'min_turnos': int(agente.turnos.min),
+            'max_turnos': int(agente.turnos.max)
+        })
+    return pd.DataFrame(filas)
+
+
+def combinar_agregados(agregados):
+    """Agregados por agente sumando todos los runs, con medias y desviaciones"""
+    grupos = agregados.groupby('agent_name')
+    total = grupos[COLUMNAS_SUMA].sum().join(grupos[COLUMNAS_MIN].min()).join(grupos[COLUMNAS_MAX].max())
+    total['runs'] = grupos['run_id'].nunique()
+
+    n = total['partidas']
+    total['tasa_victoria'] = total['victorias'] / n * 100
+    for variable in ('tiempo', 'turnos'):
+        media = total[f'suma_{variable}'] / n
+        varianza = (total[f'suma_{variable}2'] - n * media ** 2) / (n - 1)
+        total[f'media_{variable}'] = media
+        total[f'std_{variable}'] = varianza.clip(lower=0) ** 0.5
+    return total
+
+
+class ManifiestoRuns:
+    """Archivos ya procesados (hash y run) y sus estadísticos, en directorio_estado
+
+    agregados.csv es la versión legible de los estadísticos de cada run;
+    estadisticos.pkl los guarda completos (con los bocetos de cuantiles).
+    rachas.pkl guarda la cadena [(archivo, hash, AnalisisRachas tras ese run)]
+    en el orden de los runs.
+    """
+
+    def __init__(self, directorio_estado):
+        self.directorio = directorio_estado
+        self.ruta_manifiesto = os.path.join(directorio_estado, 'manifest.json')
+        self.ruta_agregados = os.path.join(directorio_estado, 'agregados.csv')
+        self.ruta_estadisticos = os.path.join(directorio_estado, 'estadisticos.pkl')
+        self.ruta_rachas = os.path.join(directorio_estado, 'rachas.pkl')
+
+        self.archivos = {}
+        self.estadisticos = {}
+        self.rachas = []
+        self.agregados = pd.DataFrame(columns=['run_id', 'agent_name'] + COLUMNAS_SUMA
+                                      + COLUMNAS_MIN + COLUMNAS_MAX)
+        if os.path.exists(self.ruta_manifiesto):
+            with open(self.ruta_manifiesto, encoding='utf-8') as f:
+                manifiesto = json.load(f)
+            if manifiesto['version'] != VERSION_MANIFIESTO:
+                return
+            self.archivos = manifiesto['archivos']
+            self.agregados = pd.read_csv(self.ruta_agregados, dtype={'run_id': str})
+            with open(self.ruta_estadisticos, 'rb') as f:
+                self.estadisticos = _Unpickler(f).load()
+            with open(self.ruta_rachas, 'rb') as f:
+                self.rachas = _Unpickler(f).load()
+
+    def actualizar(self, origen, chunksize=100000):
+        """Procesa los archivos de origen nuevos o modificados y olvida los que ya no están
+
+        Cada archivo que hay que leer se recorre una vez en bloques de
+        chunksize filas: los nuevos o modificados para sus estadísticos y,
+        desde el primer run que rompe la cadena guardada, para las rachas.
+        Devuelve la lista de archivos procesados (nuevos o modificados).
+        """
+        archivos = listar_archivos(origen)
+        if len({id_run(ruta) for ruta in archivos}) < len(archivos):
+            raise ValueError(f"Hay archivos con el mismo id de run en {origen}")
+
+        vigentes = {os.path.abspath(ruta) for ruta in archivos}
+        for clave in set(self.archivos) - vigentes:
+            self._quitar_run(self.archivos.pop(clave))
+
+        huellas = {os.path.abspath(ruta): huella_archivo(ruta) for ruta in archivos}
+        # Estados de rachas reutilizables: el prefijo de la cadena con los mismos archivos y hashes
+        comunes = 0
+        for (clave, huella, _), ruta in zip(self.rachas, archivos):
+            if clave != os.path.abspath(ruta) or huella != huellas[clave]:
+                break
+            comunes += 1
+        self.rachas = self.rachas[:comunes]
+        rachas = copy.deepcopy(self.rachas[-1][2]) if self.rachas else AnalisisRachas()
+
+        procesados = []
+        for posicion, ruta in enumerate(archivos):
+            clave = os.path.abspath(ruta)
+            huella = huellas[clave]
+            registrado = self.archivos.get(clave)
+            nuevo = registrado is None or registrado['sha256'] != huella
+            if not nuevo and posicion < comunes:
+                continue
+
+            estadisticos = EstadisticosSuficientes() if nuevo else None
+            for bloque in leer_por_bloques(ruta, chunksize):
+                if estadisticos is not None:
+                    estadisticos.actualizar(bloque)
+                rachas.actualizar(bloque)
+            self.rachas.append((clave, huella, copy.deepcopy(rachas)))
+            if not nuevo:
+                continue
+
+            run = id_run(ruta)
+            agregados = agregar_run(estadisticos)
+            agregados.insert(0, 'run_id', run)
+            self._quitar_run(registrado)
+            self.estadisticos[run] = estadisticos
+            self.agregados = pd.concat([self.agregados, agregados], ignore_index=True) \
+                if len(self.agregados) else agregados
+            self.archivos[clave] = {'sha256': huella, 'run_id': run,
+                                    'filas': int(agregados['partidas'].sum())}
+            procesados.append(ruta)
+
+        self.guardar()
+        return procesados
+
+    def _quitar_run(self, registrado):
+        if registrado is None:
+            return
+        self.estadisticos.pop(registrado['run_id'], None)
+        if len(self.agregados):
+            self.agregados = self.agregados[self.agregados['run_id'] != registrado['run_id']]
+
+    def huellas(self):
+        """{ruta absoluta: hash} de los archivos registrados (para cargar_runs)"""
+        return {clave: registrado['sha256'] for clave, registrado in self.archivos.items()}
+
+    def analisis_rachas(self):
+        """AnalisisRachas de todos los runs en orden (el estado tras el último)"""
+        return self.rachas[-1][2] if self.rachas else AnalisisRachas()
+
+    def estadisticos_combinados(self):
+        """EstadisticosSuficientes de todos los runs fusionados (para AnalisisUNO)"""
+        combinados = EstadisticosSuficientes()
+        for estadisticos in self.estadisticos.values():
+            combinados.fusionar(estadisticos)
+        return combinados
+
+    def guardar(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        self.agregados.to_csv(self.ruta_agregados, index=False)
+        with open(self.ruta_estadisticos, 'wb') as f:
+            pickle.dump(self.estadisticos, f)
+        with open(self.ruta_rachas, 'wb') as f:
+            pickle.dump(self.rachas, f)
+        with open(self.ruta_manifiesto, 'w', encoding='utf-8') as f:
+            json.dump({'version': VERSION_MANIFIESTO, 'archivos': self.archivos}, f, indent=1, ensure_ascii=False)
@@ -0,0 +1,186 @@
+"""Análisis completo de uno o varios runs: agregados, pruebas, rachas, gráficos y resumen
+
+Es lo que ejecutan main.py y los comandos analyze/plot de la CLI. scipy
+se importa con el análisis estadístico y seaborn/matplotlib solo si se
+piden los gráficos.
+
+Estadísticos, exploración y rachas salen del manifiesto de runs
+(incremental.ManifiestoRuns), que solo lee los archivos nuevos o
+modificados; las filas de todos los runs solo se cargan para los gráficos
+(desde la caché binaria de cada archivo).
+
+Con perfil_dir las etapas (una fracción fraccion_perfil de ellas) se
+perfilan por muestreo con el perfilador del simulador
+(simulador_uno/perfilado.py): cada etapa es un componente y los procesos
+que dibujan los gráficos suman sus muestras a la suya. perfil_dir recibe
+una pila plegada por etapa, todo.folded y resumen.txt.
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+
+from .incremental import ManifiestoRuns, cargar_runs, combinar_agregados
+
+
+def _modulo_perfilado():
+    """perfilado.py del simulador: instalado o, si no, desde el repositorio"""
+    if importlib.util.find_spec('simulador_uno') is None:
+        raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'codigo')
+        sys.path.insert(0, os.path.normpath(raiz))
+    return importlib.import_module('simulador_uno.perfilado')
+
+
+def _etapa(perfil, etapa, funcion, *args, **kwargs):
+    """funcion(*args, **kwargs), perfilada como componente etapa si el perfil la elige"""
+    if perfil is None or not perfil.elige(etapa):
+        return funcion(*args, **kwargs)
+    perfil.activar(etapa)
+    try:
+        return funcion(*args, **kwargs)
+    finally:
+        perfil.desactivar()
+
+
+def explorar_runs(manifiesto):
+    """Exploración inicial desde los agregados del manifiesto (sin recorrer las filas)"""
+    resumen = combinar_agregados(manifiesto.agregados)
+    print("\n=== INFORMACIÓN GENERAL ===")
+    print(f"Runs: {len(manifiesto.archivos)} | Filas: {int(resumen['partidas'].sum())}")
+    print("\n=== PARTIDAS Y VICTORIAS POR AGENTE ===")
+    print(resumen[['runs', 'partidas', 'victorias', 'tasa_victoria']].round(2))
+    print("\n=== TIEMPO (ms) Y TURNOS POR AGENTE ===")
+    print(resumen[['media_tiempo', 'std_tiempo', 'min_tiempo', 'max_tiempo',
+                   'media_turnos', 'std_turnos', 'min_turnos', 'max_turnos']].round(3))
+
+
+def ejecutar(origen='data/uno_agents_detailed.csv', graficos=True, num_workers=1, seed=0,
+             perfil_dir=None, fraccion_perfil=1.0):
+    """Analiza un CSV detallado, un directorio de runs o un glob y guarda los resultados en results/
+
+    num_workers se usa para el bootstrap y para dibujar los gráficos; seed
+    es la semilla del bootstrap. Con perfil_dir se perfilan las etapas
+    (el bootstrap en paralelo solo cuenta el proceso principal). Devuelve
+    el diccionario de resultados.
+    """
+    from .analisis_estadistico import AnalisisUNO
+
+    perfil = None
+    if perfil_dir:
+        perfil = _modulo_perfilado().Perfilador(fraccion=fraccion_perfil)
+        perfil.iniciar()
+    try:
+        # 1. CARGAR DATOS
+        # Solo se procesan los runs nuevos o modificados; los demás salen del manifiesto
+        print("Actualizando agregados por run...")
+        manifiesto = ManifiestoRuns('results/datos/runs')
+        nuevos = _etapa(perfil, 'manifiesto', manifiesto.actualizar, origen)
+        print(f"Runs procesados ahora: {len(nuevos)} "
+              f"(ya estaban en el manifiesto: {len(manifiesto.archivos) - len(nuevos)})")
+
+        # 2. EXPLORACIÓN INICIAL
+        print("Explorando datos...")
+        _etapa(perfil, 'exploracion', explorar_runs, manifiesto)
+
+        # 3. ANÁLISIS ESTADÍSTICO
+        print("Realizando análisis estadístico...")
+        # Desde los estadísticos suficientes de los runs, sin recorrer las filas
+        analizador = AnalisisUNO(estadisticos=manifiesto.estadisticos_combinados())
+        resultados = _etapa(perfil, 'estadistica', analizador.ejecutar_analisis_completo,
+                            seed=seed, num_workers=num_workers)
+
+        # Rachas y consistencia por bloques de 200 partidas (en el orden de los runs),
+        # del estado acumulado que guarda el manifiesto tras el último run
+        print("Analizando rachas y consistencia...")
+        resultados['rachas'] = _etapa(perfil, 'rachas', manifiesto.analisis_rachas().resumen)
+        print(resultados['rachas'][['mejor_racha_victorias', 'racha_media_victorias',
+                                    'std_bloques', 'consistencia']].round(2))
+
+        # 4. VISUALIZACIONES
+        if graficos:
+            from .visualizaciones import VisualizacionesUNO
+
+            print("Cargando datos...")
+            df = _etapa(perfil, 'carga', cargar_runs, origen, huellas=manifiesto.huellas())
+
+            print("Generando visualizaciones...")
+            visualizador = VisualizacionesUNO(df, resultados)
+            _etapa(perfil, 'graficos', visualizador.generar_todas_visualizaciones, num_workers=num_workers,
+                   perfilador=perfil if perfil is not None and perfil.elige('graficos') else None)
+
+        # 5. GUARDAR RESULTADOS
+        print("Guardando resultados...")
+        _etapa(perfil, 'guardado', guardar_resultados, resultados, manifiesto)
+    finally:
+        if perfil is not None:
+            perfil.detener()
+
+    if perfil is not None:
+        print(f"\nPerfil en {perfil_dir}/")
+        print(perfil.escribir(perfil_dir))
+    return resultados
+
+
+def guardar_resultados(resultados, manifiesto):
+    """Guardar resultados del análisis"""
+    # Crear carpetas si no existen
+    os.makedirs('results/graficos', exist_ok=True)
+    os.makedirs('results/datos', exist_ok=True)
+
+    # Agregados de todos los runs, combinados desde el manifiesto
+    combinar_agregados(manifiesto.agregados).to_csv('results/datos/resumen_runs.csv')
+    resultados['rachas'].to_csv('results/datos/rachas.csv')
+
+    # Guardar resumen estadístico
+    with open('results/resumen_analisis.txt', 'w', encoding='utf-8') as f:
+        f.write("RESUMEN ANÁLISIS AGENTES UNO\n")
+        f.write("=" * 50 + "\n\n")
+
+        f.write("TASAS DE VICTORIA\n")
+        f.write("-" * 30 + "\n")
+        for agente, tasa in resultados['tasa_victoria'].items():
+            f.write(f"{agente}: {tasa:.2f}% de victorias\n")
+
+        f.write("\nESTADÍSTICAS DE TIEMPO\n")
+        f.write("-" * 30 + "\n")
+        f.write(resultados['tiempo_stats'].to_string())
+
+        f.write("\n\nESTADÍSTICAS DE TURNOS\n")
+        f.write("-" * 30 + "\n")
+        f.write(resultados['turnos_stats'].to_string())
+
+        f.write("\n\nPRUEBAS ESTADÍSTICAS\n")
+        f.write("-" * 30 + "\n")
+        if 'anova_tiempos' in resultados:
+            f_stat, p_value = resultados['anova_tiempos']
+            f.write(f"ANOVA Tiempos: F={f_stat:.4f}, p={p_value:.4f}\n")
+            f.write("→ Diferencia significativa\n" if p_value < 0.05 else "→ Sin diferencia significativa\n")
+
+        if 'chi2_victorias' in resultados:
+            chi2, p_chi = resultados['chi2_victorias']
+            f.write(f"Chi-cuadrado Victorias: χ²={chi2:.4f}, p={p_chi:.4f}\n")
+            f.write("→ Diferencia significativa\n" if p_chi < 0.05 else "→ Sin diferencia significativa\n")
+
+        if 'bootstrap_agentes' in resultados:
+            nivel = resultados['bootstrap_nivel']
+            f.write(f"\nINTERVALOS BOOTSTRAP ({nivel:.0%})\n")
+            f.write("-" * 30 + "\n")
+            f.write(resultados['bootstrap_agentes'].to_string(index=False))
+
+            f.write(f"\n\nDIFERENCIAS ENTRE AGENTES (IC {nivel:.0%})\n")
+            f.write("-" * 30 + "\n")
+            f.write(resultados['bootstrap_diferencias'].to_string(index=False))
+            f.write("\n")
+
+        f.write("\nRACHAS Y CONSISTENCIA (bloques de 200 partidas)\n")
+        f.write("-" * 30 + "\n")
+        f.write(resultados['rachas'].round(2).to_string())
+        f.write("\n")
+
+    print("Archivos guardados:")
+    print("   - results/resumen_analisis.txt")
+    print("   - results/datos/resumen_runs.csv (agregados de todos los runs)")
+    print("   - results/datos/rachas.csv (rachas y consistencia por agente)")
+    print("   - results/datos/runs/ (manifiesto y agregados por run)")
+    print("   - results/graficos/ [varios gráficos PNG]")
@@ -0,0 +1,261 @@
+"""Rachas de victorias/derrotas y consistencia por bloques de partidas
+
+Las rachas son la codificación por longitud de corridas (RLE) de la columna
+wins de cada agente, en el orden de las filas. Todo se calcula en una pasada
+agrupada con NumPy: se ordenan las filas por agente (orden estable) y los
+límites de racha son los índices donde cambia el agente o el resultado.
+
+AnalisisRachas se actualiza bloque a bloque (p. ej. con
+carga_datos.leer_por_bloques) y arrastra la racha abierta y la posición de
+cada agente, así que el resultado es el mismo que con el CSV entero.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+# Partidas por bloque de consistencia (como en evaluacion_rapida.ipynb)
+TAMANO_BLOQUE = 200
+
+
+def _agrupar(df):
+    """Nombres de agente, límites de cada agente y wins con las filas ordenadas por agente"""
+    nombres = df['agent_name'].astype('category')
+    codigos = nombres.cat.codes.to_numpy()
+    orden = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[orden], np.arange(len(nombres.cat.categories) + 1))
+    victorias = df['wins'].to_numpy()[orden].astype(np.int8)
+    return [str(nombre) for nombre in nombres.cat.categories], limites, victorias, orden
+
+
+def codificar_rachas(df):
+    """Rachas de cada agente: DataFrame agent_name, resultado (1 victoria / 0 derrota), longitud"""
+    nombres, limites, victorias, _ = _agrupar(df)
+    inicios = _inicios_racha(victorias, limites)
+    agentes = np.searchsorted(limites, inicios, side='right') - 1
+    return pd.DataFrame({
+        'agent_name': pd.Categorical.from_codes(agentes, nombres),
+        'resultado': victorias[inicios],
+        'longitud': np.diff(np.append(inicios, len(victorias)))
+    })
+
+
+def _inicios_racha(victorias, limites):
+    """Índices donde empieza una racha: cambio de resultado o comienzo de un agente"""
+    inicio = np.ones(len(victorias), dtype=bool)
+    inicio[1:] = victorias[1:] != victorias[:-1]
+    inicio[limites[:-1][limites[:-1] < len(victorias)]] = True
+    return np.flatnonzero(inicio)
+
+
+def tasa_movil(df, ventana=TAMANO_BLOQUE):
+    """Tasa de victoria (%) de las últimas ventana partidas del agente de cada fila
+
+    Alineada con df; NaN hasta que el agente acumula ventana partidas.
+    """
+    _, limites, victorias, orden = _agrupar(df)
+    acumulado = np.concatenate(([0], np.cumsum(victorias, dtype=np.int64)))
+    posicion = np.arange(len(victorias)) - np.repeat(limites[:-1], np.diff(limites))
+
+    tasas = np.full(len(victorias), np.nan)
+    completas = np.flatnonzero(posicion >= ventana - 1)
+    tasas[completas] = (acumulado[completas + 1] - acumulado[completas + 1 - ventana]) / ventana * 100
+
+    resultado = np.empty_like(tasas)
+    resultado[orden] = tasas
+    return pd.Series(resultado, index=df.index, name=f'tasa_movil_{ventana}')
+
+
+def _sumar(acumulado, nuevos):
+    """Suma dos arrays de conteos de distinta longitud"""
+    if len(nuevos) > len(acumulado):
+        acumulado = np.pad(acumulado, (0, len(nuevos) - len(acumulado)))
+    acumulado[:len(nuevos)] += nuevos
+    return acumulado
+
+
+class _EstadoAgente:
+    """Rachas cerradas (histograma de longitudes por resultado), racha abierta y bloques"""
+
+    def __init__(self):
+        self.partidas = 0
+        self.victorias = 0
+        self.rachas = {0: np.zeros(0, dtype=np.int64), 1: np.zeros(0, dtype=np.int64)}
+        self.abierta = None  # (resultado, longitud)
+        self.victorias_bloque = np.zeros(0, dtype=np.int64)
+        self.partidas_bloque = np.zeros(0, dtype=np.int64)
+
+    def cerrar(self, resultados, longitudes):
+        for resultado in (0, 1):
+            conteo = np.bincount(longitudes[resultados == resultado])
+            self.rachas[resultado] = _sumar(self.rachas[resultado], conteo)
+
+    def histograma(self, resultado):
+        """Longitudes de racha de un resultado contando la abierta (como si acabara aquí)"""
+        conteos = self.rachas[resultado].copy()
+        if self.abierta is not None and self.abierta[0] == resultado:
+            conteos = _sumar(conteos, np.bincount([self.abierta[1]]))
+        return conteos
+
+
+class AnalisisRachas:
+    """Rachas y tasas por bloques de TAMANO_BLOQUE partidas de cada agente, por bloques de filas"""
+
+    def __init__(self, tamano_bloque=TAMANO_BLOQUE):
+        self.tamano_bloque = tamano_bloque
+        self.agentes = {}
+
+    def actualizar(self, df):
+        """Acumula las filas de df, que siguen a las ya vistas de cada agente"""
+        if len(df) == 0:
+            return self
+        nombres, limites, victorias, _ = _agrupar(df)
+        inicios = _inicios_racha(victorias, limites)
+        longitudes = np.diff(np.append(inicios, len(victorias)))
+        resultados = victorias[inicios]
+        rachas_agente = np.searchsorted(inicios, limites)
+
+        for codigo, nombre in enumerate(nombres):
+            inicio, fin = limites[codigo], limites[codigo + 1]
+            if inicio == fin:
+                continue
+            estado = self.agentes.setdefault(nombre, _EstadoAgente())
+            propias = slice(rachas_agente[codigo], rachas_agente[codigo + 1])
+            r_resultados, r_longitudes = resultados[propias], longitudes[propias].copy()
+
+            # La primera racha del bloque continúa la abierta si tiene el mismo resultado
+            if estado.abierta is not None:
+                if estado.abierta[0] == r_resultados[0]:
+                    r_longitudes[0] += estado.abierta[1]
+                else:
+                    estado.cerrar(np.array([estado.abierta[0]]), np.array([estado.abierta[1]]))
+            estado.cerrar(r_resultados[:-1], r_longitudes[:-1])
+            estado.abierta = (int(r_resultados[-1]), int(r_longitudes[-1]))
+
+            # Bloque de cada partida según su posición entre todas las del agente
+            bloques = (estado.partidas + np.arange(fin - inicio)) // self.tamano_bloque
+            estado.victorias_bloque = _sumar(estado.victorias_bloque,
+                                             np.bincount(bloques, weights=victorias[inicio:fin]).astype(np.int64))
+            estado.partidas_bloque = _sumar(estado.partidas_bloque, np.bincount(bloques))
+            estado.partidas += int(fin - inicio)
+            estado.victorias += int(victorias[inicio:fin].sum())
+
+        self.agentes = dict(sorted(self.agentes.items()))
+        return self
+
+    @classmethod
+    def desde_bloques(cls, bloques, tamano_bloque=TAMANO_BLOQUE):
+        """Análisis de una secuencia de DataFrames (p. ej. carga_datos.leer_por_bloques)"""
+        analisis = cls(tamano_bloque)
+        for bloque in bloques:
+            analisis.actualizar(bloque)
+        return analisis
+
+    def tasas_por_bloque(self):
+        """Tasa de victoria (%) de cada bloque completo: DataFrame agent_name, bloque, tasa_victoria"""
+        filas = []
+        for nombre, estado in self.agentes.items():
+            completos = np.flatnonzero(estado.partidas_bloque == self.tamano_bloque)
+            filas.append(pd.DataFrame({
+                'agent_name': nombre,
+                'bloque': completos,
+                'tasa_victoria': estado.victorias_bloque[completos] / self.tamano_bloque * 100
+            }))
+        return pd.concat(filas, ignore_index=True) if filas else pd.DataFrame(
+            columns=['agent_name', 'bloque', 'tasa_victoria'])
+
+    def resumen(self):
+        """Rachas y variabilidad entre bloques completos de cada agente"""
+        bloques = self.tasas_por_bloque().groupby('agent_name')['tasa_victoria']
+        filas = {}
+        for nombre, estado in self.agentes.items():
+            fila = {'partidas': estado.partidas, 'victorias': estado.victorias,
+                    'tasa_victoria': estado.victorias / estado.partidas * 100}
+            for resultado, sufijo in ((1, 'victorias'), (0, 'derrotas')):
+                conteos = estado.histograma(resultado)
+                total = conteos.sum()
+                fila[f'rachas_{sufijo}'] = int(total)
+                fila[f'mejor_racha_{sufijo}'] = int(np.flatnonzero(conteos).max()) if total else 0
+                fila[f'racha_media_{sufijo}'] = conteos @ np.arange(len(conteos)) / total if total else np.nan
+            fila['bloques'] = int((estado.partidas_bloque == self.tamano_bloque).sum())
+            filas[nombre] = fila
+
+        resumen = pd.DataFrame.from_dict(filas, orient='index').rename_axis('agent_name')
+        resumen['std_bloques'] = bloques.std()
+        resumen['min_bloque'] = bloques.min()
+        resumen['max_bloque'] = bloques.max()
+        resumen['consistencia'] = pd.cut(resumen['std_bloques'], [-np.inf, 5, 10, np.inf],
+                                         labels=['baja variabilidad', 'moderada', 'alta variabilidad'])
+        return resumen
+
+
+def analizar_rachas(df, tamano_bloque=TAMANO_BLOQUE):
+    """Resumen de rachas y consistencia de un DataFrame ya cargado"""
+    return AnalisisRachas(tamano_bloque).actualizar(df).resumen()
+
+
+def _rachas_con_bucle(df, tamano_bloque=TAMANO_BLOQUE):
+    """Versión de evaluacion_rapida.ipynb (bucle por fila y máscara por agente), para comparar"""
+    resultado = {}
+    for agente in df['agent_name'].unique():
+        datos_agente = df[df['agent_name'] == agente]
+        rachas = []
+        racha_actual = 0
+        for victoria in datos_agente['wins']:
+            if victoria == 1:
+                racha_actual += 1
+            else:
+                if racha_actual > 0:
+                    rachas.append(racha_actual)
+                racha_actual = 0
+        if racha_actual > 0:
+            rachas.append(racha_actual)
+
+        datos = datos_agente.reset_index(drop=True)
+        completas = len(datos) // tamano_bloque * tamano_bloque
+        por_bloque = datos['wins'][:completas].groupby(datos.index[:completas] // tamano_bloque).mean() * 100
+        resultado[agente] = (max(rachas, default=0), np.mean(rachas), len(rachas), por_bloque.std())
+    return resultado
+
+
+def benchmark_rachas(ruta_archivo='../datasets_generados/6_uno_agents_detailed.csv', chunksize=20000,
+                     repeticiones=3):
+    """Compara el bucle del notebook con la pasada agrupada (entera y por bloques del CSV)"""
+    from .carga_datos import leer_por_bloques
+
+    df = next(leer_por_bloques(ruta_archivo, chunksize=None))
+    # El notebook lee el CSV sin tipos (nombres como object)
+    crudo = pd.read_csv(ruta_archivo).rename(columns={'Agente': 'agent_name', 'Victoria': 'wins'})
+
+    def medir(funcion):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            salida = funcion()
+            tiempos.append(time.perf_counter() - inicio)
+        return min(tiempos), salida
+
+    t_bucle, bucle = medir(lambda: _rachas_con_bucle(crudo))
+    t_vector, resumen = medir(lambda: analizar_rachas(df))
+    t_bloques, por_bloques = medir(
+        lambda: AnalisisRachas.desde_bloques(leer_por_bloques(ruta_archivo, chunksize)).resumen())
+    t_movil, _ = medir(lambda: tasa_movil(df))
+
+    for agente, (mejor, media, num, std) in bucle.items():
+        fila = resumen.loc[str(agente)]
+        assert (mejor, num) == (fila['mejor_racha_victorias'], fila['rachas_victorias'])
+        assert np.isclose(media, fila['racha_media_victorias']) and np.isclose(std, fila['std_bloques'])
+    pd.testing.assert_frame_equal(resumen, por_bloques)
+
+    print(f"Rachas y bloques de {len(df)} filas ({ruta_archivo}):")
+    print(f"  bucle por fila (notebook):      {t_bucle * 1000:8.1f} ms")
+    print(f"  pasada agrupada:                {t_vector * 1000:8.1f} ms ({t_bucle / t_vector:.0f}x)")
+    print(f"  por bloques de {chunksize} filas:   {t_bloques * 1000:8.1f} ms (incluye leer el CSV)")
+    print(f"  tasa móvil ({TAMANO_BLOQUE} partidas):      {t_movil * 1000:8.1f} ms")
+    return resumen
+
+
+if __name__ == "__main__":
+    # Desde analisis_final/: python -m src.rachas
+    print(benchmark_rachas())
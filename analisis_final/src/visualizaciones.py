@@ -1,10 +1,26 @@
-"""Módulo para visualizaciones mejoradas del análisis UNO"""
+"""Módulo para visualizaciones mejoradas del análisis UNO
 
-import matplotlib.pyplot as plt
+Los gráficos se dibujan desde agregados ya binneados (cuantiles para las
+cajas, conteos de histogramas 2D para las nubes de puntos, tablas del
+análisis), no desde las filas. Se renderizan en un pool de procesos sobre
+figuras Agg, y un PNG no se vuelve a dibujar si el hash de sus agregados no
+cambió desde la última ejecución.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+# Antes de seaborn, que importa pyplot: sin esto pyplot elegiría el backend del
+# entorno (interactivo si hay pantalla) en este proceso y en cada worker
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
 import seaborn as sns
 import pandas as pd
 import numpy as np
-import os
 
 # Paleta personalizada para consistencia visual
 palette = {
@@ -16,277 +32,368 @@ palette = {
 
 sns.set_theme(style="whitegrid", context="talk")
 
+ESTILO = {
+    'figure.figsize': (12, 7),
+    'axes.titlesize': 16,
+    'axes.titleweight': 'bold',
+    'axes.labelsize': 12,
+    'axes.labelweight': 'regular',
+    'font.size': 12,
+    'grid.alpha': 0.3
+}
 
-class VisualizacionesUNO:
-    """Clase para generar visualizaciones del análisis UNO"""
+DIRECTORIO_GRAFICOS = 'results/graficos'
+# Hash de los agregados de cada PNG en la última ejecución
+ARCHIVO_HASHES = '.hashes.json'
+# Subir si cambia el código de dibujo, para redibujar todos los PNG
+VERSION_GRAFICOS = 1
+
+
+# ============================
+# 🧮 AGREGADOS
+# ============================
+
+def _cajas(valores, codigos, num_agentes):
+    """Estadísticos de caja de cada agente (formato de Axes.bxp, sin atípicos)
+
+    Los bigotes llegan al dato más extremo dentro de 1.5 IQR, como en seaborn.
+    """
+    orden = np.lexsort((valores, codigos))
+    valores, codigos = valores[orden], codigos[orden]
+    limites = np.searchsorted(codigos, np.arange(num_agentes + 1))
+
+    cajas = []
+    for codigo in range(num_agentes):
+        grupo = valores[limites[codigo]:limites[codigo + 1]]
+        q1, mediana, q3 = np.quantile(grupo, [0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        dentro = grupo[(grupo >= q1 - 1.5 * iqr) & (grupo <= q3 + 1.5 * iqr)]
+        cajas.append({'med': float(mediana), 'q1': float(q1), 'q3': float(q3),
+                      'whislo': float(dentro.min()), 'whishi': float(dentro.max()),
+                      'fliers': []})
+    return cajas
+
+
+def _histograma_2d(x, y, bins=60):
+    """Conteos de un histograma 2D: la nube de puntos ya binneada"""
+    conteos, bordes_x, bordes_y = np.histogram2d(x, y, bins=bins)
+    return {'conteos': conteos, 'bordes_x': bordes_x, 'bordes_y': bordes_y}
+
+
+def calcular_agregados(df, resultados):
+    """Lo que dibuja cada gráfico: {nombre del PNG: agregados pequeños}
+
+    Es la única pasada por las filas.
+    """
+    nombres = df['agent_name'].astype(str)
+    agentes = sorted(nombres.unique())
+    codigos = pd.Categorical(nombres, categories=agentes).codes
+    tiempos = df['execution_time_ms'].to_numpy(dtype=np.float64)
+    turnos = df['total_turns'].to_numpy(dtype=np.float64)
+
+    # Convertir tiempos a milisegundos si necesario
+    if tiempos.max() < 1:
+        tiempos = tiempos * 1000
+
+    partidas = np.bincount(codigos, minlength=len(agentes))
+    victorias = np.bincount(codigos, weights=df['wins'].to_numpy(dtype=np.float64),
+                            minlength=len(agentes))
+    tasas = victorias / partidas * 100
+
+    def intervalos(metrica):
+        """[estimación, ic_inferior, ic_superior] por agente, si el análisis tiene bootstrap"""
+        if 'bootstrap_agentes' not in resultados:
+            return None
+        tabla = resultados['bootstrap_agentes']
+        tabla = tabla[tabla['metrica'] == metrica].set_index('agente').loc[agentes]
+        return tabla[['estimacion', 'ic_inferior', 'ic_superior']].to_numpy()
+
+    game_ids = df['game_id'].to_numpy(dtype=np.float64)
+    nubes = {agente: _histograma_2d(game_ids[codigos == codigo], tiempos[codigos == codigo])
+             for codigo, agente in enumerate(agentes)}
+
+    numericas = df.select_dtypes(include=['number']).drop(columns=['game_id'], errors='ignore')
+    numericas = numericas.assign(execution_time_ms=tiempos, win_rate=tasas[codigos])
+    cajas_turnos = _cajas(turnos, codigos, len(agentes))
+
+    return {
+        'tasas_victoria': {'agentes': agentes, 'tasas': tasas,
+                           'intervalos': intervalos('tasa_victoria')},
+        'tiempos_ejecucion_clasico': {'agentes': agentes,
+                                      'cajas': _cajas(tiempos, codigos, len(agentes))},
+        'duracion_partidas': {'agentes': agentes, 'cajas': cajas_turnos,
+                              'intervalos': intervalos('turnos_medios')},
+        'distribucion_tiempos': {'agentes': agentes, 'nubes': nubes},
+        'distribucion_turnos': {'agentes': agentes, 'cajas': cajas_turnos},
+        'eficiencia_agentes': {'eficiencia': resultados['eficiencia_stats'][
+            ['eficiencia_tiempo_norm', 'eficiencia_turnos_norm']]},
+        'matriz_correlacion': {'corr': numericas.corr().round(2)}
+    }
+
+
+def huella_agregados(nombre, agregados, colores):
+    """Hash de lo que determina un PNG: agregados, colores, estilo y versión"""
+    contenido = pickle.dumps((VERSION_GRAFICOS, nombre, agregados, colores, ESTILO), protocol=4)
+    return hashlib.sha256(contenido).hexdigest()
+
+
+# ============================
+# 🖌️ DIBUJO
+# ============================
+
+def _errorbar(ax, intervalos, **kwargs):
+    ax.errorbar(range(len(intervalos)), intervalos[:, 0],
+                yerr=[intervalos[:, 0] - intervalos[:, 1], intervalos[:, 2] - intervalos[:, 0]],
+                capsize=6, **kwargs)
+
+
+def _cajas_agentes(ax, agentes, cajas, colores, width=0.8):
+    dibujo = ax.bxp(cajas, positions=range(len(agentes)), widths=width, showfliers=False,
+                    patch_artist=True, medianprops={'color': '#333333'})
+    for caja, agente in zip(dibujo['boxes'], agentes):
+        caja.set_facecolor(colores[agente])
+    ax.set_xticks(range(len(agentes)), agentes)
+
+
+def _dibujar_tasas_victoria(fig, datos, colores):
+    """Gráfico de barras de tasa de victoria por agente"""
+    ax = fig.subplots()
+    orden = np.argsort(-datos['tasas'], kind='stable')
+    agentes = [datos['agentes'][i] for i in orden]
+
+    barras = ax.bar(range(len(agentes)), datos['tasas'][orden], color=[colores[a] for a in agentes])
+    ax.set_xticks(range(len(agentes)), agentes)
+
+    ax.set_title('🏆 Promedio de Tasa de Victorias por Agente')
+    ax.set_xlabel('Agente de IA')
+    ax.set_ylabel('Tasa de Victoria (%)')
+
+    # Etiquetas sobre barras
+    ax.bar_label(barras, fmt="%.1f%%", label_type='edge', fontsize=11)
+
+    # Intervalo bootstrap de cada barra, si el análisis lo calculó
+    if datos['intervalos'] is not None:
+        _errorbar(ax, datos['intervalos'][orden], fmt='none', ecolor='black', linewidth=1.2)
+
+
+def _dibujar_tiempos_ejecucion_clasico(fig, datos, colores):
+    """Distribución de tiempos de ejecución por agente (cajas desde cuantiles)"""
+    fig.set_size_inches(9, 6)
+    ax = fig.subplots()
+    _cajas_agentes(ax, datos['agentes'], datos['cajas'], colores, width=0.5)
+
+    ax.set_title('Distribución de tiempos de ejecución por agente', fontsize=15, fontweight='bold', pad=15)
+    ax.set_xlabel('Agente de Inteligencia Artificial', fontsize=12)
+    ax.set_ylabel('Tiempo por jugada (milisegundos)', fontsize=12)
+
+    # Estilo clásico y limpio
+    ax.set_facecolor('white')
+    ax.grid(True, linestyle='--', alpha=0.4)
+    ax.tick_params(labelsize=11)
+    sns.despine(ax=ax, left=False, bottom=False)
+
+
+def _dibujar_duracion_partidas(fig, datos, colores):
+    """Duración de partidas (turnos), con la media y su intervalo bootstrap"""
+    ax = fig.subplots()
+    _cajas_agentes(ax, datos['agentes'], datos['cajas'], colores)
+
+    if datos['intervalos'] is not None:
+        _errorbar(ax, datos['intervalos'], fmt='D', color='black', markersize=5,
+                  label='Media (IC bootstrap)')
+        ax.legend()
+
+    ax.set_title('🕓 Duración de Partidas por Agente')
+    ax.set_xlabel('Agente de IA')
+    ax.set_ylabel('Número de Turnos')
+
+
+def _dibujar_distribucion_tiempos(fig, datos, colores):
+    """Tiempo de juego frente a número de partida, por agente (densidad binneada)"""
+    agentes = datos['agentes']
+    filas = max(-(-len(agentes) // 2), 1)
+    fig.set_size_inches(12, 4 * filas)
+    axes = np.atleast_1d(fig.subplots(filas, 2)).flatten()
+
+    for ax, agente in zip(axes, agentes):
+        nube = datos['nubes'][agente]
+        malla = ax.pcolormesh(nube['bordes_x'], nube['bordes_y'],
+                              np.ma.masked_equal(nube['conteos'].T, 0), cmap='viridis')
+        fig.colorbar(malla, ax=ax, label='Jugadas')
+        ax.set_title(f"Tiempo de juego por partida - {agente}")
+        ax.set_xlabel("Partida")
+        ax.set_ylabel("Tiempo de Juego (ms)")
+        ax.grid(True)
+    for ax in axes[len(agentes):]:
+        ax.set_visible(False)
+
+
+def _dibujar_distribucion_turnos(fig, datos, colores):
+    """Boxplot de distribución de turnos"""
+    ax = fig.subplots()
+    _cajas_agentes(ax, datos['agentes'], datos['cajas'], colores, width=0.5)
+
+    ax.set_title('📈 Distribución de Turnos por Partida')
+    ax.set_xlabel('Agente de IA')
+    ax.set_ylabel('Turnos Totales')
+
+
+def _dibujar_eficiencia_agentes(fig, datos, colores):
+    """Comparación de eficiencia entre agentes"""
+    fig.set_size_inches(15, 6)
+    axes = fig.subplots(1, 2)
+    eficiencia = datos['eficiencia']
+    agentes = [str(agente) for agente in eficiencia.index]
+
+    axes[0].bar(agentes, eficiencia['eficiencia_tiempo_norm'],
+                color=sns.color_palette('coolwarm', len(agentes)))
+    axes[0].set_title('⚡ Eficiencia por Tiempo')
+    axes[0].set_ylabel('Eficiencia Normalizada (%)')
+
+    axes[1].bar(agentes, eficiencia['eficiencia_turnos_norm'],
+                color=sns.color_palette('crest', len(agentes)))
+    axes[1].set_title('🔄 Eficiencia por Turnos')
+    axes[1].set_ylabel('Eficiencia Normalizada (%)')
+
+    for ax in axes:
+        ax.set_xlabel('Agente')
+        ax.grid(axis='y', alpha=0.3)
+
+
+def _dibujar_matriz_correlacion(fig, datos, colores):
+    """Matriz de correlaciones entre variables numéricas"""
+    fig.set_size_inches(8, 6)
+    ax = fig.subplots()
+
+    sns.heatmap(
+        datos['corr'],
+        annot=True,
+        fmt=".2f",
+        cmap='Spectral',
+        center=0,
+        linewidths=0.5,
+        square=True,
+        cbar_kws={'shrink': 0.8, 'label': 'Coeficiente de Correlación'},
+        ax=ax
+    )
+
+    ax.set_title('🔥 Correlación entre Variables Numéricas')
+
+
+# Nombre del PNG -> función que lo dibuja, en el orden en que se generan
+DIBUJOS = {
+    'tasas_victoria': _dibujar_tasas_victoria,
+    'tiempos_ejecucion_clasico': _dibujar_tiempos_ejecucion_clasico,
+    'duracion_partidas': _dibujar_duracion_partidas,
+    'distribucion_tiempos': _dibujar_distribucion_tiempos,
+    'distribucion_turnos': _dibujar_distribucion_turnos,
+    'eficiencia_agentes': _dibujar_eficiencia_agentes,
+    'matriz_correlacion': _dibujar_matriz_correlacion
+}
 
-    def __init__(self, df, resultados):
-        self.df = df.copy()
-        self.resultados = resultados
-        self._preparar_datos()
-        self._configurar_estilo()
 
-    # ============================
-    # 🔧 CONFIGURACIÓN GENERAL
-    # ============================
+def renderizar(nombre, datos, colores, ruta, dpi=300):
+    """Dibuja un gráfico en una figura Agg (sin pyplot) y lo guarda en ruta
 
-    def _configurar_estilo(self):
-        """Configura el estilo de las visualizaciones"""
-        plt.rcParams.update({
-            'figure.figsize': (12, 7),
-            'axes.titlesize': 16,
-            'axes.titleweight': 'bold',
-            'axes.labelsize': 12,
-            'axes.labelweight': 'regular',
-            'font.size': 12,
-            'grid.alpha': 0.3
-        })
-        sns.set_palette(list(palette.values()))
-
-    def _preparar_datos(self):
-        """Ajusta unidades y limpia datos extremos"""
-        # Convertir tiempos a milisegundos si necesario
-        if self.df['execution_time_ms'].max() < 1:
-            self.df['execution_time_ms'] *= 1000
-
-        # Agregar tasa de victoria si no existe
-        if 'win_rate' not in self.df.columns:
-            tasas = self.df.groupby('agent_name')['wins'].mean() * 100
-            self.df = self.df.merge(tasas.rename('win_rate'), on='agent_name', how='left')
-
-    def generar_todas_visualizaciones(self):
-        """Genera todas las visualizaciones"""
-        print("🎨 Generando visualizaciones...")
+    Es una función de módulo para poder ejecutarla en un pool de procesos.
+    """
+    with matplotlib.rc_context(ESTILO):
+        fig = Figure()
+        DIBUJOS[nombre](fig, datos, colores)
+        fig.tight_layout()
+        fig.savefig(ruta, dpi=dpi, bbox_inches='tight')
+    return ruta
 
-        os.makedirs('results/graficos', exist_ok=True)
 
-        self.grafico_tasas_victoria()
-        self.grafico_tiempo_ejecucion()
-        self.grafico_duracion_partidas()
-        self.grafico_distribucion_tiempos()
-        self.grafico_distribucion_turnos()
-        self.grafico_eficiencia()
-        self.grafico_correlaciones()
+class VisualizacionesUNO:
+    """Clase para generar visualizaciones del análisis UNO"""
 
-        plt.close('all')
-        print("✅ Gráficos guardados en carpeta results/graficos/")
+    def __init__(self, df, resultados, directorio=DIRECTORIO_GRAFICOS):
+        self.resultados = resultados
+        self.directorio = directorio
+        self.agregados = calcular_agregados(df, resultados)
+        self.palette = self._paleta_agentes()
 
     # ============================
-    # 🏆 TASA DE VICTORIAS
+    # 🔧 CONFIGURACIÓN GENERAL
     # ============================
 
-    def grafico_tasas_victoria(self):
-        """Gráfico de barras de tasa de victoria por agente"""
-        fig, ax = plt.subplots()
+    def _paleta_agentes(self):
+        """Colores de la paleta para los agentes conocidos y de seaborn para el resto"""
+        agentes = self.agregados['tasas_victoria']['agentes']
+        extra = iter(sns.color_palette('muted', len(agentes)))
+        return {agente: palette[agente] if agente in palette else next(extra) for agente in agentes}
 
-        resumen = self.df.groupby('agent_name')['win_rate'].mean().reset_index()
-        resumen = resumen.sort_values('win_rate', ascending=False)
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio, f"{nombre}.png")
 
-        bars = sns.barplot(
-            data=resumen,
-            x='agent_name',
-            y='win_rate',
-            palette=palette,
-            ax=ax
-        )
+    def _graficar(self, nombre):
+        """Dibuja un gráfico en este proceso, haya cambiado o no"""
+        os.makedirs(self.directorio, exist_ok=True)
+        renderizar(nombre, self.agregados[nombre], self.palette, self._ruta(nombre))
 
-        ax.set_title('🏆 Promedio de Tasa de Victorias por Agente')
-        ax.set_xlabel('Agente de IA')
-        ax.set_ylabel('Tasa de Victoria (%)')
+    def generar_todas_visualizaciones(self, num_workers=None, perfilador=None):
+        """Genera las visualizaciones cuyos agregados cambiaron desde la última ejecución
 
-        # Etiquetas sobre barras
-        for container in bars.containers:
-            bars.bar_label(container, fmt="%.1f%%", label_type='edge', fontsize=11)
+        Se dibujan en num_workers procesos (por defecto, uno por CPU). Con
+        perfilador (un Perfilador del simulador) cada proceso perfila sus
+        gráficos y las muestras se suman a las de perfilador.
+        """
+        print("🎨 Generando visualizaciones...")
 
-        plt.tight_layout()
-        plt.savefig('results/graficos/tasas_victoria.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta_hashes = os.path.join(self.directorio, ARCHIVO_HASHES)
+        anteriores = {}
+        if os.path.exists(ruta_hashes):
+            with open(ruta_hashes, encoding='utf-8') as f:
+                anteriores = json.load(f)
+
+        hashes = {nombre: huella_agregados(nombre, self.agregados[nombre], self.palette)
+                  for nombre in DIBUJOS}
+        pendientes = [nombre for nombre in DIBUJOS
+                      if anteriores.get(nombre) != hashes[nombre] or not os.path.exists(self._ruta(nombre))]
+        print(f"  {len(DIBUJOS) - len(pendientes)} gráficos sin cambios, {len(pendientes)} por dibujar")
+
+        num_workers = min(num_workers or os.cpu_count() or 1, max(len(pendientes), 1))
+        argumentos = ([nombre for nombre in pendientes],
+                      [self.agregados[nombre] for nombre in pendientes],
+                      [self.palette] * len(pendientes),
+                      [self._ruta(nombre) for nombre in pendientes])
+        if num_workers > 1:
+            funcion = renderizar if perfilador is None else perfilador.envolver(renderizar, 'graficos')
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                dibujados = list(executor.map(funcion, *argumentos))
+            if perfilador is not None:
+                for _, pilas in dibujados:
+                    perfilador.sumar(pilas)
+        else:
+            list(map(renderizar, *argumentos))
+
+        with open(ruta_hashes, 'w', encoding='utf-8') as f:
+            json.dump(hashes, f, indent=1)
+        print(f"✅ Gráficos guardados en carpeta {self.directorio}/")
 
     # ============================
-    # ⚙️ TIEMPO DE EJECUCIÓN
+    # 📊 GRÁFICOS SUELTOS
     # ============================
 
-    def grafico_tiempo_ejecucion(self):
-        """Gráfico clásico de dispersión vertical por agente (claro, profesional y legible)"""
-        import seaborn as sns
-        import matplotlib.pyplot as plt
-
-        # Crear figura
-        fig, ax = plt.subplots(figsize=(9, 6))
-
-        # Dibujar la dispersión vertical (puntos individuales por agente)
-        sns.stripplot(
-            data=self.df,
-            x='agent_name',
-            y='execution_time_ms',
-            jitter=0.3,  # ligera dispersión lateral
-            alpha=0.85,  # leve transparencia
-            size=6,  # tamaño de punto más visible
-            edgecolor='black',  # borde para contraste
-            linewidth=0.4,
-            palette=palette,  # tus colores personalizados
-            ax=ax
-        )
-
-        # Títulos y etiquetas
-        ax.set_title('Distribución de tiempos de ejecución por agente', fontsize=15, fontweight='bold', pad=15)
-        ax.set_xlabel('Agente de Inteligencia Artificial', fontsize=12)
-        ax.set_ylabel('Tiempo por jugada (milisegundos)', fontsize=12)
-
-        # Estilo clásico y limpio
-        ax.set_facecolor('white')
-        ax.grid(True, linestyle='--', alpha=0.4)
-        sns.despine(left=False, bottom=False)
-
-        # Ajustes visuales finales
-        plt.xticks(fontsize=11)
-        plt.yticks(fontsize=11)
-        plt.tight_layout()
-
-        # Guardar y mostrar
-        plt.savefig('results/graficos/tiempos_ejecucion_clasico.png', dpi=300, bbox_inches='tight')
-        plt.show()
+    def grafico_tasas_victoria(self):
+        self._graficar('tasas_victoria')
 
-    # ============================
-    # 🕓 DURACIÓN DE PARTIDAS
-    # ============================
+    def grafico_tiempo_ejecucion(self):
+        self._graficar('tiempos_ejecucion_clasico')
 
     def grafico_duracion_partidas(self):
-        """Duración promedio de partidas (turnos)"""
-        fig, ax = plt.subplots()
-
-        sns.boxplot(
-            data=self.df,
-            x='agent_name',
-            y='total_turns',
-            palette=palette,
-            showfliers=False,
-            ax=ax
-        )
-
-        ax.set_title('🕓 Duración de Partidas por Agente')
-        ax.set_xlabel('Agente de IA')
-        ax.set_ylabel('Número de Turnos')
-        plt.tight_layout()
-        plt.savefig('results/graficos/duracion_partidas.png', dpi=300, bbox_inches='tight')
-        plt.show()
-
-    # ============================
-    # 📊 DISTRIBUCIÓN DE TIEMPOS
-    # ============================
-
-    import pandas as pd
-    import matplotlib.pyplot as plt
-
-    # Cargar el CSV
-    df = pd.read_csv("uno_agents_detailed.csv")
-
-    # Limpiar columnas innecesarias
-    df = df[['Agente', 'Partida', 'Tiempo_Jugada_ms']]
-
-    # Crear figura con subgráficas
-    agentes = df['Agente'].unique()
-    fig, axes = plt.subplots(2, 2, figsize=(12, 8))
-    axes = axes.flatten()
+        self._graficar('duracion_partidas')
 
-    for i, agente in enumerate(agentes):
-        subset = df[df['Agente'] == agente]
-        axes[i].scatter(subset['Partida'], subset['Tiempo_Jugada_ms'], alpha=0.7)
-        axes[i].set_title(f"Tiempo de juego por partida - {agente}")
-        axes[i].set_xlabel("Partida")
-        axes[i].set_ylabel("Tiempo de Juego (ms)")
-        axes[i].grid(True)
-
-    # Ajustar espacio y mostrar
-    plt.tight_layout()
-    plt.show()
-
-    # ============================
-    # 📈 DISTRIBUCIÓN DE TURNOS
-    # ============================
+    def grafico_distribucion_tiempos(self):
+        self._graficar('distribucion_tiempos')
 
     def grafico_distribucion_turnos(self):
-        """Boxplot de distribución de turnos"""
-        fig, ax = plt.subplots()
-
-        sns.boxplot(
-            data=self.df,
-            x='agent_name',
-            y='total_turns',
-            palette=palette,
-            showfliers=False,
-            width=0.5,
-            ax=ax
-        )
-
-        ax.set_title('📈 Distribución de Turnos por Partida')
-        ax.set_xlabel('Agente de IA')
-        ax.set_ylabel('Turnos Totales')
-        plt.tight_layout()
-        plt.savefig('results/graficos/distribucion_turnos.png', dpi=300, bbox_inches='tight')
-        plt.show()
-
-    # ============================
-    # ⚡ EFICIENCIA
-    # ============================
+        self._graficar('distribucion_turnos')
 
     def grafico_eficiencia(self):
-        """Comparación de eficiencia entre agentes"""
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        eficiencia = self.resultados['eficiencia_stats']
-
-        sns.barplot(
-            x=eficiencia.index,
-            y='eficiencia_tiempo_norm',
-            data=eficiencia,
-            ax=axes[0],
-            palette='coolwarm'
-        )
-        axes[0].set_title('⚡ Eficiencia por Tiempo')
-        axes[0].set_ylabel('Eficiencia Normalizada (%)')
-
-        sns.barplot(
-            x=eficiencia.index,
-            y='eficiencia_turnos_norm',
-            data=eficiencia,
-            ax=axes[1],
-            palette='crest'
-        )
-        axes[1].set_title('🔄 Eficiencia por Turnos')
-        axes[1].set_ylabel('Eficiencia Normalizada (%)')
-
-        for ax in axes:
-            ax.set_xlabel('Agente')
-            ax.grid(axis='y', alpha=0.3)
-
-        plt.tight_layout()
-        plt.savefig('results/graficos/eficiencia_agentes.png', dpi=300, bbox_inches='tight')
-        plt.show()
-
-    # ============================
-    # 🔥 MATRIZ DE CORRELACIÓN
-    # ============================
+        self._graficar('eficiencia_agentes')
 
     def grafico_correlaciones(self):
-        """Matriz de correlaciones entre variables numéricas"""
-        fig, ax = plt.subplots(figsize=(8, 6))
-
-        numeric_df = self.df.select_dtypes(include=['number']).drop(columns=['game_id'], errors='ignore')
-        corr = numeric_df.corr().round(2)
-
-        sns.heatmap(
-            corr,
-            annot=True,
-            fmt=".2f",
-            cmap='Spectral',
-            center=0,
-            linewidths=0.5,
-            square=True,
-            cbar_kws={'shrink': 0.8, 'label': 'Coeficiente de Correlación'},
-            ax=ax
-        )
-
-        ax.set_title('🔥 Correlación entre Variables Numéricas')
-        plt.tight_layout()
-        plt.savefig('results/graficos/matriz_correlacion.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        self._graficar('matriz_correlacion')
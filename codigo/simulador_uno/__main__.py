@@ -0,0 +1,7 @@
+"""python -m simulador_uno: la línea de comandos de cli.py"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
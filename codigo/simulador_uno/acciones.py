@@ -0,0 +1,57 @@
+"""Tabla de categorías y colores de las acciones de UNO
+
+Las acciones legales llegan como ids enteros del espacio de acciones de
+rlcard ('r-0' -> 0, ..., 'draw' -> 60). Esta tabla se construye una sola vez
+y permite clasificar todas las acciones legales con un único indexado NumPy.
+"""
+
+import numpy as np
+from rlcard.games.uno.utils import ACTION_LIST
+
+# Categorías de acción (índices en los arrays de la tabla)
+NUMBER, SKIP, REVERSE, DRAW2, WILD, WILD_DRAW4, DRAW = range(7)
+CATEGORIAS = ('number', 'skip', 'reverse', 'draw2', 'wild', 'wild_draw4', 'draw')
+NUM_CATEGORIAS = len(CATEGORIAS)
+
+# Colores (-1 para la acción de robar, que no tiene color)
+COLORES = ('r', 'g', 'b', 'y')
+
+_CATEGORIA_POR_TRAIT = {
+    'skip': SKIP,
+    'reverse': REVERSE,
+    'draw_2': DRAW2,
+    'wild': WILD,
+    'wild_draw_4': WILD_DRAW4
+}
+
+
+class TablaAcciones:
+    """Categoría y color de cada id de acción, como arrays NumPy"""
+
+    def __init__(self, action_list):
+        self.num_actions = len(action_list)
+        self.categoria = np.empty(self.num_actions, dtype=np.int8)
+        self.color = np.empty(self.num_actions, dtype=np.int8)
+
+        for action_id, action in enumerate(action_list):
+            if action == 'draw':
+                self.categoria[action_id] = DRAW
+                self.color[action_id] = -1
+                continue
+            color, trait = action.split('-')
+            self.categoria[action_id] = _CATEGORIA_POR_TRAIT.get(trait, NUMBER)
+            self.color[action_id] = COLORES.index(color)
+
+    def clasificar(self, legal_actions):
+        """Devuelve (ids, categorías) de las acciones legales de un estado"""
+        ids = np.fromiter(legal_actions, dtype=np.int64)
+        return ids, self.categoria[ids]
+
+
+# Tabla del espacio de acciones de UNO, compartida por todos los agentes
+TABLA_UNO = TablaAcciones(ACTION_LIST)
+
+
+def tamano_mano(state):
+    """Número de cartas en la mano del jugador que decide"""
+    return len(state['raw_obs']['hand'])
@@ -0,0 +1,306 @@
+"""Agentes propios para la simulación de UNO"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+from rlcard.games.uno.utils import ACTION_SPACE
+
+from .acciones import (TABLA_UNO, NUM_CATEGORIAS, NUMBER, SKIP, REVERSE,
+                       DRAW2, WILD, WILD_DRAW4, DRAW, tamano_mano)
+from .cfr import cargar_politica, contar_colores, elegir_accion
+from .mcts import BusquedaMCTS, color_objetivo, nuevo_rng
+
+
+def _prioridades(orden):
+    """Array categoría -> prioridad (0 = primera opción) a partir de grupos ordenados"""
+    prioridad = np.empty(NUM_CATEGORIAS, dtype=np.int8)
+    for nivel, grupo in enumerate(orden):
+        prioridad[list(grupo)] = nivel
+    return prioridad
+
+
+class RandomAgent:
+    """RandomAgent de rlcard (mismas decisiones con el mismo azar) con decisión por lotes
+
+    No hereda de rlcard.agents: importar ese paquete ejecuta `pip freeze` en
+    un subproceso y carga todos sus agentes (y torch si está instalado), lo
+    que tarda más que el resto del simulador.
+    """
+
+    def __init__(self, num_actions):
+        self.use_raw = False
+        self.num_actions = num_actions
+
+    def configuracion(self):
+        """Parámetros que definen sus jugadas (para la huella de la caché)"""
+        return {'num_actions': self.num_actions}
+
+    @staticmethod
+    def step(state):
+        return np.random.choice(list(state['legal_actions'].keys()))
+
+    def eval_step(self, state):
+        probs = [0 for _ in range(self.num_actions)]
+        for i in state['legal_actions']:
+            probs[i] = 1 / len(state['legal_actions'])
+
+        info = {}
+        info['probs'] = {state['raw_legal_actions'][i]: probs[list(state['legal_actions'].keys())[i]]
+                         for i in range(len(state['legal_actions']))}
+        return self.step(state), info
+
+    def batch_step(self, lote):
+        """Una acción legal uniforme por partida: la de mayor clave aleatoria"""
+        mask = lote['legal_mask']
+        claves = np.where(mask, np.random.random(mask.shape), -1.0)
+        return claves.argmax(axis=1)
+
+
+class RuleBasedAgent:
+    """Agente agresivo: SIEMPRE prioriza cartas de ataque (+2, +4, Skip, Reverse)"""
+
+    # Prioridad: +2/+4 > Skip/Reverse > Números > Wilds
+    PRIORIDAD_ATAQUE = _prioridades([(DRAW2, WILD_DRAW4), (SKIP, REVERSE), (NUMBER, DRAW), (WILD,)])
+    # Con 1 carta: jugar lo que sea para ganar, números primero
+    PRIORIDAD_FINAL = _prioridades([(NUMBER, DRAW), (DRAW2, WILD_DRAW4), (SKIP, REVERSE), (WILD,)])
+
+    def __init__(self, num_actions):
+        self.use_raw = False
+        self.num_actions = num_actions
+
+        # Prioridad de cada id de acción, precalculada una vez
+        self._prioridad_ataque = self.PRIORIDAD_ATAQUE[TABLA_UNO.categoria]
+        self._prioridad_final = self.PRIORIDAD_FINAL[TABLA_UNO.categoria]
+
+    def configuracion(self):
+        return {'num_actions': self.num_actions}
+
+    def step(self, state):
+        legal_actions = state['legal_actions']
+
+        if not legal_actions:
+            return None
+
+        ids = np.fromiter(legal_actions, dtype=np.int64)
+
+        # ESTRATEGIA AGRESIVA:
+        # Si tengo 1 carta, jugar lo que sea para ganar;
+        # en cualquier otro caso: ATACAR PRIMERO
+        if tamano_mano(state) <= 1:
+            prioridad = self._prioridad_final[ids]
+        else:
+            prioridad = self._prioridad_ataque[ids]
+
+        # Elegir al azar entre las acciones del grupo más prioritario
+        return np.random.choice(ids[prioridad == prioridad.min()])
+
+    def eval_step(self, state):
+        return self.step(state), []
+
+    def batch_step(self, lote):
+        """step para todas las partidas del lote en una pasada"""
+        mask = lote['legal_mask']
+        prioridad = np.where(lote['hand_size'][:, None] <= 1,
+                             self._prioridad_final, self._prioridad_ataque)
+        prioridad = np.where(mask, prioridad, np.iinfo(np.int8).max)
+
+        # Al azar entre las acciones del grupo más prioritario de cada partida
+        mejores = prioridad == prioridad.min(axis=1, keepdims=True)
+        claves = np.where(mejores, np.random.random(mask.shape), -1.0)
+        return claves.argmax(axis=1)
+
+
+class ProbabilisticAgent:
+    """Agente defensivo: Calcula probabilidades para jugar conservador, guarda cartas especiales"""
+
+    # A partir de este tamaño de mano los pesos ya no cambian (todo > 8 cartas)
+    MAX_BUCKET = 9
+
+    def __init__(self, num_actions, seed=None):
+        self.use_raw = False
+        self.num_actions = num_actions
+        self.rng = np.random.default_rng(seed)
+
+        # Tabla (bucket de tamaño de mano x categoría) con los pesos precalculados
+        self.tabla_pesos = np.array([self.pesos_categoria(hand_size)
+                                     for hand_size in range(self.MAX_BUCKET + 1)])
+        # La misma tabla por id de acción (bucket x 61), para batch_step
+        self.tabla_pesos_accion = self.tabla_pesos[:, TABLA_UNO.categoria]
+
+    def seed(self, seed):
+        """Reinicia el generador propio (el evaluador lo llama antes de cada partida o lote)"""
+        self.rng = np.random.default_rng(seed)
+
+    def configuracion(self):
+        return {'num_actions': self.num_actions}
+
+    @staticmethod
+    def pesos_categoria(hand_size):
+        """Peso de cada categoría de acción según el tamaño de la mano"""
+        pesos = np.ones(NUM_CATEGORIAS)
+
+        # ESTRATEGIA DEFENSIVA: Priorizar números, guardar especiales
+
+        # Factor 1: Cartas numéricas = ALTA PROBABILIDAD
+        pesos[NUMBER] *= 5.0  # MUCHO más probable jugar números
+
+        # Factor 2: Cartas especiales = BAJA PROBABILIDAD (guardar)
+        # Wilds: solo usarlos al final, EVITARLOS hasta entonces
+        pesos[[WILD, WILD_DRAW4]] *= 3.0 if hand_size <= 2 else 0.1
+
+        # +2/+4: usarlos solo si estás cerca de ganar, EVITAR gastarlos temprano
+        pesos[[DRAW2, WILD_DRAW4, DRAW]] *= 2.0 if hand_size <= 3 else 0.3
+
+        # Skip/Reverse: guardarlos salvo al final
+        pesos[[SKIP, REVERSE]] *= 1.5 if hand_size <= 4 else 0.5
+
+        # Factor 3: Si tenemos MUCHAS cartas, ser más agresivo
+        if hand_size > 8:
+            pesos *= 1.5  # Urgencia por deshacerse de cartas
+
+        return pesos
+
+    def step(self, state):
+        legal_actions = state['legal_actions']
+
+        if not legal_actions:
+            return None
+
+        ids, categorias = TABLA_UNO.clasificar(legal_actions)
+
+        # Pesos CONSERVADORES de la tabla, según el tamaño de la mano
+        bucket = min(tamano_mano(state), self.MAX_BUCKET)
+        acumulado = np.cumsum(self.tabla_pesos[bucket, categorias])
+
+        # Muestreo por suma acumulada: evita normalizar y el coste de np.random.choice
+        indice = np.searchsorted(acumulado, self.rng.random() * acumulado[-1], side='right')
+        return ids[indice]
+
+    def eval_step(self, state):
+        return self.step(state), []
+
+    def batch_step(self, lote):
+        """step para todas las partidas del lote: suma acumulada por filas"""
+        bucket = np.minimum(lote['hand_size'], self.MAX_BUCKET)
+        acumulado = np.cumsum(self.tabla_pesos_accion[bucket] * lote['legal_mask'], axis=1)
+        objetivo = self.rng.random(len(bucket)) * acumulado[:, -1]
+        # Primera acción cuyo acumulado supera el objetivo (searchsorted side='right')
+        return (acumulado <= objetivo[:, None]).sum(axis=1)
+
+
+class CFRPolicyAgent:
+    """Agente CFR entrenado con cfr.entrenar_cfr, cargado por nombre de checkpoint
+
+    La política se abre mapeada en memoria; al copiar el agente a otro
+    proceso solo viaja la ruta y el proceso abre el mismo archivo.
+    """
+
+    def __init__(self, num_actions, checkpoint, directorio='modelos_cfr', seed=None):
+        self.use_raw = False
+        self.num_actions = num_actions
+        self.checkpoint = checkpoint
+        self.ruta = os.path.abspath(os.path.join(directorio, checkpoint))
+        self.rng = np.random.default_rng(seed)
+        self._cargar()
+
+    def _cargar(self):
+        self.politica, meta = cargar_politica(self.ruta)
+        self.iteraciones = meta['iteraciones']
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['politica']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cargar()
+
+    def seed(self, seed):
+        """Reinicia el generador propio (el evaluador lo llama antes de cada partida o lote)"""
+        self.rng = np.random.default_rng(seed)
+
+    def configuracion(self):
+        """El checkpoint y el contenido de su política (reentrenar con el mismo nombre la cambia)"""
+        return {'num_actions': self.num_actions, 'checkpoint': self.checkpoint,
+                'politica': hashlib.sha256(np.ascontiguousarray(self.politica).tobytes()).hexdigest()}
+
+    def step(self, state):
+        raw_obs = state['raw_obs']
+        rival = raw_obs['num_cards'][(raw_obs['current_player'] + 1) % raw_obs['num_players']]
+        colores = contar_colores([ACTION_SPACE[carta] for carta in raw_obs['hand']])
+        return elegir_accion(self.politica, list(state['legal_actions']), tamano_mano(state), rival,
+                             colores, color_objetivo(state), self.rng)
+
+    def eval_step(self, state):
+        return self.step(state), []
+
+
+class MCTSAgent:
+    """Agente de búsqueda: ISMCTS con determinización y tiempo limitado por jugada
+
+    Itera hasta agotar su presupuesto (anytime): tiempo_ms por jugada, o la
+    fracción MARGEN_PLAZO del plazo que fije el evaluador con
+    set_move_deadline, para no pasarse por la última iteración. Con
+    max_iteraciones también se corta al llegar a ese número (con tiempo_ms
+    None la búsqueda es reproducible para una semilla dada).
+
+    La tabla de transposición se conserva entre las jugadas de una partida y
+    se vacía al reiniciar la semilla (antes de cada partida o lote).
+    """
+
+    MARGEN_PLAZO = 0.8
+
+    def __init__(self, num_actions, tiempo_ms=5.0, max_iteraciones=None, exploracion=0.7,
+                 max_jugadas_simulacion=40, seed=None):
+        self.use_raw = False
+        self.num_actions = num_actions
+        self.tiempo_ms = tiempo_ms
+        self.max_iteraciones = max_iteraciones
+        self.move_deadline_ms = None
+        self.busqueda = BusquedaMCTS(exploracion, max_jugadas_simulacion)
+        self.rng = nuevo_rng(seed)
+        self.iteraciones = 0    # iteraciones de la última búsqueda
+
+    def seed(self, seed):
+        """Reinicia el generador propio y la tabla de transposición"""
+        self.rng = nuevo_rng(seed)
+        self.busqueda.reiniciar()
+
+    def set_move_deadline(self, move_deadline_ms):
+        """Plazo por jugada que impone el evaluador (None: solo tiempo_ms)"""
+        self.move_deadline_ms = move_deadline_ms
+
+    def configuracion(self):
+        """Parámetros de la búsqueda (sin el plazo del evaluador ni los contadores de la última jugada)"""
+        return {'num_actions': self.num_actions, 'tiempo_ms': self.tiempo_ms,
+                'max_iteraciones': self.max_iteraciones, 'exploracion': self.busqueda.exploracion,
+                'max_jugadas_simulacion': self.busqueda.max_jugadas_simulacion,
+                'max_nodos': self.busqueda.max_nodos}
+
+    def determinista(self, move_deadline_ms=None):
+        """True si sus jugadas solo dependen de la semilla: sin tiempo_ms ni plazo por jugada"""
+        return self.tiempo_ms is None and move_deadline_ms is None
+
+    def presupuesto_ms(self):
+        if self.move_deadline_ms is not None:
+            return self.move_deadline_ms * self.MARGEN_PLAZO
+        return self.tiempo_ms
+
+    def step(self, state):
+        legal_actions = list(state['legal_actions'])
+        if len(legal_actions) == 1:
+            return legal_actions[0]
+
+        presupuesto = self.presupuesto_ms()
+        limite_ns = None if presupuesto is None else time.perf_counter_ns() + int(presupuesto * 1e6)
+        action, self.iteraciones = self.busqueda.buscar(state, self.rng, limite_ns, self.max_iteraciones)
+        if action is None:
+            action = legal_actions[int(self.rng.random() * len(legal_actions))]
+        return action
+
+    def eval_step(self, state):
+        return self.step(state), {'iteraciones': self.iteraciones,
+                                  'descartadas': self.busqueda.descartadas}
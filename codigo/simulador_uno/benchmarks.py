@@ -0,0 +1,419 @@
+"""Benchmarks del simulador
+
+Uso (desde la carpeta codigo/):
+    python -m simulador_uno.benchmarks
+"""
+
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import rlcard
+from rlcard.games.uno.utils import ACTION_LIST
+
+from .acciones import TABLA_UNO, tamano_mano
+from .agentes import CFRPolicyAgent, MCTSAgent, ProbabilisticAgent, RandomAgent, RuleBasedAgent
+from .cfr import entrenar_cfr
+from .evaluador import UNOEvaluator, jugar_bloque
+from .latencias import AgenteCronometrado
+from .motor import EntornoUNO
+from .partida import crear_entorno, estado_jugador, jugar_partida
+from .secuencial import EstadisticaPareja
+
+
+class _AgenteMezcla:
+    """Juega como Reglas con probabilidad p y como Random en otro caso (fuerza graduable)"""
+
+    def __init__(self, p):
+        self.use_raw = False
+        self.p = p
+        self.reglas = RuleBasedAgent(61)
+        self.rng = np.random.default_rng()
+
+    def seed(self, seed):
+        self.rng = np.random.default_rng(seed)
+
+    def step(self, state):
+        if self.rng.random() < self.p:
+            return self.reglas.step(state)
+        legales = list(state['legal_actions'])
+        return legales[int(self.rng.random() * len(legales))]
+
+    def eval_step(self, state):
+        return self.step(state), {}
+
+
+def _jugar_con_env_run(env, agents):
+    """Referencia: la partida tal como la jugaba el evaluador original"""
+    env.set_agents(agents)
+    trajectories, payoffs = env.run(is_training=False)
+    return payoffs, sum(len(traj) for traj in trajectories)
+
+
+def _medir(funcion, env, agents, num_games, seed):
+    """Partidas por segundo y pico de memoria (MB) de un bucle de juego"""
+    env.seed(seed)
+    np.random.seed(seed)
+    start = time.perf_counter()
+    for _ in range(num_games):
+        funcion(env, agents)
+    games_per_sec = num_games / (time.perf_counter() - start)
+
+    # La memoria se mide en una pasada aparte: tracemalloc ralentiza la ejecución
+    env.seed(seed)
+    np.random.seed(seed)
+    tracemalloc.start()
+    for _ in range(num_games):
+        funcion(env, agents)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return games_per_sec, peak / 1024**2
+
+
+def benchmark_bucle(num_games=500, seed=42):
+    """Compara env.run con el bucle sin trayectorias (jugar_partida)"""
+    env = rlcard.make('uno')
+    agents = [RandomAgent(num_actions=env.num_actions) for _ in range(env.num_players)]
+
+    print(f"BENCHMARK BUCLE DE JUEGO ({num_games} partidas Random vs Random)")
+    print("-" * 60)
+    resultados = {}
+    for nombre, funcion in (('env.run', _jugar_con_env_run), ('jugar_partida', jugar_partida)):
+        games_per_sec, peak_mb = _medir(funcion, env, agents, num_games, seed)
+        resultados[nombre] = (games_per_sec, peak_mb)
+        print(f"{nombre:>15}: {games_per_sec:8.1f} partidas/s | pico memoria {peak_mb:6.2f} MB")
+
+    speedup = resultados['jugar_partida'][0] / resultados['env.run'][0]
+    print(f"Aceleración: x{speedup:.2f}")
+    return resultados
+
+
+class _ProbabilisticAgentChoice(ProbabilisticAgent):
+    """ProbabilisticAgent con el muestreo anterior (normalizar + np.random.choice)"""
+
+    def step(self, state):
+        ids, categorias = TABLA_UNO.clasificar(state['legal_actions'])
+        probabilities = self.pesos_categoria(tamano_mano(state))[categorias]
+        probabilities = probabilities / probabilities.sum()
+        return np.random.choice(ids, p=probabilities)
+
+
+def benchmark_probabilistico(num_games=400, seed=42):
+    """Latencia por jugada de ProbabilisticAgent antes/después de la tabla de pesos
+
+    Se informa a través de Tiempo_Jugada_ms del evaluador (Probabilistico vs
+    Random) y, aparte, como coste aislado de una llamada a step.
+    """
+    env = rlcard.make('uno')
+    print(f"BENCHMARK ProbabilisticAgent ({num_games} partidas vs Random)")
+    print("-" * 60)
+
+    resultados = {}
+    for nombre, clase in (('antes (np.random.choice)', _ProbabilisticAgentChoice),
+                          ('después (tabla + cumsum)', ProbabilisticAgent)):
+        agents_dict = {
+            'Random': RandomAgent(num_actions=env.num_actions),
+            'Probabilistico': clase(num_actions=env.num_actions)
+        }
+        evaluator = UNOEvaluator(env, seed=seed)
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            results = evaluator.evaluate_agents(agents_dict, num_games=num_games,
+                                                results_path=os.path.join(tmp, 'partidas.csv'))
+            detailed_df = evaluator.create_detailed_dataframe(results)
+        tiempo_ms = detailed_df.loc[detailed_df['Agente'] == 'Probabilistico', 'Tiempo_Jugada_ms'].mean()
+
+        # Coste aislado de step sobre el estado inicial de una partida
+        agent = agents_dict['Probabilistico']
+        env.seed(seed)
+        state, _ = env.reset()
+        repeticiones = 20000
+        start = time.perf_counter()
+        for _ in range(repeticiones):
+            agent.step(state)
+        step_us = (time.perf_counter() - start) / repeticiones * 1e6
+
+        resultados[nombre] = (tiempo_ms, step_us)
+        print(f"{nombre:>26}: Tiempo_Jugada_ms {tiempo_ms:.4f} | step {step_us:.2f} µs")
+    return resultados
+
+
+def _mismo_estado(a, b):
+    """Compara dos estados de agente clave a clave (obs como array)"""
+    return (np.array_equal(a['obs'], b['obs']) and a['obs'].dtype == b['obs'].dtype
+            and list(a['legal_actions']) == list(b['legal_actions'])
+            and a['raw_obs'] == b['raw_obs']
+            and a['raw_legal_actions'] == b['raw_legal_actions'])
+
+
+def comparar_con_rlcard(num_games=300, seed=0, num_players=2):
+    """Juega las mismas partidas con rlcard y con el motor nativo, paso a paso
+
+    Para cada semilla ambos motores se siembran igual; en cada jugada se
+    comparan los estados completos, la acción se decide una vez y se aplica
+    a los dos, y al final se comparan ganadores, payoffs y cartas restantes.
+    Devuelve la lista de discrepancias (semilla, jugada, 'estado' o 'final'),
+    vacía si los motores coinciden.
+    """
+    env_rlcard = crear_entorno('uno', num_players)
+    env_nativo = EntornoUNO(num_players)
+    agentes = [RandomAgent(num_actions=61), RuleBasedAgent(61), ProbabilisticAgent(61)]
+    discrepancias = []
+    jugadas = 0
+
+    for game_num in range(num_games):
+        semilla = seed + game_num
+        env_rlcard.seed(semilla)
+        env_nativo.seed(semilla)
+        np.random.seed(semilla)
+        # Los tres agentes rotan por los asientos de una partida a otra
+        seats = [agentes[(game_num + seat) % 3] for seat in range(num_players)]
+        for role, agent in enumerate(seats):
+            if hasattr(agent, 'seed'):
+                agent.seed([semilla, role])
+
+        game, nativo = env_rlcard.game, env_nativo.game
+        game.init_game()
+        nativo.init_game()
+
+        while not game.round.is_over:
+            player_id = game.round.current_player
+            state = estado_jugador(game, player_id)
+            if nativo.current_player != player_id or not _mismo_estado(state, env_nativo.estado(player_id)):
+                discrepancias.append((semilla, jugadas, 'estado'))
+                break
+
+            action, _ = seats[player_id].eval_step(state)
+            if action not in state['legal_actions']:
+                action = np.random.choice(list(state['legal_actions']))
+            game.round.proceed_round(game.players, ACTION_LIST[action])
+            nativo.jugar(int(action))
+            jugadas += 1
+        else:
+            restantes = [len(player.hand) for player in game.players]
+            if (not nativo.is_over or game.round.winner != nativo.winner
+                    or list(env_rlcard.get_payoffs()) != list(env_nativo.get_payoffs())
+                    or restantes != [len(hand) for hand in nativo.hands]):
+                discrepancias.append((semilla, jugadas, 'final'))
+
+    print(f"Comparación con rlcard: {num_games} partidas de {num_players}, {jugadas} jugadas, "
+          f"{len(discrepancias)} discrepancias")
+    return discrepancias
+
+
+def benchmark_motores(num_games=1000, seed=42):
+    """Partidas por segundo de cada motor y su coste por jugada sin contar a los agentes
+
+    Juega Random vs Reglas con jugar_partida; el tiempo de los agentes se mide
+    con AgenteCronometrado y se descuenta para obtener el del motor.
+    """
+    print(f"BENCHMARK MOTORES ({num_games} partidas Random vs Reglas)")
+    print("-" * 60)
+    resultados = {}
+    for nombre, env in (('rlcard', rlcard.make('uno')), ('nativo', EntornoUNO())):
+        agents = [AgenteCronometrado(RandomAgent(num_actions=61)), AgenteCronometrado(RuleBasedAgent(61))]
+        env.seed(seed)
+        np.random.seed(seed)
+        start = time.perf_counter_ns()
+        for _ in range(num_games):
+            jugar_partida(env, agents)
+        total_ns = time.perf_counter_ns() - start
+
+        agentes_ns = sum(agent.histograma.total_ns for agent in agents)
+        jugadas = sum(agent.histograma.count for agent in agents)
+        games_per_sec = num_games / (total_ns / 1e9)
+        motor_us = (total_ns - agentes_ns) / jugadas / 1e3
+        resultados[nombre] = (games_per_sec, motor_us)
+        print(f"{nombre:>15}: {games_per_sec:8.1f} partidas/s | motor {motor_us:6.2f} µs/jugada")
+
+    print(f"Aceleración: x{resultados['nativo'][0] / resultados['rlcard'][0]:.2f} partidas/s, "
+          f"x{resultados['rlcard'][1] / resultados['nativo'][1]:.2f} en el motor")
+    return resultados
+
+
+def benchmark_lotes(num_games=2000, seed=42, batch_games=(1, 16, 64, 256)):
+    """Partidas por segundo de jugar_bloque partida a partida y en lotes (Random vs Reglas)"""
+    print(f"BENCHMARK LOTES ({num_games} partidas Random vs Reglas, motor nativo)")
+    print("-" * 60)
+    env = EntornoUNO()
+    agents = [RandomAgent(num_actions=61), RuleBasedAgent(61)]
+    resultados = {}
+    for lote in (None,) + tuple(batch_games):
+        start = time.perf_counter()
+        jugar_bloque(env, agents, seed, (0, 1), range(num_games), batch_games=lote)
+        games_per_sec = num_games / (time.perf_counter() - start)
+        resultados[lote] = games_per_sec
+        nombre = 'partida a partida' if lote is None else f"lotes de {lote}"
+        print(f"{nombre:>20}: {games_per_sec:8.1f} partidas/s")
+    return resultados
+
+
+def benchmark_cfr(iteraciones=4000, num_workers=(1, os.cpu_count()), num_games=2000, seed=42):
+    """Iteraciones/s del entrenamiento CFR, latencia de la política y su fuerza
+
+    La fuerza es la tasa de victoria (modo duplicado, con su IC95 pareado)
+    contra Random y contra Reglas: una política que no ha aprendido nada
+    queda en torno al 50% contra Random y por debajo contra Reglas.
+    """
+    print(f"BENCHMARK CFR ({iteraciones} iteraciones, {num_games} partidas contra Random y Reglas)")
+    print("-" * 60)
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for workers in sorted(set(num_workers)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                entrenar_cfr(f"bench_{workers}", iteraciones, directorio=directorio,
+                             num_workers=workers, seed=seed)
+            its = iteraciones / (time.perf_counter() - start)
+            resultados[f"entrenamiento_{workers}_workers"] = its
+            print(f"{f'entrenamiento ({workers} workers)':>28}: {its:8.0f} it/s")
+
+        env = EntornoUNO()
+        for nombre, rival in (('random', RandomAgent(num_actions=61)), ('reglas', RuleBasedAgent(61))):
+            cfr = CFRPolicyAgent(61, f"bench_{min(num_workers)}", directorio=directorio, seed=seed)
+            bloque = jugar_bloque(env, [cfr, rival], seed, (0, 1), range(num_games), duplicate=True)
+            estadistica = EstadisticaPareja()
+            for deal, rotacion, payoffs in zip(bloque['deals'], bloque['rotations'], bloque['payoffs']):
+                estadistica.registrar(deal, int(payoffs[rotacion] > 0))
+            if nombre == 'random':
+                resultados['latencia_us'] = bloque['latency'][0].media() / 1e3
+                print(f"{'consulta de la política':>28}: {resultados['latencia_us']:8.1f} µs/decisión")
+            resultados[f'tasa_vs_{nombre}'] = estadistica.tasa()
+            resultados[f'ic95_vs_{nombre}'] = estadistica.semiancho_ic95(duplicate=True)
+            print(f"{f'tasa de victoria vs {nombre.capitalize()}':>28}: "
+                  f"{100 * estadistica.tasa():8.1f} % ± {100 * resultados[f'ic95_vs_{nombre}']:.1f}pp")
+    return resultados
+
+
+def benchmark_mcts(plazos_ms=(0.5, 1, 2, 5, 10), num_games=400, seed=42):
+    """Fuerza de MCTSAgent contra Reglas según el plazo por jugada (modo duplicado)
+
+    Para cada plazo: tasa de victoria con su IC95 pareado por reparto,
+    latencia p50/p99, decisiones que se pasaron del plazo e iteraciones de
+    búsqueda descartadas por agotar el mazo.
+    """
+    print(f"BENCHMARK MCTS: fuerza vs plazo ({num_games} partidas contra Reglas por plazo)")
+    print("-" * 60)
+    print(f"{'plazo':>8} {'victorias':>10} {'IC95':>8} {'p50':>9} {'p99':>9} {'excesos':>9} "
+          f"{'descartadas':>14}")
+    env = EntornoUNO()
+    resultados = {}
+    for plazo in plazos_ms:
+        mcts = MCTSAgent(61)
+        agents = [mcts, RuleBasedAgent(61)]
+        bloque = jugar_bloque(env, agents, seed, (0, 1), range(num_games), duplicate=True,
+                              move_deadline_ms=plazo)
+        estadistica = EstadisticaPareja()
+        for deal, rotacion, payoffs in zip(bloque['deals'], bloque['rotations'], bloque['payoffs']):
+            estadistica.registrar(deal, int(payoffs[rotacion] > 0))
+        latencia = bloque['latency'][0]
+        resultados[plazo] = {
+            'tasa_victoria': estadistica.tasa(),
+            'semiancho_ic95': estadistica.semiancho_ic95(duplicate=True),
+            'p50_ms': latencia.percentil(50) / 1e6,
+            'p99_ms': latencia.percentil(99) / 1e6,
+            'excesos': bloque['overruns'][0],
+            'decisiones': latencia.count,
+            'descartadas': mcts.busqueda.descartadas,
+            'iteraciones': mcts.busqueda.iteraciones
+        }
+        r = resultados[plazo]
+        print(f"{plazo:>6} ms {100 * r['tasa_victoria']:>9.1f}% {100 * r['semiancho_ic95']:>6.1f}pp "
+              f"{r['p50_ms']:>7.3f}ms {r['p99_ms']:>7.3f}ms {r['excesos']:>5}/{r['decisiones']} "
+              f"{r['descartadas']:>7}/{r['iteraciones']}")
+    return resultados
+
+
+def benchmark_ratings(num_agents=4, presupuestos=(2000, 8000, 16000), seed=42):
+    """Orden de los ratings con round-robin y con emparejamiento adaptativo
+
+    Agentes que mezclan Reglas y Random en proporciones crecientes, así que
+    el orden real se conoce; para cada presupuesto se mide la correlación de
+    Spearman entre ese orden y el de los ratings conservadores.
+    """
+    print(f"BENCHMARK RATINGS ({num_agents} agentes de fuerza graduada, motor nativo)")
+    print("-" * 60)
+    print(f"{'partidas':>9} {'round-robin':>12} {'adaptativo':>11}")
+    proporciones = np.linspace(0, 1, num_agents)
+    agents = {f"Mezcla_{p:.2f}": _AgenteMezcla(p) for p in proporciones}
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for presupuesto in presupuestos:
+            for matchmaking in ('round_robin', 'adaptive'):
+                evaluator = UNOEvaluator(EntornoUNO(), seed=seed, engine='nativo')
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = evaluator.evaluate_agents(
+                        agents, num_games=presupuesto, batch_size=20, duplicate=True,
+                        results_path=os.path.join(directorio, 'partidas.csv'),
+                        matchmaking=matchmaking)
+                ratings = evaluator.create_ratings_dataframe(results)
+                # Posición real (por p) frente a la posición según los ratings
+                reales = np.argsort(np.argsort(-proporciones))
+                estimadas = ratings.set_index('Agente').loc[list(agents), 'Posicion'].to_numpy()
+                resultados[presupuesto, matchmaking] = np.corrcoef(reales, estimadas)[0, 1]
+            print(f"{presupuesto:>9} {resultados[presupuesto, 'round_robin']:>12.3f} "
+                  f"{resultados[presupuesto, 'adaptive']:>11.3f}")
+    return resultados
+
+
+# Lo que importa cada comando de la CLI antes de empezar a trabajar
+ARRANQUE_COMANDOS = {
+    'python': 'pass',
+    '--help': 'from simulador_uno import cli; cli.crear_parser()',
+    'run': 'import simulador_uno.agentes, simulador_uno.evaluador, simulador_uno.motor',
+    'run (resultados)': 'import simulador_uno.evaluador, pandas',
+    'analyze': ('from simulador_uno.cli import modulo_analisis; '
+                'modulo_analisis("informe"); modulo_analisis("analisis_estadistico")'),
+    'plot': ('from simulador_uno.cli import modulo_analisis; '
+             'modulo_analisis("informe"); modulo_analisis("analisis_estadistico"); '
+             'modulo_analisis("visualizaciones")'),
+    'rlcard.agents (referencia)': 'import rlcard.agents'
+}
+
+
+def benchmark_arranque(repeticiones=5):
+    """Tiempo de arranque (ms) de cada comando de la CLI: mejor de repeticiones procesos nuevos
+
+    Cada medida es un intérprete nuevo que solo importa lo que necesita el
+    comando, así que se puede seguir entre versiones; 'python' es el coste
+    del intérprete vacío.
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [raiz, os.environ.get('PYTHONPATH')])))
+    print("BENCHMARK ARRANQUE (ms, mejor de {} procesos)".format(repeticiones))
+    print("-" * 60)
+    resultados = {}
+    for comando, codigo in ARRANQUE_COMANDOS.items():
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable, '-c', codigo], env=entorno, check=True)
+            tiempos.append(time.perf_counter() - inicio)
+        resultados[comando] = min(tiempos) * 1000
+        print(f"{comando:<28} {resultados[comando]:>8.0f} ms")
+    return resultados
+
+
+if __name__ == "__main__":
+    benchmark_arranque()
+    print()
+    benchmark_bucle()
+    print()
+    benchmark_probabilistico()
+    print()
+    comparar_con_rlcard()
+    benchmark_motores()
+    print()
+    benchmark_lotes()
+    print()
+    benchmark_cfr()
+    print()
+    benchmark_mcts()
+    print()
+    benchmark_ratings()
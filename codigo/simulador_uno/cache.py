@@ -0,0 +1,158 @@
+"""Caché en disco de los bloques de partidas ya jugados
+
+Un bloque (mesa, rango de partidas) es determinista dado el código y la
+configuración de los agentes de la mesa, la semilla maestra, los índices de
+la mesa, el modo duplicado y la versión del motor. Su clave es un hash de
+todo eso, así que al añadir un agente nuevo al final de agents_dict solo se
+juegan los enfrentamientos que faltan; si cambia un agente (código o
+parámetros) o el motor, sus bloques dejan de coincidir y se vuelven a jugar.
+
+El código de un agente es el de su módulo y el de todos los módulos del
+simulador (o de su propio paquete) de los que toma nombres, así que cambiar
+p. ej. acciones.py o cfr.elegir_accion también invalida sus bloques. Sus
+parámetros son los que devuelve su método configuracion(); los agentes sin
+él se describen por sus atributos simples, lo que solo es fiable si no
+cambian durante la partida.
+
+La versión del motor es igual un hash: el nombre del entorno y la versión
+de rlcard más el código que juega las partidas (motor, bucle de partida,
+asientos y lotes) y el de las funciones del evaluador que reparten las
+semillas y juegan los bloques (huella_motor).
+
+Un agente cuyas jugadas dependen del reloj (p. ej. MCTSAgent con tiempo_ms
+o con un plazo por jugada) no es reproducible: sus bloques no se guardan ni
+se leen de la caché (cacheable).
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+
+import numpy as np
+
+from . import latencias, lote, mesas, motor, partida
+
+# Atributos que entran en la huella de un agente sin configuracion(); el resto
+# (entornos, generadores aleatorios, ...) no define su comportamiento en una partida
+_TIPOS_CONFIG = (bool, int, float, str, tuple, list, dict, np.ndarray, type(None))
+
+_PAQUETE = __name__.split('.')[0]
+
+# Módulos que deciden cómo se juega una partida (reglas, bucle, asientos, lotes y plazos)
+_MODULOS_MOTOR = (motor, partida, mesas, lote, latencias)
+
+
+def _modulos_usados(modulo, paquetes, vistos):
+    """modulo y, recursivamente, los módulos de paquetes de los que toma nombres"""
+    if modulo is None or modulo.__name__ in vistos:
+        return
+    vistos[modulo.__name__] = modulo
+    for valor in list(vars(modulo).values()):
+        usado = valor if inspect.ismodule(valor) else inspect.getmodule(valor)
+        if usado is not None and usado.__name__.split('.')[0] in paquetes:
+            _modulos_usados(usado, paquetes, vistos)
+
+
+def _fuente(objeto):
+    try:
+        return inspect.getsource(objeto)
+    except (OSError, TypeError):
+        return ''
+
+
+def huella_agente(agent):
+    """Hash de la clase, el código de los módulos que usa y la configuración de un agente"""
+    cls = type(agent)
+    modulo = inspect.getmodule(cls)
+    modulos = {}
+    _modulos_usados(modulo, {_PAQUETE, cls.__module__.split('.')[0]}, modulos)
+
+    h = hashlib.sha256()
+    h.update(f"{cls.__module__}.{cls.__qualname__}".encode())
+    # La clase aparte: un agente definido en un notebook no tiene archivo de módulo
+    h.update(_fuente(cls).encode())
+    for nombre, usado in sorted(modulos.items()):
+        h.update(nombre.encode())
+        h.update(_fuente(usado).encode())
+
+    if hasattr(agent, 'configuracion'):
+        configuracion = sorted(agent.configuracion().items())
+    else:
+        configuracion = [(name, value) for name, value in sorted(vars(agent).items())
+                         if isinstance(value, _TIPOS_CONFIG)]
+    for name, value in configuracion:
+        h.update(name.encode())
+        h.update(pickle.dumps(value, protocol=4))
+    return h.hexdigest()
+
+
+def huella_motor(env, *funciones):
+    """Hash del motor de env y del código que juega las partidas
+
+    funciones: las del llamador que también deciden las partidas (p. ej. la
+    semilla de cada una).
+    """
+    h = hashlib.sha256(partida.version_motor(env).encode())
+    for objeto in (*_MODULOS_MOTOR, *funciones):
+        h.update(getattr(objeto, '__qualname__', objeto.__name__).encode())
+        h.update(_fuente(objeto).encode())
+    return h.hexdigest()
+
+
+def cacheable(agent, move_deadline_ms=None):
+    """False si las jugadas del agente dependen del tiempo (método determinista, si lo tiene)"""
+    determinista = getattr(agent, 'determinista', None)
+    return determinista is None or determinista(move_deadline_ms)
+
+
+class CacheResultados:
+    """Bloques de partidas guardados como un pickle por clave en un directorio"""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(huellas, seed, table, start, stop, duplicate, version_motor, batch_games=None,
+              move_deadline_ms=None):
+        """Clave de un bloque: agentes, semillas, versión del motor, tamaño de lote y plazo
+
+        huellas son las de los agentes de la mesa, en su orden.
+        """
+        partes = (tuple(huellas), seed, table, start, stop, duplicate, version_motor)
+        if batch_games:
+            # El modo por lotes consume el azar de los agentes de otra forma
+            partes += (batch_games,)
+        if move_deadline_ms is not None:
+            # El plazo cambia las jugadas (búsquedas más cortas, sustituciones)
+            partes += (('plazo', move_deadline_ms),)
+        return hashlib.sha256(repr(partes).encode()).hexdigest()
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + '.pkl')
+
+    def contiene(self, clave):
+        return os.path.exists(self._ruta(clave))
+
+    def obtener(self, clave):
+        """Bloque guardado con esa clave, o None"""
+        ruta = self._ruta(clave)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, 'rb') as f:
+            return pickle.load(f)
+
+    def guardar(self, clave, bloque):
+        """Guarda un bloque de forma atómica"""
+        ruta = self._ruta(clave)
+        tmp_path = ruta + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(bloque, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, ruta)
+
+    def limpiar(self):
+        """Borra todos los bloques guardados"""
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith('.pkl') or nombre.endswith('.tmp'):
+                os.remove(os.path.join(self.directorio, nombre))
@@ -0,0 +1,312 @@
+"""Entrenamiento CFR para UNO con tablas en disco mapeadas en memoria
+
+El CFRAgent de rlcard recorre el árbol completo del juego en cada iteración
+(con step_back), algo inabordable en UNO, así que en main() nunca llegaba a
+entrenarse y jugaba al azar. Aquí se entrena con MCCFR por muestreo de
+resultados (una partida por iteración) sobre una abstracción pequeña:
+
+- Conjunto de información: cartas propias (hasta 9), cartas del siguiente
+  jugador (hasta 9), cuántas cartas propias son del color vigente (0, 1 o
+  2 o más) y qué categorías de acción son legales (7 bits).
+- Acción: la categoría (número, salto, reversa, +2, comodín, +4, robar); la
+  carta concreta es la del color del que más cartas quedan en la mano
+  (empates al azar), que en los comodines es el color que se elige.
+
+El muestreo de resultados pondera cada regret con el cociente entre la
+probabilidad de la estrategia y la de muestreo; en partidas de decenas de
+jugadas ese cociente crece sin control y unas pocas partidas dominan las
+tablas. Por eso se usa solo la parte del cociente posterior al nodo (la
+anterior es común a sus acciones), acotada en MAX_PESO, y una exploración
+epsilon baja.
+
+Regrets, estrategia acumulada y política media se guardan como .npy en
+directorio/nombre y se abren con mmap_mode='r': los procesos de evaluación
+comparten las páginas del archivo en lugar de cargar una copia cada uno.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .acciones import NUM_CATEGORIAS, TABLA_UNO
+from .motor import COMODIN, nuevo_juego
+
+ABSTRACCION = 'mano9-rival9-color3-categorias7'
+MAX_MANO = 9
+MAX_EN_COLOR = 2
+NUM_INFOSETS = (MAX_MANO + 1) * (MAX_MANO + 1) * (MAX_EN_COLOR + 1) * (1 << NUM_CATEGORIAS)
+# Cota del peso de importancia de cada regret
+MAX_PESO = 20.0
+
+# Categoría de cada id de acción, como tupla para el bucle de entrenamiento
+_CATEGORIA = tuple(TABLA_UNO.categoria.tolist())
+
+
+def indice_infoset(cartas_propias, cartas_rival, en_color, categorias):
+    """Fila de las tablas para una decisión
+
+    en_color: cartas propias (sin comodines) del color vigente; categorias:
+    las de las acciones legales.
+    """
+    mascara = 0
+    for categoria in categorias:
+        mascara |= 1 << categoria
+    fila = min(cartas_propias, MAX_MANO) * (MAX_MANO + 1) + min(cartas_rival, MAX_MANO)
+    fila = fila * (MAX_EN_COLOR + 1) + min(en_color, MAX_EN_COLOR)
+    return fila * (1 << NUM_CATEGORIAS) + mascara
+
+
+def contar_colores(codigos):
+    """Cartas de cada color (r, g, b, y) entre los ids de acción de una mano, sin comodines"""
+    colores = [0, 0, 0, 0]
+    for codigo in codigos:
+        color, figura = divmod(codigo, 15)
+        if figura < COMODIN:
+            colores[color] += 1
+    return colores
+
+
+def _regret_matching(regrets):
+    """Estrategia proporcional a los regrets positivos (uniforme si no hay)"""
+    positivos = [r if r > 0 else 0.0 for r in regrets]
+    total = sum(positivos)
+    if total > 0:
+        return [r / total for r in positivos]
+    return [1.0 / len(regrets)] * len(regrets)
+
+
+def _muestrear(probs, u):
+    """Índice elegido con probabilidades probs para un uniforme u en [0, 1)"""
+    acumulado = 0.0
+    for indice, p in enumerate(probs):
+        acumulado += p
+        if u < acumulado:
+            return indice
+    return len(probs) - 1
+
+
+def _categorias_legales(legales):
+    """Categorías presentes en las acciones legales, ordenadas"""
+    return sorted({_CATEGORIA[accion] for accion in legales})
+
+
+def _elegir_carta(legales, categoria, colores, rng):
+    """Acción legal de la categoría, del color con más cartas en la mano (empates al azar)"""
+    candidatas = [accion for accion in legales if _CATEGORIA[accion] == categoria]
+    if len(candidatas) > 1:
+        mejor = max(colores[accion // 15] for accion in candidatas)
+        candidatas = [accion for accion in candidatas if colores[accion // 15] == mejor]
+    return candidatas[int(rng.integers(len(candidatas)))]
+
+
+def elegir_accion(politica, legales, cartas_propias, cartas_rival, colores, color_vigente, rng):
+    """Acción (id) según una tabla de política por categorías
+
+    colores: cartas de la mano por color (contar_colores); color_vigente: el
+    de la carta objetivo.
+    """
+    categorias = _categorias_legales(legales)
+    fila = politica[indice_infoset(cartas_propias, cartas_rival, colores[color_vigente], categorias)]
+    probs = [float(fila[categoria]) for categoria in categorias]
+    total = sum(probs)
+    probs = [p / total for p in probs] if total > 0 else [1.0 / len(categorias)] * len(categorias)
+
+    categoria = categorias[_muestrear(probs, rng.random())]
+    return _elegir_carta(legales, categoria, colores, rng)
+
+
+def _iteracion(game, regrets, traverser, epsilon, rng, delta_regrets, delta_estrategia):
+    """Una iteración de MCCFR por muestreo de resultados sobre una partida
+
+    El jugador traverser explora (epsilon uniforme + (1-epsilon) estrategia);
+    el rival juega su estrategia. Al final se reparten regrets y estrategia
+    acumulada por los conjuntos de información de traverser que se
+    visitaron. El peso de cada regret es la utilidad por el cociente
+    estrategia/muestreo desde la acción elegida hasta el final, acotado en
+    MAX_PESO; la estrategia acumulada suma sigma en cada visita.
+    """
+    nodos = []
+
+    while not game.is_over:
+        player = game.current_player
+        legales = game.acciones_legales(player)
+        categorias = _categorias_legales(legales)
+        colores = contar_colores([game.codigo(carta) for carta in game.hands[player]])
+        infoset = indice_infoset(len(game.hands[player]),
+                                 len(game.hands[(player + 1) % game.num_players]),
+                                 colores[game.color[game.target]], categorias)
+        sigma = _regret_matching([regrets[infoset][categoria] for categoria in categorias])
+
+        if player == traverser:
+            k = len(categorias)
+            probs = [epsilon / k + (1 - epsilon) * s for s in sigma]
+            elegida = _muestrear(probs, rng.random())
+            nodos.append((infoset, categorias, sigma, elegida, probs[elegida]))
+        else:
+            elegida = _muestrear(sigma, rng.random())
+
+        game.jugar(_elegir_carta(legales, categorias[elegida], colores, rng))
+
+    utilidad = game.get_payoffs()[traverser]
+
+    # Hacia atrás: cola = cociente estrategia/muestreo de traverser desde la acción del nodo
+    cola = 1.0
+    for infoset, categorias, sigma, elegida, q in reversed(nodos):
+        cola /= q
+        w = utilidad * min(cola, MAX_PESO)
+        regrets_nodo = delta_regrets.setdefault(infoset, [0.0] * NUM_CATEGORIAS)
+        estrategia_nodo = delta_estrategia.setdefault(infoset, [0.0] * NUM_CATEGORIAS)
+        for posicion, categoria in enumerate(categorias):
+            regrets_nodo[categoria] += w * ((posicion == elegida) - sigma[elegida])
+            estrategia_nodo[categoria] += sigma[posicion]
+        cola *= sigma[elegida]
+
+
+def _entrenar_tarea(regrets, seed, inicio, iteraciones, epsilon):
+    """Tarea del pool: iteraciones [inicio, inicio + iteraciones) con regrets fijos
+
+    Devuelve los incrementos de regrets y estrategia acumulada como
+    diccionarios dispersos {fila: [7 valores]} y el número de iteraciones
+    descartadas.
+    """
+    regrets = regrets.tolist()
+    delta_regrets, delta_estrategia = {}, {}
+    descartadas = 0
+    for iteracion in range(inicio, inicio + iteraciones):
+        rng = np.random.default_rng([seed, iteracion])
+        game = nuevo_juego(int(rng.integers(2**31 - 1)))
+        try:
+            _iteracion(game, regrets, iteracion % 2, epsilon, rng, delta_regrets, delta_estrategia)
+        except IndexError:
+            # Mazo y descarte agotados (deck.pop() del motor): la partida no puede
+            # terminar y se descarta sin actualizar nada; cualquier otro error es un fallo
+            descartadas += 1
+    return delta_regrets, delta_estrategia, descartadas
+
+
+class TablasCFR:
+    """Regrets, estrategia acumulada y metadatos de un modelo CFR"""
+
+    def __init__(self, regrets=None, estrategia=None, meta=None):
+        forma = (NUM_INFOSETS, NUM_CATEGORIAS)
+        self.regrets = regrets if regrets is not None else np.zeros(forma)
+        self.estrategia = estrategia if estrategia is not None else np.zeros(forma)
+        self.meta = meta or {'abstraccion': ABSTRACCION, 'iteraciones': 0}
+        # Iteraciones cuya partida no pudo terminar (checkpoints anteriores no lo llevan)
+        self.meta.setdefault('descartadas', 0)
+
+    def acumular(self, delta_regrets, delta_estrategia):
+        for infoset, valores in delta_regrets.items():
+            self.regrets[infoset] += valores
+        for infoset, valores in delta_estrategia.items():
+            self.estrategia[infoset] += valores
+
+    def politica_media(self):
+        """Estrategia media normalizada por fila (float32; filas sin visitar a cero)"""
+        totales = self.estrategia.sum(axis=1, keepdims=True)
+        politica = np.divide(self.estrategia, totales, out=np.zeros_like(self.estrategia),
+                             where=totales > 0)
+        return politica.astype(np.float32)
+
+
+def _guardar_npy(path, array):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def guardar_modelo(ruta, tablas):
+    """Guarda las tablas en ruta/ (cada archivo de forma atómica, meta.json el último)"""
+    os.makedirs(ruta, exist_ok=True)
+    _guardar_npy(os.path.join(ruta, 'regrets.npy'), tablas.regrets)
+    _guardar_npy(os.path.join(ruta, 'estrategia.npy'), tablas.estrategia)
+    _guardar_npy(os.path.join(ruta, 'politica.npy'), tablas.politica_media())
+    tmp_path = os.path.join(ruta, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(tablas.meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(ruta, 'meta.json'))
+
+
+def cargar_meta(ruta):
+    """Metadatos de un modelo guardado, o None si no existe"""
+    path = os.path.join(ruta, 'meta.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cargar_politica(ruta):
+    """Política media mapeada en memoria (solo lectura, compartida entre procesos)"""
+    meta = cargar_meta(ruta)
+    if meta is None:
+        raise FileNotFoundError(f"No hay ningún modelo CFR en {ruta}")
+    if meta['abstraccion'] != ABSTRACCION:
+        raise ValueError(f"El modelo de {ruta} usa otra abstracción ({meta['abstraccion']})")
+    return np.load(os.path.join(ruta, 'politica.npy'), mmap_mode='r'), meta
+
+
+def entrenar_cfr(nombre, iteraciones, directorio='modelos_cfr', num_workers=1,
+                 iteraciones_por_ronda=2000, iteraciones_por_tarea=250, epsilon=0.2, seed=0,
+                 checkpoint_every=1):
+    """Entrena (o continúa entrenando) el modelo directorio/nombre hasta iteraciones
+
+    Cada ronda de iteraciones_por_ronda iteraciones se parte en tareas de
+    iteraciones_por_tarea que se reparten entre num_workers procesos; todas
+    parten de los regrets del final de la ronda anterior y sus incrementos
+    se suman en orden, así que el resultado no depende del número de
+    workers. Cada checkpoint_every rondas se guarda el modelo; si ya existe
+    un checkpoint se continúa desde él.
+    """
+    ruta = os.path.join(directorio, nombre)
+    meta = cargar_meta(ruta)
+    if meta is not None:
+        if meta['abstraccion'] != ABSTRACCION:
+            raise ValueError(f"El checkpoint de {ruta} usa otra abstracción ({meta['abstraccion']})")
+        tablas = TablasCFR(np.load(os.path.join(ruta, 'regrets.npy')),
+                           np.load(os.path.join(ruta, 'estrategia.npy')), meta)
+        print(f"Continuando {nombre} desde la iteración {meta['iteraciones']}")
+    else:
+        tablas = TablasCFR()
+        tablas.meta.update({'nombre': nombre, 'seed': seed, 'epsilon': epsilon})
+
+    executor = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+    try:
+        rondas = 0
+        start = time.perf_counter()
+        iteracion_inicial = tablas.meta['iteraciones']
+        while tablas.meta['iteraciones'] < iteraciones:
+            inicio = tablas.meta['iteraciones']
+            ronda = min(iteraciones_por_ronda, iteraciones - inicio)
+            tareas = [(inicio + k, min(iteraciones_por_tarea, ronda - k))
+                      for k in range(0, ronda, iteraciones_por_tarea)]
+
+            args = [(tablas.regrets, tablas.meta['seed'], inicio_tarea, n, tablas.meta['epsilon'])
+                    for inicio_tarea, n in tareas]
+            if executor is not None:
+                resultados = [future.result() for future in
+                              [executor.submit(_entrenar_tarea, *arg) for arg in args]]
+            else:
+                resultados = [_entrenar_tarea(*arg) for arg in args]
+            for delta_regrets, delta_estrategia, descartadas in resultados:
+                tablas.acumular(delta_regrets, delta_estrategia)
+                tablas.meta['descartadas'] += descartadas
+
+            tablas.meta['iteraciones'] += sum(n for _, n in tareas)
+            rondas += 1
+            if rondas % checkpoint_every == 0:
+                guardar_modelo(ruta, tablas)
+                hechas = tablas.meta['iteraciones'] - iteracion_inicial
+                print(f"  {nombre}: {tablas.meta['iteraciones']}/{iteraciones} iteraciones "
+                      f"({hechas / (time.perf_counter() - start):.0f} it/s, "
+                      f"{tablas.meta['descartadas']} descartadas)")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    guardar_modelo(ruta, tablas)
+    return tablas
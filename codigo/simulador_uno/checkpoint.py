@@ -0,0 +1,31 @@
+"""Checkpoints de una evaluación en curso, para poder reanudarla"""
+
+import os
+import pickle
+
+
+def guardar_checkpoint(path, estado):
+    """Guarda el estado de forma atómica (un corte a mitad nunca deja un archivo roto)"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def cargar_checkpoint(path):
+    """Carga el último checkpoint guardado, o None si no existe"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def validar_checkpoint(estado, seed, config):
+    """Comprueba que el checkpoint corresponde a la misma evaluación"""
+    if estado.get('config') != config:
+        raise ValueError("El checkpoint no corresponde a esta evaluación (agentes, num_games, "
+                         "chunk_size, modo duplicado o parámetros de parada distintos)")
+    if estado['seed'] != seed:
+        print(f"Aviso: se usa la semilla del checkpoint ({estado['seed']}) en lugar de {seed}")
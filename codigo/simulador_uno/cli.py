@@ -0,0 +1,149 @@
+"""Línea de comandos: simular partidas (run), analizar runs (analyze) y graficarlos (plot)
+
+Uso, con el paquete instalado (pip install -e .[analisis] desde la raíz):
+    uno-agentes run --agents Random Reglas --games 2000 --workers 4 --seed 42
+    uno-agentes analyze ../datasets_generados --workers 4
+    uno-agentes plot ../datasets_generados
+
+o sin instalar, desde la carpeta codigo/: python -m simulador_uno ...
+
+Este módulo solo importa argparse: cada comando importa lo que necesita al
+ejecutarse (rlcard y el simulador en run, pandas al escribir los
+resultados, scipy en analyze y además matplotlib/seaborn en plot), así que
+`--help` y los errores de argumentos son inmediatos. El tiempo de arranque
+de cada comando se mide con benchmarks.benchmark_arranque.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+
+AGENTES = ('Random', 'Reglas', 'Probabilistico', 'CFR', 'MCTS')
+ENGINES = ('rlcard', 'nativo')
+
+
+def crear_agente(nombre, num_actions, cfr_checkpoint='uno_cfr', directorio_cfr='modelos_cfr'):
+    """Agente por su nombre en los resultados (los de codigo.ipynb)"""
+    from . import agentes
+
+    if nombre == 'Random':
+        return agentes.RandomAgent(num_actions=num_actions)
+    if nombre == 'Reglas':
+        return agentes.RuleBasedAgent(num_actions=num_actions)
+    if nombre == 'Probabilistico':
+        return agentes.ProbabilisticAgent(num_actions=num_actions)
+    if nombre == 'CFR':
+        return agentes.CFRPolicyAgent(num_actions=num_actions, checkpoint=cfr_checkpoint,
+                                      directorio=directorio_cfr)
+    if nombre == 'MCTS':
+        return agentes.MCTSAgent(num_actions=num_actions)
+    raise ValueError(f"Agente desconocido: {nombre!r} (opciones: {', '.join(AGENTES)})")
+
+
+def modulo_analisis(nombre):
+    """Módulo de analisis_final/src: instalado como analisis_uno o, si no, desde el repositorio"""
+    if importlib.util.find_spec('analisis_uno') is not None:
+        return importlib.import_module(f'analisis_uno.{nombre}')
+    raiz = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, 'analisis_final')
+    if not os.path.isdir(os.path.join(raiz, 'src')):
+        raise ImportError("No se encuentra el paquete de análisis: instala el proyecto con "
+                          "pip install -e .[analisis]")
+    sys.path.insert(0, os.path.normpath(raiz))
+    return importlib.import_module(f'src.{nombre}')
+
+
+def comando_run(args):
+    """Juega num_games partidas entre los agentes y guarda resumen y detallado"""
+    from .evaluador import UNOEvaluator
+    from .motor import EntornoUNO
+    from .partida import crear_entorno
+
+    env = EntornoUNO() if args.engine == 'nativo' else crear_entorno('uno')
+    agents = {nombre: crear_agente(nombre, env.num_actions, args.cfr_checkpoint)
+              for nombre in args.agents}
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    ruta = lambda nombre: os.path.join(args.output_dir, f'{args.prefix}_{nombre}.csv')
+
+    evaluator = UNOEvaluator(env, seed=args.seed, engine=args.engine)
+    results = evaluator.evaluate_agents(agents, num_games=args.games, num_workers=args.workers,
+                                        results_path=ruta('games'), duplicate=args.duplicate,
+                                        batch_games=args.batch_games,
+                                        players_per_table=args.players,
+                                        telemetry_path=args.telemetry, metrics_path=args.metrics,
+                                        telemetry_interval=args.telemetry_interval,
+                                        profile_dir=args.profile, profile_fraction=args.profile_fraction)
+
+    summary_df = evaluator.create_summary_dataframe(results)
+    print(summary_df.to_string(index=False))
+    summary_df.to_csv(ruta('summary'), index=False)
+    evaluator.write_detailed_csv(results, ruta('detailed'))
+    print(f"\n✓ Archivos guardados: {ruta('summary')}, {ruta('detailed')}, {ruta('games')}")
+    return 0
+
+
+def comando_analyze(args, graficos=False):
+    """Análisis estadístico de los runs de origen (resultados en results/)"""
+    import warnings
+    warnings.filterwarnings('ignore')
+
+    informe = modulo_analisis('informe')
+    informe.ejecutar(args.origen, graficos=graficos, num_workers=args.workers, seed=args.seed,
+                     perfil_dir=args.profile, fraccion_perfil=args.profile_fraction)
+    return 0
+
+
+def comando_plot(args):
+    """Análisis y gráficos de los runs de origen (PNG en results/graficos/)"""
+    return comando_analyze(args, graficos=True)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='uno-agentes', description=__doc__.splitlines()[0])
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    run = comandos.add_parser('run', help='simular partidas entre agentes')
+    run.add_argument('--agents', nargs='+', choices=AGENTES, default=['Random', 'Reglas'])
+    run.add_argument('--games', type=int, default=1000, help='partidas totales (por defecto 1000)')
+    run.add_argument('--workers', type=int, default=1, help='procesos (por defecto 1)')
+    run.add_argument('--seed', type=int, default=42, help='semilla maestra (por defecto 42)')
+    run.add_argument('--engine', choices=ENGINES, default='nativo',
+                     help='motor de las partidas (por defecto nativo)')
+    run.add_argument('--duplicate', action='store_true', help='cada reparto con cada rotación de asientos')
+    run.add_argument('--batch-games', type=int, default=None, help='partidas en lockstep por lote')
+    run.add_argument('--players', type=int, default=2, choices=(2, 3, 4), help='jugadores por mesa')
+    run.add_argument('--cfr-checkpoint', default='uno_cfr', help='modelo de modelos_cfr/ para CFR')
+    run.add_argument('--output-dir', default='.', help='carpeta de los CSV (por defecto la actual)')
+    run.add_argument('--prefix', default='uno_agents', help='prefijo de los CSV (por defecto uno_agents)')
+    run.add_argument('--telemetry', default=None, help='JSONL con el progreso de la evaluación')
+    run.add_argument('--metrics', default=None, help='archivo de métricas en formato Prometheus')
+    run.add_argument('--telemetry-interval', type=float, default=5.0,
+                     help='segundos entre eventos de telemetría (por defecto 5)')
+    run.add_argument('--profile', default=None, help='carpeta de los informes de perfilado')
+    run.add_argument('--profile-fraction', type=float, default=0.1,
+                     help='fracción de partidas perfiladas (por defecto 0.1)')
+    run.set_defaults(funcion=comando_run)
+
+    for nombre, funcion, ayuda in (('analyze', comando_analyze, 'analizar uno o varios runs'),
+                                   ('plot', comando_plot, 'analizar y graficar uno o varios runs')):
+        sub = comandos.add_parser(nombre, help=ayuda)
+        sub.add_argument('origen', nargs='?', default='data/uno_agents_detailed.csv',
+                         help='CSV detallado, directorio de runs o glob')
+        sub.add_argument('--workers', type=int, default=1,
+                         help='procesos del bootstrap y de los gráficos (por defecto 1)')
+        sub.add_argument('--seed', type=int, default=0, help='semilla del bootstrap (por defecto 0)')
+        sub.add_argument('--profile', default=None, help='carpeta de los informes de perfilado')
+        sub.add_argument('--profile-fraction', type=float, default=1.0,
+                         help='fracción de etapas perfiladas (por defecto todas)')
+        sub.set_defaults(funcion=funcion)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
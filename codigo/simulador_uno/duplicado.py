@@ -0,0 +1,80 @@
+"""Análisis pareado por reparto de una evaluación en modo duplicado
+
+En modo duplicado cada reparto se juega dos veces con los asientos
+cambiados. La puntuación de un agente en un reparto es la media de sus dos
+partidas (0, 0.5 o 1): la suerte del reparto afecta igual a los dos agentes
+y se cancela, así que la varianza por reparto es menor que la de partidas
+independientes.
+"""
+
+import numpy as np
+
+from .registro import leer_registro
+
+
+def analizar_duplicado(path, agent_names, chunksize=100000):
+    """Tasa de victoria pareada por reparto y reducción de varianza de cada pareja
+
+    Para cada pareja (A, B), con A el primero en agent_names, compara la
+    varianza de la tasa de victoria de A estimada con partidas independientes,
+    p(1-p)/partidas, con la estimada a partir de las medias por reparto,
+    var(reparto)/repartos. Reduccion_Varianza es el cociente y
+    Partidas_Equivalentes las partidas independientes que harían falta para
+    la misma precisión. Si la varianza pareada es nula (p. ej. en un
+    espejo, donde cada reparto acaba en una victoria y una derrota) el
+    cociente no está definido y ambas columnas son NaN.
+    """
+    import pandas as pd
+    orden = {name: i for i, name in enumerate(agent_names)}
+    stats = {}
+    primera = {}  # (A, B, reparto) -> victoria de A en la primera partida del reparto
+
+    for chunk in leer_registro(path, chunksize):
+        for agent1, agent2, deal, payoff1, payoff2 in zip(
+                chunk['Agente_1'], chunk['Agente_2'], chunk['Reparto'],
+                chunk['Payoff_1'], chunk['Payoff_2']):
+            if orden[agent1] < orden[agent2]:
+                pareja, victoria = (agent1, agent2), int(payoff1 > 0)
+            else:
+                pareja, victoria = (agent2, agent1), int(payoff2 > 0)
+
+            s = stats.setdefault(pareja, {'partidas': 0, 'victorias': 0, 'repartos': 0,
+                                          'suma': 0.0, 'suma2': 0.0})
+            s['partidas'] += 1
+            s['victorias'] += victoria
+
+            clave = pareja + (deal,)
+            if clave not in primera:
+                primera[clave] = victoria
+                continue
+            puntuacion = (primera.pop(clave) + victoria) / 2
+            s['repartos'] += 1
+            s['suma'] += puntuacion
+            s['suma2'] += puntuacion ** 2
+
+    filas = []
+    for (agent_a, agent_b), s in stats.items():
+        if s['repartos'] < 2:
+            continue
+        p = s['victorias'] / s['partidas']
+        var_independiente = p * (1 - p) / s['partidas']
+
+        media = s['suma'] / s['repartos']
+        var_reparto = (s['suma2'] - s['repartos'] * media ** 2) / (s['repartos'] - 1)
+        var_pareada = max(var_reparto, 0.0) / s['repartos']
+
+        # Las puntuaciones son múltiplos de 0.5: por debajo de esto la varianza es solo redondeo
+        reduccion = var_independiente / var_pareada if var_pareada > 1e-12 else np.nan
+        filas.append({
+            'Agente_A': agent_a,
+            'Agente_B': agent_b,
+            'Repartos': s['repartos'],
+            'Partidas': s['partidas'],
+            'Tasa_Victoria_A_%': p * 100,
+            'IC95_Independiente_pp': 1.96 * np.sqrt(var_independiente) * 100,
+            'IC95_Pareado_pp': 1.96 * np.sqrt(var_pareada) * 100,
+            'Reduccion_Varianza': reduccion,
+            'Partidas_Equivalentes': s['partidas'] * reduccion
+        })
+
+    return pd.DataFrame(filas)
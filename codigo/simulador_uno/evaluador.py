@@ -0,0 +1,797 @@
+"""Sistema de evaluación de agentes UNO (secuencial o en paralelo)"""
+
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+# pandas se importa solo al crear los DataFrames de resultados: el bucle de
+# juego y los workers del pool no lo necesitan
+from .cache import CacheResultados, cacheable, huella_agente, huella_motor
+from .checkpoint import cargar_checkpoint, guardar_checkpoint, validar_checkpoint
+from .duplicado import analizar_duplicado
+from .latencias import AgenteCronometrado, HistogramaLatencia
+from .lote import jugar_lote
+from .motor import EntornoUNO, nuevo_juego
+from .mesas import asiento_de_rol, etiqueta_mesa, generar_mesas, reparto_y_rotacion, roles_por_asiento
+from .perfilado import CONTABILIDAD, MOTOR, Perfilador
+from .partida import crear_entorno, ganadores, jugar_partida, resultado_mesa
+from .registro import (RegistroPartidas, agregar_asientos, agregar_registro, escribir_detallado,
+                       leer_detallado)
+from .ratings import TablaRatings, planificar_ronda_adaptativa
+from .secuencial import EstadisticaPareja, aplicar_parada, planificar_ronda
+from .telemetria import Telemetria, describir_error, info_proceso
+
+# Estado de cada proceso del pool: su propio entorno y sus propios agentes
+_worker = {}
+
+
+def semilla_partida(seed, table, game_num):
+    """Semilla de una partida concreta, derivada de la semilla maestra
+
+    Depende solo de (seed, mesa, número de partida), así que la misma
+    partida se juega igual sin importar qué proceso la ejecute.
+    """
+    seq = np.random.SeedSequence([seed, *table, game_num])
+    return int(seq.generate_state(1)[0])
+
+
+def _fijar_plazo(agents, move_deadline_ms):
+    """Comunica el plazo por jugada a los agentes que lo aceptan; devuelve el plazo en ns"""
+    for agent in agents:
+        if hasattr(agent, 'set_move_deadline'):
+            agent.set_move_deadline(move_deadline_ms)
+    return None if move_deadline_ms is None else int(move_deadline_ms * 1e6)
+
+
+def jugar_bloque(env, agents, seed, table, game_range, duplicate=False, batch_games=None,
+                 move_deadline_ms=None, profile=None):
+    """Juega un rango de partidas de una mesa y devuelve sus métricas
+
+    agents son los agentes de la mesa, en su orden (un rol por agente).
+    Cada decisión de los agentes se cronometra por separado (perf_counter_ns);
+    el resto del tiempo de la partida se atribuye al motor del juego.
+
+    Los agentes rotan de asiento partida a partida (mesas.reparto_y_rotacion).
+    Con duplicate=True las N rotaciones de cada tanda comparten reparto: con
+    dos jugadores, cada reparto se juega dos veces, una con cada agente en
+    cada asiento. payoffs y move_times van siempre por asiento; payoffs es +1
+    para el ganador y -1 para el resto.
+
+    Con move_deadline_ms cada decisión tiene ese plazo: los agentes con
+    set_move_deadline lo reciben, y la que se pasa se sustituye por la
+    primera acción legal y se cuenta en 'overruns' (por rol).
+
+    Con batch_games las partidas se juegan en lotes (ver jugar_bloque_lote).
+
+    Con profile (un perfilado.Perfilador ya iniciado) se perfila su fracción
+    de las partidas y las muestras del bloque quedan en 'perfil'.
+    """
+    if profile is not None:
+        profile.agentes = {id(agent): index for agent, index in zip(agents, table)}
+    if batch_games:
+        return jugar_bloque_lote(env, agents, seed, table, game_range, duplicate, batch_games,
+                                 move_deadline_ms, profile)
+
+    plazo_ns = _fijar_plazo(agents, move_deadline_ms)
+    cronometrados = [AgenteCronometrado(agent, plazo_ns) for agent in agents]
+    motor = HistogramaLatencia()
+    env.set_agents(cronometrados)
+
+    num_players = len(agents)
+    bloque = {'games': [], 'deals': [], 'rotations': [], 'payoffs': [], 'turns': [],
+              'move_times': [], 'errors': []}
+    for game_num in game_range:
+        deal, rotacion = reparto_y_rotacion(game_num, num_players, duplicate)
+        seats = [cronometrados[role] for role in roles_por_asiento(rotacion, num_players)]
+
+        # Reiniciar el azar del entorno y de los agentes para esta partida
+        # (mismo reparto para todas las rotaciones de un duplicado)
+        semilla = semilla_partida(seed, table, deal)
+        env.seed(semilla)
+        np.random.seed(semilla)
+        for role, agent in enumerate(cronometrados):
+            agent.nueva_partida()
+            # Agentes con generador propio (p. ej. ProbabilisticAgent)
+            if hasattr(agent, 'seed'):
+                agent.seed([semilla, role])
+
+        perfilar = profile is not None and profile.elige(semilla_partida(seed, table, game_num))
+        try:
+            if perfilar:
+                profile.activar(MOTOR)
+            start_ns = time.perf_counter_ns()
+
+            # Jugar partida (sin construir trayectorias)
+            try:
+                _, total_turns = jugar_partida(env, seats)
+            finally:
+                if perfilar:
+                    profile.desactivar()
+
+            elapsed_ns = time.perf_counter_ns() - start_ns
+
+            # Tiempo medio por decisión de cada agente en esta partida (segundos)
+            move_times = tuple(agent.ns_partida / max(agent.jugadas_partida, 1) / 1e9
+                               for agent in seats)
+
+            # Tiempo del motor por jugada: lo que no pasó dentro de los agentes
+            jugadas = sum(agent.jugadas_partida for agent in cronometrados)
+            agentes_ns = sum(agent.ns_partida for agent in cronometrados)
+            motor.registrar((elapsed_ns - agentes_ns) // max(jugadas, 1))
+
+            bloque['games'].append(game_num)
+            bloque['deals'].append(deal)
+            bloque['rotations'].append(rotacion)
+            bloque['payoffs'].append(resultado_mesa(ganadores(env), num_players))
+            bloque['turns'].append(total_turns)
+            bloque['move_times'].append(move_times)
+
+        except Exception as e:
+            bloque['errors'].append(describir_error(e, game_num))
+
+    bloque['latency'] = [agent.histograma for agent in cronometrados]
+    bloque['overruns'] = [agent.excesos for agent in cronometrados]
+    bloque['engine_latency'] = motor
+    if profile is not None:
+        bloque['perfil'] = profile.extraer()
+    return bloque
+
+
+def jugar_bloque_lote(env, agents, seed, table, game_range, duplicate=False, batch_games=64,
+                      move_deadline_ms=None, profile=None):
+    """Como jugar_bloque, pero jugando batch_games partidas a la vez en lockstep
+
+    Cada partida se reparte con su semilla (las mismas cartas que en
+    jugar_bloque, con el motor nativo). Los agentes deciden por lotes, así
+    que su azar se siembra una vez por lote y las jugadas no coinciden con
+    las del modo partida a partida. El tiempo de cada decisión es el de la
+    llamada al agente dividido entre las partidas del lote, y es ese tiempo
+    el que se compara con move_deadline_ms.
+    """
+    plazo_ns = _fijar_plazo(agents, move_deadline_ms)
+    histogramas = [HistogramaLatencia() for _ in agents]
+    excesos = [0] * len(agents)
+    motor = HistogramaLatencia()
+
+    num_players = len(agents)
+    bloque = {'games': [], 'deals': [], 'rotations': [], 'payoffs': [], 'turns': [],
+              'move_times': [], 'errors': []}
+    game_nums = list(game_range)
+    for inicio in range(0, len(game_nums), batch_games):
+        lote_nums = game_nums[inicio:inicio + batch_games]
+        repartos = [reparto_y_rotacion(game_num, num_players, duplicate) for game_num in lote_nums]
+        games = [nuevo_juego(semilla_partida(seed, table, deal), num_players) for deal, _ in repartos]
+        roles = [roles_por_asiento(rotacion, num_players) for _, rotacion in repartos]
+
+        # Azar de los agentes: una semilla por lote, derivada de su primera partida
+        semilla = semilla_partida(seed, table, lote_nums[0])
+        np.random.seed(semilla)
+        for role, agent in enumerate(agents):
+            if hasattr(agent, 'seed'):
+                agent.seed([semilla, role])
+
+        # Con profile, los lotes se eligen por su primera partida
+        perfilar = profile is not None and profile.elige(semilla)
+        if perfilar:
+            profile.activar(MOTOR)
+        start_ns = time.perf_counter_ns()
+        try:
+            resultado = jugar_lote(games, roles, agents, histogramas, plazo_ns, excesos)
+        finally:
+            if perfilar:
+                profile.desactivar()
+        elapsed_ns = time.perf_counter_ns() - start_ns
+
+        # Tiempo del motor por jugada, común a todas las partidas del lote
+        agentes_ns = sum(sum(ns) for ns in resultado['ns'])
+        motor_ns = (elapsed_ns - agentes_ns) // max(sum(resultado['moves']), 1)
+
+        for g, (game_num, (deal, rotacion)) in enumerate(zip(lote_nums, repartos)):
+            if g in resultado['errors']:
+                bloque['errors'].append(dict(resultado['errors'][g], partida=game_num))
+                continue
+            move_times = tuple(resultado['ns'][g][role] / max(resultado['jugadas'][g][role], 1) / 1e9
+                               for role in roles[g])
+            motor.registrar(motor_ns)
+
+            bloque['games'].append(game_num)
+            bloque['deals'].append(deal)
+            bloque['rotations'].append(rotacion)
+            bloque['payoffs'].append(resultado_mesa(games[g].winner, num_players))
+            bloque['turns'].append(2 * resultado['moves'][g] + num_players)
+            bloque['move_times'].append(move_times)
+
+    bloque['latency'] = histogramas
+    bloque['overruns'] = excesos
+    bloque['engine_latency'] = motor
+    if profile is not None:
+        bloque['perfil'] = profile.extraer()
+    return bloque
+
+
+def _combinar_cache(cache, claves, en_cache, nuevos):
+    """Bloques en orden: los de la caché se leen, los nuevos se guardan al llegar"""
+    nuevos = iter(nuevos)
+    for clave, guardado in zip(claves, en_cache):
+        if guardado:
+            yield cache.obtener(clave)
+            continue
+        bloque = next(nuevos)
+        if cache is not None and clave is not None:
+            # Sin el proceso que lo jugó ni su perfil: eso no es parte del resultado
+            cache.guardar(clave, {k: v for k, v in bloque.items() if k not in ('worker', 'perfil')})
+        yield bloque
+
+
+def _esperar(futures, telemetria):
+    """Resultados de los futures en orden; mientras se espera, la telemetría sigue emitiendo"""
+    intervalo = telemetria.intervalo_s if telemetria.activa else None
+    for future in futures:
+        while not wait([future], timeout=intervalo).done:
+            telemetria.emitir(en_curso=sum(f.running() for f in futures))
+        yield future.result()
+
+
+def _anotar_proceso(bloque):
+    bloque['worker'] = info_proceso()
+    return bloque
+
+
+def _inicializar_worker(env_id, num_players, agents_dict, perfil=None):
+    """Crea el entorno del proceso; los agentes llegan ya copiados"""
+    _worker['env'] = crear_entorno(env_id, num_players)
+    _worker['agents'] = list(agents_dict.values())
+    # El temporizador del perfil queda armado mientras viva el proceso
+    _worker['perfil'] = perfil
+    if perfil is not None:
+        perfil.iniciar()
+
+
+def _jugar_bloque_worker(seed, table, start, stop, duplicate, batch_games, move_deadline_ms):
+    """Tarea del pool: juega las partidas [start, stop) de una mesa"""
+    agents = [_worker['agents'][i] for i in table]
+    return _anotar_proceso(jugar_bloque(_worker['env'], agents, seed, table, range(start, stop), duplicate,
+                                        batch_games, move_deadline_ms, _worker['perfil']))
+
+
+class UNOEvaluator:
+    """Sistema para evaluar y comparar agentes
+
+    engine elige quién juega las partidas: 'rlcard' (el env recibido) o
+    'nativo' (motor.EntornoUNO, mismas reglas y mismas partidas para la
+    misma semilla, pero más rápido).
+    """
+
+    ENGINES = ('rlcard', 'nativo')
+
+    def __init__(self, env, seed=None, engine='rlcard'):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Motor desconocido: {engine!r} (opciones: {', '.join(self.ENGINES)})")
+        self.engine = engine
+        self.env = EntornoUNO(env.num_players) if engine == 'nativo' else env
+        self.metrics = defaultdict(lambda: defaultdict(list))
+        self.engine_latency = HistogramaLatencia()
+        self.pair_stats = {}
+
+        # Semilla maestra: si no se indica se deriva del estado global (set_seed)
+        if seed is None:
+            seed = int(np.random.randint(0, 2**31 - 1))
+        self.seed = seed
+
+    def play_game(self, agents, agent_names):
+        """Juega una partida y recolecta métricas"""
+        payoffs, total_turns = jugar_partida(self.env, agents)
+
+        game_metrics = {
+            'agent_names': agent_names,
+            'payoffs': payoffs,
+            'num_turns': total_turns,
+            'cards_remaining': []
+        }
+
+        # No intentar extraer cartas restantes (causa problemas)
+        # Solo usar payoffs para determinar ganadores
+        for _ in range(len(payoffs)):
+            game_metrics['cards_remaining'].append(0)
+
+        return game_metrics
+
+    def evaluate_agents(self, agents_dict, num_games=1000, num_workers=1, chunk_size=250,
+                        results_path='uno_agents_games.csv', checkpoint_path=None,
+                        checkpoint_every=1, resume=False, duplicate=False,
+                        target_ci=None, batch_size=500, cache_dir=None, invalidate_cache=False,
+                        batch_games=None, move_deadline_ms=None, players_per_table=2,
+                        matchmaking='round_robin', matchups_per_round=None, telemetry_path=None,
+                        metrics_path=None, telemetry_interval=5.0, profile_dir=None,
+                        profile_fraction=0.1, profile_interval_ms=1.0):
+        """Evalúa múltiples agentes jugando entre sí por mesas
+
+        Con players_per_table=2 las mesas son las parejas de agentes; con 3 o
+        4 son todas las combinaciones de ese número de agentes (el entorno se
+        recrea con ese número de jugadores). num_games se reparte a partes
+        iguales entre las mesas, así que el coste crece con el número de
+        mesas. Dentro de cada mesa los agentes rotan por todos los asientos.
+
+        Con num_workers > 1 las partidas de cada mesa se reparten en bloques
+        de chunk_size entre un pool de procesos. Cada partida usa una semilla
+        derivada de self.seed, por lo que victorias, turnos y puntuaciones son
+        idénticos para cualquier número de workers (los tiempos son mediciones
+        y varían entre ejecuciones).
+
+        Cada partida terminada se vuelca por bloques a results_path (una fila
+        por partida, con el tiempo medio de las decisiones de cada agente), así
+        que la memoria no crece con num_games. results solo guarda contadores
+        y el histograma de latencia por decisión de cada agente; el tiempo del
+        motor queda aparte en self.engine_latency. Los DataFrames de resumen y
+        detallado se derivan del archivo.
+
+        Con checkpoint_path se guarda el progreso cada checkpoint_every bloques
+        (bloques completados, semilla, estado del RNG, agregados parciales y
+        tamaño de results_path). Con resume=True se continúa desde el último
+        checkpoint y el resultado final es el mismo que sin interrupción.
+
+        Con duplicate=True cada reparto se juega una vez con cada rotación de
+        asientos (números aleatorios comunes); con dos jugadores, el análisis
+        pareado por reparto está en create_duplicate_dataframe.
+
+        Con target_ci (semiancho del IC95 de la tasa de victoria, como
+        proporción: 0.02 = ±2 pp) num_games pasa a ser un presupuesto total:
+        se juegan rondas de batch_size partidas por pareja y cada pareja se
+        detiene en cuanto alcanza esa precisión, dejando el resto del
+        presupuesto a las parejas indecisas. Las partidas e intervalo final de
+        cada pareja están en create_pairs_dataframe. Solo con dos jugadores.
+
+        Con cache_dir cada bloque jugado se guarda en disco con una clave que
+        depende del código y la configuración de los dos agentes, la semilla,
+        la pareja, el rango de partidas y la versión del motor; en la
+        siguiente ejecución los bloques que ya están se reutilizan (tiempos
+        incluidos) y solo se juegan los que faltan. invalidate_cache=True
+        borra la caché antes de empezar. Las mesas con un agente cuyas jugadas
+        dependen del tiempo (cache.cacheable: p. ej. MCTSAgent con tiempo_ms o
+        con move_deadline_ms) se juegan siempre y no se guardan.
+
+        Con batch_games cada bloque se juega en lotes de batch_games partidas
+        en lockstep (motor nativo) y los agentes con batch_step deciden por
+        todo el lote de una vez. Las cartas repartidas son las mismas, pero
+        el azar de los agentes se consume por lotes, así que los resultados
+        son reproducibles para un mismo batch_games y chunk_size, no iguales
+        a los del modo partida a partida.
+
+        Con move_deadline_ms cada decisión tiene ese plazo (en milisegundos):
+        los agentes con set_move_deadline (p. ej. MCTSAgent) lo reciben para
+        ajustar su búsqueda, y cualquier decisión que se pase se sustituye
+        por la primera acción legal. Los excesos de cada agente quedan en
+        results[agente]['deadline_overruns'] y en create_latency_dataframe.
+
+        Cada partida actualiza además el rating TrueSkill (mu, sigma) de los
+        agentes de la mesa, en el orden de las partidas (create_ratings_dataframe).
+        Con matchmaking='adaptive' (solo parejas) num_games es un presupuesto
+        total y, en vez de jugar todas las parejas, cada ronda juega
+        batch_size partidas en las matchups_per_round parejas más
+        informativas según los ratings del momento (por defecto, la mitad
+        del número de agentes), hasta agotar el presupuesto.
+
+        Con telemetry_path se añade a ese archivo JSONL, cada
+        telemetry_interval segundos, el progreso de la evaluación (partidas
+        por segundo, ETA, partidas de cada mesa, percentiles de latencia,
+        errores por tipo, memoria de cada worker), más un evento por error
+        con su traza completa; metrics_path se reescribe de forma atómica con
+        las mismas cifras en formato de texto de Prometheus (ver telemetria.py).
+
+        Con profile_dir se perfila por muestreo (cada profile_interval_ms de
+        CPU) una fracción profile_fraction de las partidas, elegida por su
+        semilla, y de las fusiones de bloques. Las muestras de todos los
+        workers se suman y profile_dir recibe una pila plegada por componente
+        (motor, cada agente, contabilidad, io), apta para flamegraph.pl o
+        speedscope, y resumen.txt (ver perfilado.py). Los resultados no
+        cambian; las latencias de las partidas perfiladas sí se inflan un poco.
+        """
+        agent_names = list(agents_dict.keys())
+        all_agents = list(agents_dict.values())
+
+        if target_ci is not None and players_per_table != 2:
+            raise ValueError("La parada temprana (target_ci) solo está definida para parejas")
+        if matchmaking not in ('round_robin', 'adaptive'):
+            raise ValueError(f"matchmaking desconocido: {matchmaking!r}")
+        adaptativo = matchmaking == 'adaptive'
+        if adaptativo and (players_per_table != 2 or target_ci is not None):
+            raise ValueError("El emparejamiento adaptativo solo está definido para parejas "
+                             "y no se combina con target_ci")
+        if matchups_per_round is None:
+            matchups_per_round = max(len(agent_names) // 2, 1)
+        tables = generar_mesas(len(agent_names), players_per_table)
+        if self.env.num_players != players_per_table:
+            self.env = crear_entorno(self.env.name, players_per_table)
+
+        print(f"Evaluando {len(agent_names)} agentes...")
+        print(f"Mesas de {players_per_table} jugadores: {len(tables)}")
+
+        if adaptativo:
+            if duplicate:
+                batch_size -= batch_size % 2
+                print("Modo duplicado: cada reparto se juega dos veces")
+            print(f"Emparejamiento adaptativo: rondas de {batch_size} partidas en "
+                  f"{matchups_per_round} parejas (presupuesto: {num_games} partidas)")
+            presupuesto = num_games
+        elif target_ci is None:
+            # Una sola ronda con el mismo número de partidas para cada mesa, múltiplo
+            # del número de asientos para que todos los agentes pasen por todos
+            games_per_table = num_games // len(tables)
+            games_per_table -= games_per_table % players_per_table
+            if duplicate:
+                print(f"Modo duplicado: {games_per_table // players_per_table} repartos por mesa, "
+                      f"jugados {players_per_table} veces")
+            print(f"Jugando {games_per_table} partidas por cada mesa")
+            batch_size = games_per_table
+            presupuesto = games_per_table * len(tables)
+        else:
+            if duplicate:
+                batch_size -= batch_size % 2
+                print("Modo duplicado: cada reparto se juega dos veces")
+            print(f"Parada temprana: rondas de {batch_size} partidas por pareja hasta un IC95 "
+                  f"de ±{target_ci * 100:.1f} pp (presupuesto: {num_games} partidas)")
+            presupuesto = num_games
+
+        # Todo lo que determina qué partidas se juegan; no depende del número de workers
+        config = {
+            'agent_names': agent_names,
+            'num_games': num_games,
+            'chunk_size': chunk_size,
+            'duplicate': duplicate,
+            'target_ci': target_ci,
+            'batch_size': batch_size,
+            'batch_games': batch_games,
+            'move_deadline_ms': move_deadline_ms,
+            'players_per_table': players_per_table,
+            'matchmaking': matchmaking,
+            'matchups_per_round': matchups_per_round
+        }
+
+        self.results_path = results_path
+        self.agent_names = agent_names
+        self.tables = tables
+        self.duplicate = duplicate
+        checkpoint = cargar_checkpoint(checkpoint_path) if (resume and checkpoint_path) else None
+
+        if checkpoint is not None:
+            validar_checkpoint(checkpoint, self.seed, config)
+            self.seed = checkpoint['seed']
+            self.engine_latency = checkpoint['engine_latency']
+            self.pair_stats = checkpoint['pair_stats']
+            self.ratings = checkpoint['ratings']
+            np.random.set_state(checkpoint['np_random_state'])
+            results = checkpoint['results']
+            registro = RegistroPartidas(results_path, players_per_table,
+                                        truncar_a=checkpoint['registro_bytes'])
+            progreso = checkpoint['progreso']
+            print(f"Reanudando desde checkpoint: {progreso['completed']}/{len(progreso['ronda'])} "
+                  f"bloques de la ronda completados")
+        else:
+            results = {name: {
+                'wins': 0,
+                'losses': 0,
+                'total_games': 0,
+                'deadline_overruns': 0,
+                'latency': HistogramaLatencia()
+            } for name in agent_names}
+
+            # Resultados de cada partida, volcados a disco por bloques
+            registro = RegistroPartidas(results_path, players_per_table)
+
+            # Tiempo del motor del juego, separado del de los agentes
+            self.engine_latency = HistogramaLatencia()
+
+            # Partidas (y, en parejas, intervalo de confianza) de cada mesa
+            self.pair_stats = {table: EstadisticaPareja() for table in tables}
+
+            # Rating de cada agente, actualizado partida a partida
+            self.ratings = TablaRatings(len(agent_names))
+
+            # ronda: bloques (mesa, inicio, fin) de la ronda en curso
+            progreso = {'ronda': [], 'completed': 0, 'game_count': 0, 'usadas': 0}
+
+        cache = None
+        if cache_dir:
+            cache = CacheResultados(cache_dir)
+            if invalidate_cache:
+                cache.limpiar()
+            # Los agentes que dependen del reloj no tienen huella: sus mesas no usan la caché
+            huellas = [huella_agente(agent) if cacheable(agent, move_deadline_ms) else None
+                       for agent in all_agents]
+            sin_cache = [name for name, huella in zip(agent_names, huellas) if huella is None]
+            if sin_cache:
+                print(f"Caché: las partidas de {', '.join(sin_cache)} no se guardan "
+                      f"(sus jugadas dependen del tiempo)")
+            version = huella_motor(self.env, semilla_partida, jugar_bloque, jugar_bloque_lote)
+
+        def guardar():
+            guardar_checkpoint(checkpoint_path, {
+                'seed': self.seed,
+                'config': config,
+                'progreso': progreso,
+                'results': results,
+                'engine_latency': self.engine_latency,
+                'pair_stats': self.pair_stats,
+                'ratings': self.ratings,
+                'registro_bytes': registro.tamano(),
+                'np_random_state': np.random.get_state()
+            })
+
+        def al_completar_bloque():
+            if checkpoint_path and progreso['completed'] % checkpoint_every == 0:
+                guardar()
+
+        telemetria = Telemetria(telemetry_path, metrics_path, telemetry_interval)
+        telemetria.iniciar(results, self.pair_stats, self.engine_latency, agent_names, presupuesto,
+                           progreso['game_count'], num_workers)
+        # Bloques de la ronda en curso que quedan por jugar (al reanudar)
+        telemetria.planificar(progreso['ronda'][progreso['completed']:])
+
+        perfil = Perfilador(profile_interval_ms / 1000, profile_fraction) if profile_dir else None
+
+        # Un solo pool para todas las rondas
+        executor = None
+        if num_workers > 1:
+            executor = ProcessPoolExecutor(max_workers=num_workers,
+                                           initializer=_inicializar_worker,
+                                           initargs=(self.env.name, players_per_table, agents_dict,
+                                                     perfil and perfil.vacio()))
+        if perfil is not None:
+            perfil.iniciar()
+        try:
+            while True:
+                if progreso['completed'] == len(progreso['ronda']):
+                    # Ronda terminada: detener las parejas ya decididas y planificar la siguiente
+                    if target_ci is not None:
+                        aplicar_parada(tables, self.pair_stats, target_ci, duplicate)
+                    if adaptativo:
+                        ronda, usadas = planificar_ronda_adaptativa(
+                            tables, self.pair_stats, self.ratings, presupuesto - progreso['usadas'],
+                            batch_size, chunk_size, matchups_per_round, duplicate)
+                    else:
+                        ronda, usadas = planificar_ronda(tables, self.pair_stats,
+                                                         presupuesto - progreso['usadas'],
+                                                         batch_size, chunk_size, duplicate)
+                    if not ronda:
+                        break
+                    progreso.update(ronda=ronda, completed=0, usadas=progreso['usadas'] + usadas)
+                    telemetria.planificar(ronda)
+                    if target_ci is not None or adaptativo:
+                        activas = len({table for table, _, _ in ronda})
+                        print(f"\nRonda: {activas} parejas activas, "
+                              f"{progreso['usadas']}/{presupuesto} partidas del presupuesto")
+
+                # Partidas de cada mesa en la ronda, para los mensajes
+                partidas_ronda = defaultdict(int)
+                for table, start, stop in progreso['ronda']:
+                    partidas_ronda[table] += stop - start
+
+                pending = progreso['ronda'][progreso['completed']:]
+
+                # Bloques ya jugados en una ejecución anterior
+                if cache is not None:
+                    claves = [None if any(huellas[i] is None for i in table) else
+                              CacheResultados.clave([huellas[i] for i in table], self.seed, table,
+                                                    start, stop, duplicate, version, batch_games,
+                                                    move_deadline_ms)
+                              for table, start, stop in pending]
+                    en_cache = [clave is not None and cache.contiene(clave) for clave in claves]
+                    print(f"Caché: {sum(en_cache)}/{len(pending)} bloques reutilizados")
+                else:
+                    claves = en_cache = [False] * len(pending)
+                nuevos = [task for task, guardado in zip(pending, en_cache) if not guardado]
+
+                if executor is not None:
+                    print(f"Repartiendo {len(nuevos)} bloques entre {num_workers} procesos")
+                    futures = [executor.submit(_jugar_bloque_worker, self.seed, table, start, stop,
+                                               duplicate, batch_games, move_deadline_ms)
+                               for table, start, stop in nuevos]
+                    # Fusionar en el orden de los bloques para que el resultado sea reproducible
+                    jugados = _esperar(futures, telemetria)
+                else:
+                    jugados = (_anotar_proceso(jugar_bloque(self.env, [all_agents[i] for i in table],
+                                                            self.seed, table, range(start, stop), duplicate,
+                                                            batch_games, move_deadline_ms, perfil))
+                               for table, start, stop in nuevos)
+                bloques = _combinar_cache(cache, claves, en_cache, jugados)
+                self._fusionar_bloques(results, registro, progreso, agent_names, partidas_ronda,
+                                       pending, bloques, al_completar_bloque, telemetria, perfil)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            telemetria.terminar()
+            if perfil is not None:
+                perfil.detener()
+
+        if target_ci is not None:
+            for table, estadistica in self.pair_stats.items():
+                estado = 'detenida' if estadistica.detenida else 'presupuesto agotado'
+                print(f"{etiqueta_mesa(table, agent_names)}: {estadistica.partidas} partidas, "
+                      f"IC95 ±{estadistica.semiancho_ic95(duplicate) * 100:.2f} pp ({estado})")
+
+        if move_deadline_ms is not None:
+            for name in agent_names:
+                if results[name]['deadline_overruns']:
+                    print(f"{name}: {results[name]['deadline_overruns']} decisiones fuera del plazo "
+                          f"de {move_deadline_ms} ms")
+
+        registro.volcar()
+        if checkpoint_path:
+            guardar()
+        if perfil is not None:
+            print(f"\nPerfil en {profile_dir}/")
+            print(perfil.escribir(profile_dir, agent_names))
+        return results
+
+    def _fusionar_bloques(self, results, registro, progreso, agent_names, partidas_ronda,
+                          tasks, bloques, al_completar_bloque, telemetria, perfil=None):
+        """Acumula en results las métricas de cada bloque, en orden, y las registra"""
+        ids_mesa = {table: table_id for table_id, table in enumerate(self.tables)}
+        current_table = None
+        for (table, start, stop), bloque in zip(tasks, bloques):
+            if perfil is not None:
+                perfil.sumar(bloque.get('perfil', ()))
+            # La fusión de una fracción de los bloques se perfila como contabilidad (o io)
+            perfilar = perfil is not None and perfil.elige(semilla_partida(self.seed, table, start))
+            if perfilar:
+                perfil.activar(CONTABILIDAD)
+            try:
+                names = [agent_names[i] for i in table]
+                num_players = len(table)
+                estadistica = self.pair_stats[table]
+
+                if table != current_table:
+                    current_table = table
+                    print(f"\n{etiqueta_mesa(table, agent_names)} ({partidas_ronda[table]} partidas)...")
+
+                for game_num, deal, rotacion, payoffs, total_turns, move_times in zip(
+                        bloque['games'], bloque['deals'], bloque['rotations'], bloque['payoffs'],
+                        bloque['turns'], bloque['move_times']):
+                    # payoffs y tiempos vienen por asiento
+                    roles = roles_por_asiento(rotacion, num_players)
+                    seat_names = [names[role] for role in roles]
+                    registro.agregar(ids_mesa[table], seat_names, game_num, deal, payoffs, move_times,
+                                     total_turns)
+
+                    for name, payoff in zip(seat_names, payoffs):
+                        results[name]['total_games'] += 1
+                        if payoff > 0:
+                            results[name]['wins'] += 1
+                        else:
+                            results[name]['losses'] += 1
+
+                    if num_players == 2:
+                        # Victoria del primer agente de la pareja, esté en el asiento que esté
+                        estadistica.registrar(deal, int(payoffs[asiento_de_rol(0, rotacion, 2)] > 0))
+                    else:
+                        estadistica.partidas += 1
+                    self.ratings.registrar_partida([table[role] for role in roles], payoffs)
+
+                    progreso['game_count'] += 1
+                    if progreso['game_count'] % 50 == 0:
+                        print(f"  Completadas {progreso['game_count']} partidas totales")
+
+                for name, latencia, excesos in zip(names, bloque['latency'], bloque['overruns']):
+                    results[name]['latency'].fusionar(latencia)
+                    results[name]['deadline_overruns'] += excesos
+                self.engine_latency.fusionar(bloque['engine_latency'])
+
+                for error in bloque['errors']:
+                    if isinstance(error, dict):
+                        error = f"{error['partida']}: {error['tipo']}: {error['mensaje']}"
+                    print(f"  Error en partida {error}")
+                telemetria.bloque(table, bloque)
+
+                progreso['completed'] += 1
+                al_completar_bloque()
+            finally:
+                if perfilar:
+                    perfil.desactivar()
+
+    def create_summary_dataframe(self, results):
+        """Crea DataFrame con resumen de métricas (leyendo el registro de partidas)"""
+        import pandas as pd
+        summary_data = []
+        agregados = agregar_registro(self.results_path, list(results))
+
+        for agent_name, metrics in results.items():
+            agregado = agregados[agent_name]
+            partidas = agregado['partidas']
+            if partidas > 0:
+                tiempo_medio = agregado['suma_tiempo'] / partidas
+                varianza = max(agregado['suma_tiempo2'] / partidas - tiempo_medio ** 2, 0.0)
+                summary_data.append({
+                    'Agente': agent_name,
+                    'Tasa_Victoria_%': (agregado['victorias'] / partidas) * 100,
+                    'Partidas_Jugadas': partidas,
+                    'Victorias': agregado['victorias'],
+                    'Derrotas': partidas - agregado['victorias'],
+                    'Tiempo_Promedio_Jugada_ms': tiempo_medio,
+                    'Turnos_Promedio_Por_Juego': agregado['suma_turnos'] / partidas,
+                    'Desv_Est_Tiempo_ms': np.sqrt(varianza),
+                    'Latencia_p50_ms': metrics['latency'].percentil(50) / 1e6,
+                    'Latencia_p95_ms': metrics['latency'].percentil(95) / 1e6,
+                    'Latencia_p99_ms': metrics['latency'].percentil(99) / 1e6
+                })
+
+        df = pd.DataFrame(summary_data)
+        df = df.sort_values('Tasa_Victoria_%', ascending=False)
+        return df
+
+    def create_latency_dataframe(self, results):
+        """Crea DataFrame con la latencia por decisión de cada agente y la del motor"""
+        import pandas as pd
+        latency_data = []
+
+        for agent_name, metrics in results.items():
+            latency_data.append({'Componente': agent_name, **metrics['latency'].resumen_ms(),
+                                 'excesos_plazo': metrics['deadline_overruns']})
+
+        # El motor se mide por jugada: tiempo de la partida fuera de los agentes
+        latency_data.append({'Componente': 'Motor', **self.engine_latency.resumen_ms(),
+                             'excesos_plazo': 0})
+
+        return pd.DataFrame(latency_data)
+
+    def _solo_parejas(self, que):
+        if len(self.tables[0]) != 2:
+            raise ValueError(f"{que} solo está disponible con mesas de dos jugadores")
+
+    def create_duplicate_dataframe(self, results):
+        """Crea DataFrame con el análisis pareado por reparto (modo duplicado, parejas)"""
+        self._solo_parejas("El análisis pareado por reparto")
+        return analizar_duplicado(self.results_path, list(results))
+
+    def create_pairs_dataframe(self, results):
+        """Crea DataFrame con las partidas y el IC95 final de cada pareja"""
+        import pandas as pd
+        self._solo_parejas("El IC95 por pareja")
+        pairs_data = []
+
+        for (i, j), estadistica in self.pair_stats.items():
+            tasa = estadistica.tasa()
+            semiancho = estadistica.semiancho_ic95(self.duplicate)
+            pairs_data.append({
+                'Agente_A': self.agent_names[i],
+                'Agente_B': self.agent_names[j],
+                'Partidas': estadistica.partidas,
+                'Tasa_Victoria_A_%': tasa * 100,
+                'IC95_Inferior_%': max(tasa - semiancho, 0.0) * 100,
+                'IC95_Superior_%': min(tasa + semiancho, 1.0) * 100,
+                'Semiancho_pp': semiancho * 100,
+                'Detenida': estadistica.detenida
+            })
+
+        return pd.DataFrame(pairs_data)
+
+    def create_seats_dataframe(self, results):
+        """Crea DataFrame con la tasa de victoria de cada agente en cada asiento"""
+        conteos = agregar_asientos(self.results_path, list(results))
+        df = conteos.groupby(['Agente', 'Asiento'], observed=True)[['Partidas', 'Victorias']] \
+            .sum().reset_index()
+        df['Tasa_Victoria_%'] = df['Victorias'] / df['Partidas'] * 100
+        return df
+
+    def create_tables_dataframe(self, results):
+        """Crea DataFrame con la tasa de victoria de cada agente en cada mesa"""
+        conteos = agregar_asientos(self.results_path, list(results))
+        df = conteos.groupby(['Mesa', 'Agente'], observed=True)[['Partidas', 'Victorias']] \
+            .sum().reset_index()
+        df.insert(1, 'Agentes', [etiqueta_mesa(self.tables[table_id], self.agent_names)
+                                 for table_id in df['Mesa']])
+        df['Tasa_Victoria_%'] = df['Victorias'] / df['Partidas'] * 100
+        return df
+
+    def create_ratings_dataframe(self, results):
+        """Crea DataFrame con el rating TrueSkill final (mu, sigma) de cada agente"""
+        return self.ratings.dataframe(self.agent_names)
+
+    def create_detailed_dataframe(self, results):
+        """Crea DataFrame detallado con todas las partidas (lo carga entero en memoria)"""
+        return leer_detallado(self.results_path, list(results))
+
+    def write_detailed_csv(self, results, path):
+        """Escribe el CSV detallado por bloques, sin cargarlo entero en memoria"""
+        escribir_detallado(self.results_path, list(results), path)
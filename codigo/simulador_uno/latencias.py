@@ -0,0 +1,136 @@
+"""Medición de latencia por jugada de cada agente"""
+
+import time
+
+# Sub-buckets por potencia de 2: error relativo de los percentiles < 1/16
+_SUB_BITS = 4
+_SUB = 1 << _SUB_BITS
+_NUM_BUCKETS = (64 - _SUB_BITS) * _SUB + _SUB
+
+
+def _indice(ns):
+    """Bucket logarítmico de una latencia en nanosegundos"""
+    if ns < _SUB:
+        return ns
+    exponente = ns.bit_length() - _SUB_BITS - 1
+    return (exponente + 1) * _SUB + ((ns >> exponente) & (_SUB - 1))
+
+
+def _valor(indice):
+    """Valor representativo (punto medio) de un bucket"""
+    if indice < _SUB:
+        return float(indice)
+    exponente = indice // _SUB - 1
+    inicio = (_SUB + indice % _SUB) << exponente
+    return inicio + ((1 << exponente) - 1) / 2
+
+
+class HistogramaLatencia:
+    """Histograma logarítmico de latencias en ns, fusionable entre procesos"""
+
+    def __init__(self):
+        self.counts = [0] * _NUM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def registrar(self, ns, veces=1):
+        """Añade una latencia (ns, entero), veces repetida"""
+        self.counts[_indice(ns)] += veces
+        self.count += veces
+        self.total_ns += ns * veces
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def fusionar(self, otro):
+        """Acumula otro histograma (p. ej. el de un worker)"""
+        self.counts = [a + b for a, b in zip(self.counts, otro.counts)]
+        self.count += otro.count
+        self.total_ns += otro.total_ns
+        self.max_ns = max(self.max_ns, otro.max_ns)
+
+    def percentil(self, q):
+        """Percentil q (0-100) en ns"""
+        if self.count == 0:
+            return 0.0
+        objetivo = q / 100 * self.count
+        acumulado = 0
+        for indice, n in enumerate(self.counts):
+            acumulado += n
+            if n and acumulado >= objetivo:
+                return min(_valor(indice), float(self.max_ns))
+        return float(self.max_ns)
+
+    def media(self):
+        """Latencia media en ns"""
+        return self.total_ns / self.count if self.count else 0.0
+
+    def resumen_ms(self):
+        """Media, p50, p95, p99 y máximo en milisegundos"""
+        return {
+            'media_ms': self.media() / 1e6,
+            'p50_ms': self.percentil(50) / 1e6,
+            'p95_ms': self.percentil(95) / 1e6,
+            'p99_ms': self.percentil(99) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+            'decisiones': self.count
+        }
+
+
+def accion_por_defecto(agent, state):
+    """Primera acción legal, en el formato del agente (la que se juega si se pasa de plazo)"""
+    if agent.use_raw:
+        return state['raw_legal_actions'][0]
+    return next(iter(state['legal_actions']))
+
+
+class AgenteCronometrado:
+    """Envoltorio que mide con perf_counter_ns cada decisión de un agente
+
+    Se comporta como el agente envuelto (use_raw, seed, ...); además guarda la
+    latencia de cada step/eval_step en su histograma y el tiempo acumulado de
+    la partida en curso.
+
+    Con plazo_ns, una decisión que tarda más se cuenta en excesos y se
+    sustituye por accion_por_defecto.
+    """
+
+    def __init__(self, agent, plazo_ns=None):
+        self.agent = agent
+        self.histograma = HistogramaLatencia()
+        self.ns_partida = 0
+        self.jugadas_partida = 0
+        self.plazo_ns = plazo_ns
+        self.excesos = 0
+
+    def __getattr__(self, name):
+        return getattr(self.agent, name)
+
+    def nueva_partida(self):
+        """Reinicia los contadores de la partida en curso"""
+        self.ns_partida = 0
+        self.jugadas_partida = 0
+
+    def _registrar(self, ns):
+        """Registra una decisión; devuelve True si se pasó del plazo"""
+        self.histograma.registrar(ns)
+        self.ns_partida += ns
+        self.jugadas_partida += 1
+        if self.plazo_ns is not None and ns > self.plazo_ns:
+            self.excesos += 1
+            return True
+        return False
+
+    def step(self, state):
+        start = time.perf_counter_ns()
+        action = self.agent.step(state)
+        if self._registrar(time.perf_counter_ns() - start):
+            action = accion_por_defecto(self.agent, state)
+        return action
+
+    def eval_step(self, state):
+        start = time.perf_counter_ns()
+        action, info = self.agent.eval_step(state)
+        if self._registrar(time.perf_counter_ns() - start):
+            action = accion_por_defecto(self.agent, state)
+        return action, info
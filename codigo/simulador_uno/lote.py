@@ -0,0 +1,117 @@
+"""Partidas en lote: K partidas avanzan a la vez y cada agente decide por todas
+
+En cada paso se agrupan las partidas activas según el agente al que le toca
+jugar y se le pasa un LoteEstados con sus acciones legales y tamaños de mano
+como arrays NumPy apilados. Los agentes con batch_step eligen todas las
+acciones en una sola pasada; el resto decide partida a partida con
+eval_step, como en el bucle normal.
+"""
+
+import time
+
+import numpy as np
+
+from .motor import NUM_ACCIONES, accion_agente, estado_juego
+from .telemetria import describir_error
+
+
+class LoteEstados(dict):
+    """Estados apilados de n partidas para el jugador al que le toca en cada una
+
+    Claves:
+        legal_mask (n, 61) bool: acciones legales de cada partida
+        hand_size (n,) int: cartas en la mano del jugador que decide
+        obs (n, 4, 4, 15) int: codificación de rlcard (se calcula al leerla)
+        states: lista con el estado individual de cada partida (ídem)
+    """
+
+    def __init__(self, games):
+        self.games = games
+        mask = np.zeros((len(games), NUM_ACCIONES), dtype=bool)
+        indices = []
+        for fila, game in enumerate(games):
+            base = fila * NUM_ACCIONES
+            indices.extend(base + accion for accion in game.acciones_legales(game.current_player))
+        mask.flat[indices] = True
+
+        super().__init__(legal_mask=mask,
+                         hand_size=np.array([len(game.hands[game.current_player]) for game in games]))
+
+    def __missing__(self, key):
+        if key == 'states':
+            value = [estado_juego(game, game.current_player) for game in self.games]
+        elif key == 'obs':
+            value = np.stack([state['obs'] for state in self['states']])
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+def decidir_lote(agent, lote):
+    """Acciones de un agente para todas las partidas del lote"""
+    if hasattr(agent, 'batch_step'):
+        return agent.batch_step(lote)
+    return [accion_agente(agent, state) for state in lote['states']]
+
+
+def jugar_lote(games, roles, agents, histogramas=None, plazo_ns=None, excesos=None):
+    """Juega en lockstep partidas ya repartidas hasta que terminan todas
+
+    roles[g][asiento] es el índice en agents del agente que ocupa ese asiento
+    en la partida g. El tiempo de cada llamada a un agente se reparte a partes
+    iguales entre las decisiones del lote (y se añade a histogramas[rol]).
+    Si ese tiempo por decisión supera plazo_ns, todas las decisiones de la
+    llamada se sustituyen por la primera acción legal y se suman a
+    excesos[rol]. Si el agente lanza una excepción, todas las partidas de
+    la llamada terminan con ese error.
+
+    Returns:
+        dict: por partida, jugadas ('moves'), ns y decisiones de cada rol
+        ('ns', 'jugadas') y error si falló ('errors', como describir_error)
+    """
+    num_agents = len(agents)
+    moves = [0] * len(games)
+    ns = [[0] * num_agents for _ in games]
+    jugadas = [[0] * num_agents for _ in games]
+    errors = {}
+
+    activas = [g for g, game in enumerate(games) if not game.is_over]
+    while activas:
+        por_rol = [[] for _ in range(num_agents)]
+        for g in activas:
+            por_rol[roles[g][games[g].current_player]].append(g)
+
+        for role, indices in enumerate(por_rol):
+            if not indices:
+                continue
+            lote = LoteEstados([games[g] for g in indices])
+
+            start = time.perf_counter_ns()
+            try:
+                actions = decidir_lote(agents[role], lote)
+            except Exception as e:
+                # Como en el bucle partida a partida: el error se anota y esas partidas se abandonan
+                for g in indices:
+                    errors[g] = describir_error(e)
+                continue
+            por_decision = (time.perf_counter_ns() - start) // len(indices)
+            if histogramas is not None:
+                histogramas[role].registrar(por_decision, len(indices))
+            if plazo_ns is not None and por_decision > plazo_ns:
+                actions = [games[g].acciones_legales(games[g].current_player)[0] for g in indices]
+                if excesos is not None:
+                    excesos[role] += len(indices)
+
+            for g, action in zip(indices, actions):
+                try:
+                    games[g].jugar(int(action))
+                except Exception as e:
+                    errors[g] = describir_error(e)
+                moves[g] += 1
+                ns[g][role] += por_decision
+                jugadas[g][role] += 1
+
+        activas = [g for g in activas if not games[g].is_over and g not in errors]
+
+    return {'moves': moves, 'ns': ns, 'jugadas': jugadas, 'errors': errors}
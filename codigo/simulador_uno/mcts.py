@@ -0,0 +1,234 @@
+"""Búsqueda MCTS con determinización para UNO
+
+La observación de un jugador no incluye las manos rivales, así que cada
+iteración reparte al azar las cartas no vistas (todas menos la mano propia
+y la carta objetivo) respetando el número de cartas de cada rival, y juega
+sobre esa partida con el motor nativo. La observación tampoco trae el
+historial del descarte: las cartas ya jugadas se tratan como no vistas.
+
+El árbol es de conjuntos de información (ISMCTS de un observador): cada
+nodo se identifica por lo que ve quien busca (quién juega, su mano, la carta
+objetivo con su color vigente y el tamaño de cada mano), de modo que
+distintas determinizaciones comparten estadísticas. Los nodos viven en una
+tabla de transposición que se conserva entre jugadas de la misma partida.
+"""
+
+import math
+import random
+import time
+
+import numpy as np
+from rlcard.games.uno.utils import ACTION_SPACE
+
+from .motor import COLOR_INICIAL, COMODIN, FIGURA, ROBAR, JuegoUNO
+
+# Cartas de cada (color de baraja, figura); los comodines solo por figura
+_CARTAS = {}
+for _carta, (_color, _figura) in enumerate(zip(COLOR_INICIAL, FIGURA)):
+    _CARTAS.setdefault((None if _figura >= COMODIN else _color, _figura), []).append(_carta)
+
+
+def _clave_carta(codigo):
+    color, figura = divmod(codigo, 15)
+    return (None if figura >= COMODIN else color, figura)
+
+
+def color_objetivo(state):
+    """Color vigente de la carta objetivo
+
+    Con un comodín de objetivo la cadena de rlcard muestra su color de
+    baraja, no el elegido; se deduce de las acciones legales que no son
+    comodines (solo pueden serlo por color) o, si no hay, de los colores que
+    faltan en la mano.
+    """
+    color, figura = divmod(ACTION_SPACE[state['raw_obs']['target']], 15)
+    if figura < COMODIN:
+        return color
+    for accion in state['legal_actions']:
+        if accion != ROBAR and accion % 15 < COMODIN:
+            return accion // 15
+    en_mano = {ACTION_SPACE[carta] // 15 for carta in state['raw_obs']['hand']
+               if ACTION_SPACE[carta] % 15 < COMODIN}
+    posibles = [c for c in range(4) if c not in en_mano]
+    return posibles[0] if posibles else color
+
+
+class Determinizador:
+    """Reparte partidas compatibles con la observación de un jugador"""
+
+    def __init__(self, state):
+        raw_obs = state['raw_obs']
+        libres = {clave: list(cartas) for clave, cartas in _CARTAS.items()}
+
+        self.mano = [libres[_clave_carta(ACTION_SPACE[carta])].pop() for carta in raw_obs['hand']]
+        self.objetivo = libres[_clave_carta(ACTION_SPACE[raw_obs['target']])].pop()
+        self.color = list(COLOR_INICIAL)
+        self.color[self.objetivo] = color_objetivo(state)
+
+        self.no_vistas = [carta for cartas in libres.values() for carta in cartas]
+        self.player = raw_obs['current_player']
+        self.num_cards = raw_obs['num_cards']
+        self.num_players = raw_obs['num_players']
+
+    def repartir(self, rng, np_random):
+        """Una partida con las manos rivales y el mazo barajados al azar"""
+        cartas = list(self.no_vistas)
+        rng.shuffle(cartas)
+
+        game = JuegoUNO(self.num_players, np_random)
+        game.color = list(self.color)
+        game.hands = []
+        for player, num in enumerate(self.num_cards):
+            if player == self.player:
+                game.hands.append(list(self.mano))
+            else:
+                game.hands.append(cartas[-num:])
+                del cartas[-num:]
+        game.deck = cartas
+        game.played = [self.objetivo]
+        game.target = self.objetivo
+        game.current_player = self.player
+        # El sentido de juego no está en la observación (con dos jugadores no importa)
+        game.direction = 1
+        game.is_over = False
+        game.winner = None
+        return game
+
+
+def clave_nodo(game, observador):
+    """Conjunto de información de game tal como lo ve observador"""
+    color = game.color
+    mano = sorted(FIGURA[carta] if FIGURA[carta] >= COMODIN else color[carta] * 15 + FIGURA[carta]
+                  for carta in game.hands[observador])
+    return (game.current_player, tuple(mano), color[game.target] * 15 + FIGURA[game.target],
+            tuple(len(hand) for hand in game.hands))
+
+
+def _valor_heuristico(game):
+    """Valor en [-1, 1] para cada jugador de una partida cortada: cartas de menos que el resto"""
+    tamanos = [len(hand) for hand in game.hands]
+    total = sum(tamanos)
+    return [math.tanh((total - tamano * game.num_players) / (4 * (game.num_players - 1)))
+            for tamano in tamanos]
+
+
+def _simular(game, rng, max_jugadas):
+    """Juega al azar hasta el final (o max_jugadas) y devuelve el valor de cada jugador"""
+    for _ in range(max_jugadas):
+        if game.is_over:
+            return game.get_payoffs()
+        legales = game.acciones_legales(game.current_player)
+        game.jugar(legales[int(rng.random() * len(legales))])
+    if game.is_over:
+        return game.get_payoffs()
+    return _valor_heuristico(game)
+
+
+class BusquedaMCTS:
+    """ISMCTS con tabla de transposición persistente
+
+    tabla[clave] = {acción: [visitas, valor acumulado, disponibilidad]}, con
+    el valor desde el punto de vista del jugador que elige en ese nodo.
+    Con max_nodos nodos en la tabla las iteraciones dejan de expandir y
+    simulan desde el primer nodo nuevo; la tabla solo se vacía entre
+    jugadas (al empezar una búsqueda), nunca a mitad de una.
+
+    iteraciones y descartadas cuentan, desde que se creó la búsqueda, las
+    iteraciones hechas y las descartadas porque la determinización agotó el
+    mazo.
+    """
+
+    def __init__(self, exploracion=0.7, max_jugadas_simulacion=40, max_nodos=200000):
+        self.exploracion = exploracion
+        self.max_jugadas_simulacion = max_jugadas_simulacion
+        self.max_nodos = max_nodos
+        self.tabla = {}
+        self.iteraciones = 0
+        self.descartadas = 0
+
+    def reiniciar(self):
+        self.tabla = {}
+
+    def _iteracion(self, game, observador, rng):
+        camino = []
+        expandido = False
+        while not game.is_over and not expandido:
+            clave = clave_nodo(game, observador)
+            nodo = self.tabla.get(clave)
+            if nodo is None:
+                if len(self.tabla) >= self.max_nodos:
+                    break
+                nodo = self.tabla[clave] = {}
+
+            legales = list(dict.fromkeys(game.acciones_legales(game.current_player)))
+            nuevas = []
+            for accion in legales:
+                estadistica = nodo.get(accion)
+                if estadistica is None:
+                    estadistica = nodo[accion] = [0, 0.0, 0]
+                estadistica[2] += 1
+                if estadistica[0] == 0:
+                    nuevas.append(accion)
+
+            if nuevas:
+                accion = nuevas[int(rng.random() * len(nuevas))]
+                expandido = True
+            else:
+                mejor = -math.inf
+                for candidata in legales:
+                    visitas, valor, disponible = nodo[candidata]
+                    ucb = valor / visitas + self.exploracion * math.sqrt(math.log(disponible) / visitas)
+                    if ucb > mejor:
+                        mejor, accion = ucb, candidata
+
+            camino.append((nodo[accion], game.current_player))
+            game.jugar(accion)
+
+        valores = _simular(game, rng, self.max_jugadas_simulacion)
+        for estadistica, player in camino:
+            estadistica[0] += 1
+            estadistica[1] += valores[player]
+
+    def buscar(self, state, rng, limite_ns=None, max_iteraciones=None):
+        """Acción más visitada en la raíz tras iterar hasta limite_ns o max_iteraciones
+
+        No empieza una iteración si, al ritmo de las anteriores, terminaría
+        después de limite_ns. Devuelve (acción, iteraciones hechas); acción
+        es None si no dio tiempo a ninguna iteración.
+        """
+        determinizador = Determinizador(state)
+        np_random = np.random.RandomState(rng.getrandbits(32))
+        observador = determinizador.player
+        raiz = clave_nodo(determinizador.repartir(rng, np_random), observador)
+        if len(self.tabla) >= self.max_nodos and raiz not in self.tabla:
+            self.tabla = {}
+
+        iteraciones = 0
+        coste_ns = 0    # máximo reciente de lo que tarda una iteración
+        ahora = time.perf_counter_ns()
+        while ((max_iteraciones is None or iteraciones < max_iteraciones)
+               and (limite_ns is None or ahora + coste_ns < limite_ns)):
+            game = determinizador.repartir(rng, np_random)
+            try:
+                self._iteracion(game, observador, rng)
+            except IndexError:
+                # Mazo y descarte agotados (deck.pop() del motor) en la determinización:
+                # se descarta la iteración; cualquier otro error es un fallo
+                self.descartadas += 1
+            iteraciones += 1
+            antes, ahora = ahora, time.perf_counter_ns()
+            coste_ns = max(ahora - antes, coste_ns * 15 // 16)
+        self.iteraciones += iteraciones
+
+        nodo = self.tabla.get(raiz)
+        legales = list(state['legal_actions'])
+        if not nodo or not any(nodo.get(accion, (0,))[0] for accion in legales):
+            return None, iteraciones
+        return max(legales, key=lambda accion: nodo.get(accion, (0,))[0]), iteraciones
+
+
+def nuevo_rng(seed=None):
+    """Generador de Python (más rápido que NumPy para números sueltos)"""
+    if seed is not None and not isinstance(seed, int):
+        seed = int(np.random.SeedSequence(seed).generate_state(1)[0])
+    return random.Random(seed)
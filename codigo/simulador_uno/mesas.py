@@ -0,0 +1,40 @@
+"""Mesas de N jugadores y rotación de asientos
+
+Una mesa es una combinación de players_per_table agentes (índices en
+agents_dict, en orden); con dos jugadores las mesas son las parejas de
+siempre. Dentro de una mesa los agentes rotan de asiento partida a partida,
+así que en cada tanda de N partidas todos ocupan todos los asientos (el
+asiento 0 es el que empieza). En modo duplicado las N rotaciones de una
+tanda comparten reparto.
+"""
+
+from itertools import combinations
+
+
+def generar_mesas(num_agents, players_per_table):
+    """Todas las mesas posibles (round-robin de combinaciones) en orden lexicográfico"""
+    if not 2 <= players_per_table <= num_agents:
+        raise ValueError(f"Hacen falta entre 2 y {num_agents} jugadores por mesa "
+                         f"(se pidieron {players_per_table})")
+    return list(combinations(range(num_agents), players_per_table))
+
+
+def reparto_y_rotacion(game_num, players_per_table, duplicate=False):
+    """Reparto (semilla) y rotación de asientos de la partida game_num de una mesa"""
+    if duplicate:
+        return divmod(game_num, players_per_table)
+    return game_num, game_num % players_per_table
+
+
+def roles_por_asiento(rotacion, players_per_table):
+    """Rol (posición en la mesa) del agente de cada asiento con una rotación"""
+    return tuple((asiento + rotacion) % players_per_table for asiento in range(players_per_table))
+
+
+def asiento_de_rol(role, rotacion, players_per_table):
+    """Asiento que ocupa el agente de la posición role de la mesa con una rotación"""
+    return (role - rotacion) % players_per_table
+
+
+def etiqueta_mesa(mesa, agent_names):
+    return ' vs '.join(agent_names[i] for i in mesa)
@@ -0,0 +1,357 @@
+"""Motor UNO propio con las mismas reglas e ids de acción que rlcard
+
+rlcard representa cada carta como un objeto UnoCard y reconstruye en cada
+paso listas de strings, diccionarios y la codificación de la mano. Aquí las
+108 cartas son enteros (su posición en init_deck de rlcard): la figura de
+cada una está en una tabla fija y el color en una lista por partida (los
+comodines cambian de color al jugarse). Mazo, manos y descarte son listas
+de enteros y el estado del juego vive en un objeto con __slots__.
+
+Consume el azar en el mismo orden que rlcard (mismas barajadas y mismas
+elecciones de color), así que con la misma semilla juega exactamente las
+mismas partidas; benchmarks.comparar_con_rlcard lo comprueba paso a paso
+(tests/test_motor.py lo ejecuta con mesas de 2 y 4 jugadores).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from rlcard.games.uno.utils import ACTION_LIST, ACTION_SPACE
+from rlcard.utils import seeding
+
+NUM_ACCIONES = 61
+ROBAR = 60
+
+# Figuras: 0-9 números, luego cartas de acción y comodines (como TRAIT_MAP)
+SALTO, REVERSA, ROBA_2, COMODIN, COMODIN_ROBA_4 = 10, 11, 12, 13, 14
+ACCIONES_COMODIN = [color * 15 + COMODIN for color in range(4)]
+ACCIONES_COMODIN_4 = [color * 15 + COMODIN_ROBA_4 for color in range(4)]
+
+
+def _baraja():
+    """Color inicial y figura de las 108 cartas, en el orden de init_deck"""
+    colores, figuras = [], []
+    for color in range(4):
+        for figura in range(10):
+            copias = 1 if figura == 0 else 2
+            colores += [color] * copias
+            figuras += [figura] * copias
+        for figura in (SALTO, REVERSA, ROBA_2):
+            colores += [color] * 2
+            figuras += [figura] * 2
+        colores += [color, color]
+        figuras += [COMODIN, COMODIN_ROBA_4]
+    return colores, tuple(figuras)
+
+
+COLOR_INICIAL, FIGURA = _baraja()
+NUM_CARTAS = len(FIGURA)
+
+
+# Codificación de una mano vacía: plano 0 ("0 copias") a uno
+_OBS_VACIA = np.zeros((4, 4, 15), dtype=int)
+_OBS_VACIA[0] = 1
+_COLUMNAS_COMODIN = {figura: [color * 15 + figura for color in range(4)]
+                     for figura in (COMODIN, COMODIN_ROBA_4)}
+
+
+def codificar_obs(codigos, codigo_objetivo):
+    """Codificación (4, 4, 15) de rlcard a partir de los códigos color*15+figura
+
+    Planos 0-2: cartas de la mano con 0, 1 o 2 copias; los comodines se
+    marcan en los cuatro colores. Plano 3: carta objetivo. Se rellena carta a
+    carta sobre una copia de la mano vacía (la mano tiene pocas cartas).
+    """
+    obs = _OBS_VACIA.copy()
+    plano = obs.reshape(4, 60)
+    for codigo in codigos:
+        if codigo % 15 >= COMODIN:
+            columnas = _COLUMNAS_COMODIN[codigo % 15]
+            plano[0, columnas] = 0
+            plano[1, columnas] = 1
+        elif plano[1, codigo]:
+            plano[1, codigo] = 0
+            plano[2, codigo] = 1
+        else:
+            plano[0, codigo] = 0
+            plano[1, codigo] = 1
+    plano[3, codigo_objetivo] = 1
+    return obs
+
+
+class JuegoUNO:
+    """Estado de una partida: reglas de UnoGame/UnoRound/UnoDealer de rlcard"""
+
+    __slots__ = ('np_random', 'num_players', 'color', 'deck', 'hands', 'played',
+                 'target', 'current_player', 'direction', 'is_over', 'winner')
+
+    def __init__(self, num_players=2, np_random=None):
+        self.np_random = np_random if np_random is not None else np.random.RandomState()
+        self.num_players = num_players
+
+    def codigo(self, carta):
+        """Id de acción (color*15 + figura) de una carta con su color actual"""
+        return self.color[carta] * 15 + FIGURA[carta]
+
+    def _color_aleatorio(self):
+        # Igual que np_random.choice(['r', 'g', 'b', 'y'])
+        return int(self.np_random.choice(4))
+
+    def _repartir(self, hand, num):
+        for _ in range(num):
+            hand.append(self.deck.pop())
+
+    def _siguiente(self):
+        return (self.current_player + self.direction) % self.num_players
+
+    def init_game(self):
+        """Baraja, reparte 7 cartas a cada jugador y levanta la carta inicial"""
+        self.color = list(COLOR_INICIAL)
+        self.deck = list(range(NUM_CARTAS))
+        self.np_random.shuffle(self.deck)
+        self.hands = [[] for _ in range(self.num_players)]
+        for hand in self.hands:
+            self._repartir(hand, 7)
+
+        self.played = []
+        self.current_player = 0
+        self.direction = 1
+        self.is_over = False
+        self.winner = None
+
+        # La carta inicial nunca es un +4
+        top = self.deck.pop()
+        while FIGURA[top] == COMODIN_ROBA_4:
+            self.deck.append(top)
+            self.np_random.shuffle(self.deck)
+            top = self.deck.pop()
+        if FIGURA[top] == COMODIN:
+            self.color[top] = self._color_aleatorio()
+        self.target = top
+        self.played.append(top)
+
+        figura = FIGURA[top]
+        if figura == SALTO:
+            self.current_player = 1
+        elif figura == REVERSA:
+            self.direction = -1
+            self.current_player = -1 % self.num_players
+        elif figura == ROBA_2:
+            self._repartir(self.hands[self.current_player], 2)
+
+    def acciones_legales(self, player_id):
+        """Ids de las acciones legales, en el orden de rlcard y con sus repeticiones"""
+        legales = []
+        hay_comodin = hay_comodin_4 = False
+        color_objetivo = self.color[self.target]
+        figura_objetivo = FIGURA[self.target]
+
+        for carta in self.hands[player_id]:
+            figura = FIGURA[carta]
+            if figura == COMODIN_ROBA_4:
+                hay_comodin_4 = True
+            elif figura == COMODIN:
+                if not hay_comodin:
+                    hay_comodin = True
+                    legales.extend(ACCIONES_COMODIN)
+            else:
+                # Con un comodín de objetivo solo cuenta el color (ninguna figura coincide)
+                color = self.color[carta]
+                if color == color_objetivo or figura == figura_objetivo:
+                    legales.append(color * 15 + figura)
+
+        if not legales:
+            legales = list(ACCIONES_COMODIN_4) if hay_comodin_4 else [ROBAR]
+        return legales
+
+    def jugar(self, accion):
+        """Aplica una acción (id) del jugador actual"""
+        if accion == ROBAR:
+            self._robar()
+            return
+
+        color, figura = divmod(accion, 15)
+        hand = self.hands[self.current_player]
+        for index, carta in enumerate(hand):
+            if FIGURA[carta] == figura and (figura >= COMODIN or self.color[carta] == color):
+                break
+        else:
+            raise ValueError(f"La acción {ACTION_LIST[accion]} no está en la mano")
+        if figura >= COMODIN:
+            self.color[carta] = color
+
+        hand.pop(index)
+        if not hand:
+            self.is_over = True
+            self.winner = [self.current_player]
+        self.played.append(carta)
+
+        if figura < SALTO:
+            self.current_player = self._siguiente()
+            self.target = carta
+        else:
+            self._accion_especial(carta)
+
+    def _rebarajar(self):
+        """Devuelve el descarte al mazo y lo baraja"""
+        self.deck.extend(self.played)
+        self.np_random.shuffle(self.deck)
+        self.played = []
+
+    def _robar(self):
+        if not self.deck:
+            self._rebarajar()
+        carta = self.deck.pop()
+        figura = FIGURA[carta]
+
+        if figura >= COMODIN:
+            # Un comodín robado se juega con un color al azar (sin efecto de +4)
+            self.color[carta] = self._color_aleatorio()
+            self.target = carta
+            self.played.append(carta)
+            self.current_player = self._siguiente()
+        elif self.color[carta] == self.color[self.target]:
+            self.played.append(carta)
+            if figura < SALTO:
+                self.target = carta
+                self.current_player = self._siguiente()
+            else:
+                self._accion_especial(carta)
+        else:
+            self.hands[self.current_player].append(carta)
+            self.current_player = self._siguiente()
+
+    def _accion_especial(self, carta):
+        figura = FIGURA[carta]
+        current = self.current_player
+        direction = self.direction
+        victima = (current + direction) % self.num_players
+
+        if figura == REVERSA:
+            self.direction = -direction
+        elif figura == SALTO:
+            current = victima
+        elif figura == ROBA_2 or figura == COMODIN_ROBA_4:
+            num = 2 if figura == ROBA_2 else 4
+            if len(self.deck) < num:
+                self._rebarajar()
+            self._repartir(self.hands[victima], num)
+            current = victima
+        self.current_player = (current + self.direction) % self.num_players
+        self.target = carta
+
+    def get_payoffs(self):
+        """+1 al ganador y -1 al rival (como UnoGame.get_payoffs)"""
+        payoffs = [0] * self.num_players
+        if self.winner is not None and len(self.winner) == 1:
+            payoffs[self.winner[0]] = 1
+            payoffs[1 - self.winner[0]] = -1
+        return payoffs
+
+
+class EstadoUNO(dict):
+    """Estado de un agente que codifica 'obs' solo si alguien la lee
+
+    Random, Reglas y Probabilistico deciden con legal_actions y raw_obs; la
+    codificación (4, 4, 15) solo la usan agentes como CFR.
+    """
+
+    def __init__(self, codigos, codigo_objetivo, **campos):
+        super().__init__(**campos)
+        self._codigos = codigos
+        self._codigo_objetivo = codigo_objetivo
+
+    def __missing__(self, key):
+        if key != 'obs':
+            raise KeyError(key)
+        obs = self['obs'] = codificar_obs(self._codigos, self._codigo_objetivo)
+        return obs
+
+
+class EntornoUNO:
+    """Sustituto del env 'uno' de rlcard para la evaluación
+
+    Expone lo que usan el evaluador y los agentes (seed, set_agents,
+    num_players, num_actions, get_payoffs) y construye estados con las
+    mismas claves y valores que el env de rlcard.
+    """
+
+    name = 'uno-nativo'
+
+    def __init__(self, num_players=2):
+        self.num_players = num_players
+        self.num_actions = NUM_ACCIONES
+        self.game = JuegoUNO(num_players)
+        self.agents = None
+        self.seed()
+
+    def seed(self, seed=None):
+        """Misma derivación de la semilla que rlcard.envs.Env.seed"""
+        self.np_random, seed = seeding.np_random(seed)
+        self.game.np_random = self.np_random
+        return seed
+
+    def set_agents(self, agents):
+        self.agents = agents
+
+    def get_payoffs(self):
+        return np.array(self.game.get_payoffs())
+
+    def estado(self, player_id):
+        """Estado que recibe un agente (obs, legal_actions, raw_obs, raw_legal_actions)"""
+        return estado_juego(self.game, player_id)
+
+
+def estado_juego(game, player_id):
+    """Estado de un jugador de una partida, con las claves y valores del env de rlcard"""
+    color = game.color
+    codigos = [color[carta] * 15 + FIGURA[carta] for carta in game.hands[player_id]]
+    # rlcard muestra el objetivo con UnoCard.str, fijado al crear la carta: un
+    # comodín aparece con su color de baraja, no con el elegido al jugarlo
+    codigo_objetivo = COLOR_INICIAL[game.target] * 15 + FIGURA[game.target]
+    legales = game.acciones_legales(player_id)
+    raw_legal_actions = [ACTION_LIST[accion] for accion in legales]
+
+    raw_obs = {
+        'hand': [ACTION_LIST[codigo] for codigo in codigos],
+        'target': ACTION_LIST[codigo_objetivo],
+        'legal_actions': raw_legal_actions,
+        'num_cards': [len(hand) for hand in game.hands],
+        'num_players': game.num_players,
+        'current_player': game.current_player
+    }
+    return EstadoUNO(codigos, codigo_objetivo,
+                     legal_actions=OrderedDict.fromkeys(legales),
+                     raw_obs=raw_obs,
+                     raw_legal_actions=list(raw_legal_actions))
+
+
+def nuevo_juego(semilla, num_players=2):
+    """Partida ya repartida con el azar que tendría EntornoUNO tras seed(semilla)"""
+    game = JuegoUNO(num_players, seeding.np_random(semilla)[0])
+    game.init_game()
+    return game
+
+
+def accion_agente(agent, state):
+    """Id de la acción que elige un agente (como env._decode_action de rlcard)"""
+    action, _ = agent.eval_step(state)
+    if agent.use_raw:
+        return ACTION_SPACE[action]
+    if action not in state['legal_actions']:
+        return np.random.choice(list(state['legal_actions']))
+    return action
+
+
+def jugar_partida_nativa(env, agents):
+    """Equivalente de partida.jugar_partida sobre EntornoUNO"""
+    game = env.game
+    game.init_game()
+
+    num_moves = 0
+    while not game.is_over:
+        state = env.estado(game.current_player)
+        game.jugar(int(accion_agente(agents[game.current_player], state)))
+        num_moves += 1
+
+    return env.get_payoffs(), 2 * num_moves + game.num_players
@@ -0,0 +1,120 @@
+"""Bucle de juego ligero para partidas de evaluación"""
+
+from collections import OrderedDict
+
+import numpy as np
+import rlcard
+from rlcard.games.uno.utils import ACTION_SPACE, ACTION_LIST, encode_hand, encode_target
+
+from .motor import EntornoUNO, jugar_partida_nativa
+
+
+def estado_jugador(game, player_id):
+    """Construye el estado que reciben los agentes, sin historial de cartas jugadas
+
+    Tiene las mismas claves que usan los agentes del env de rlcard ('obs',
+    'legal_actions', 'raw_obs', 'raw_legal_actions') pero calcula las acciones
+    legales una sola vez y no copia la lista de cartas jugadas en cada paso.
+    """
+    players = game.players
+    round = game.round
+    hand = [card.get_str() for card in players[player_id].hand]
+    target = round.target.str
+    raw_legal_actions = round.get_legal_actions(players, player_id)
+
+    obs = np.zeros((4, 4, 15), dtype=int)
+    encode_hand(obs[:3], hand)
+    encode_target(obs[3], target)
+
+    raw_obs = {
+        'hand': hand,
+        'target': target,
+        'legal_actions': raw_legal_actions,
+        'num_cards': [len(player.hand) for player in players],
+        'num_players': game.num_players,
+        'current_player': player_id
+    }
+    return {
+        'obs': obs,
+        'legal_actions': OrderedDict((ACTION_SPACE[action], None) for action in raw_legal_actions),
+        'raw_obs': raw_obs,
+        'raw_legal_actions': raw_legal_actions
+    }
+
+
+def jugar_partida(env, agents):
+    """Juega una partida completa sin guardar trayectorias
+
+    Consume el azar en el mismo orden que env.run(is_training=False), así que
+    con la misma semilla produce la misma partida.
+
+    Returns:
+        tuple: (payoffs, total_turns)
+    """
+    if isinstance(env, EntornoUNO):
+        return jugar_partida_nativa(env, agents)
+
+    game = env.game
+    game.init_game()
+
+    num_moves = 0
+    while not game.round.is_over:
+        player_id = game.round.current_player
+        state = estado_jugador(game, player_id)
+
+        agent = agents[player_id]
+        action, _ = agent.eval_step(state)
+        if not agent.use_raw:
+            # Igual que env._decode_action, reutilizando las acciones legales ya calculadas
+            if action in state['legal_actions']:
+                action = ACTION_LIST[action]
+            else:
+                action = ACTION_LIST[np.random.choice(list(state['legal_actions']))]
+
+        game.round.proceed_round(game.players, action)
+        num_moves += 1
+
+    # Mismo conteo que sum(len(traj) for traj in trajectories) de env.run:
+    # estado inicial + (acción, estado) por jugada - último estado + estado final
+    # de cada jugador. Así los turnos siguen siendo comparables con los datasets.
+    total_turns = 2 * num_moves + game.num_players
+
+    return env.get_payoffs(), total_turns
+
+
+def crear_entorno(env_id, num_players=2):
+    """Crea un entorno por nombre: el motor propio ('uno-nativo') o un env de rlcard
+
+    El env de UNO de rlcard ignora game_num_players en la configuración de
+    make, así que el número de jugadores se fija directamente en su juego.
+    """
+    if env_id == EntornoUNO.name:
+        return EntornoUNO(num_players)
+    env = rlcard.make(env_id)
+    if env.num_players != num_players:
+        env.game.configure({'game_num_players': num_players})
+        env.num_players = num_players
+    return env
+
+
+def ganadores(env):
+    """Lista de ganadores de la última partida jugada en env (como round.winner de rlcard)"""
+    if isinstance(env, EntornoUNO):
+        return env.game.winner
+    return env.game.round.winner
+
+
+def resultado_mesa(winner, num_players):
+    """+1 al ganador y -1 al resto
+
+    No sale de get_payoffs: el de rlcard (y el del motor nativo, que lo
+    replica) solo es correcto con dos jugadores; con más escribe -1 en
+    payoffs[1 - ganador], que con tres jugadores pisa el +1 del asiento 2.
+    """
+    ganador = winner[0] if winner is not None and len(winner) == 1 else None
+    return tuple(1 if player == ganador else -1 for player in range(num_players))
+
+
+def version_motor(env):
+    """Identifica el motor que juega las partidas (para la caché de resultados)"""
+    return f"{env.name}-rlcard-{rlcard.__version__}"
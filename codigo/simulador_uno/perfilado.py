@@ -0,0 +1,203 @@
+"""Perfilado por muestreo de las partidas y del análisis
+
+Un Perfilador iniciado recibe SIGPROF cada intervalo_s segundos de CPU
+(solo en sistemas POSIX; en la práctica el núcleo redondea a su tic, unos
+4 ms en Linux). Si en ese momento está activo, toma la pila de llamadas y la
+cuenta en el componente al que pertenece:
+
+- el agente que está decidiendo (dentro de AgenteCronometrado.step/eval_step
+  o de lote.decidir_lote), identificado por su índice en la evaluación;
+- 'io' si la pila pasa por el registro de partidas, el checkpoint o la caché;
+- si no, el componente con el que se activó ('motor' durante las partidas,
+  'contabilidad' al fusionar los bloques, el nombre de la etapa en el análisis).
+
+Solo se activa en una fracción de las partidas o etapas (elige), así que
+el coste es proporcional a esa fracción. El temporizador se arma una vez por
+proceso (iniciar) y no en cada activación: rearmarlo descartaría el tiempo
+acumulado hacia la siguiente muestra y las partidas cortas no recibirían
+ninguna. Las muestras de cada proceso son un Counter que viaja con sus
+resultados (extraer) y se suma en el proceso principal (sumar), de modo que
+el informe cubre todos los workers.
+
+escribir deja una pila plegada por componente (<componente>.folded, una
+línea "marco;marco;... muestras" por pila, el formato de flamegraph.pl,
+inferno o speedscope), todo.folded con el componente como raíz, y
+resumen.txt con las muestras de cada componente y sus funciones con más
+tiempo propio.
+"""
+
+import os
+import signal
+import sys
+import zlib
+from collections import Counter, defaultdict
+from functools import partial
+
+from .latencias import AgenteCronometrado
+from .lote import decidir_lote
+
+MOTOR = 'motor'
+CONTABILIDAD = 'contabilidad'
+IO = 'io'
+
+# Llamadas a un agente: el agente está en self.agent (AgenteCronometrado) o en agent (decidir_lote)
+_CODIGOS_AGENTE = {AgenteCronometrado.step.__code__, AgenteCronometrado.eval_step.__code__,
+                   decidir_lote.__code__}
+# Módulos cuyo trabajo es entrada/salida
+_ARCHIVOS_IO = {'registro.py', 'checkpoint.py', 'cache.py'}
+
+
+class Perfilador:
+    """Muestras de pila por componente, de una o varias activaciones
+
+    agentes asocia id(agente) con su índice en la evaluación; los componentes
+    de agente se guardan como ese índice y escribir los traduce a nombres.
+    """
+
+    def __init__(self, intervalo_s=0.001, fraccion=0.1):
+        if not hasattr(signal, 'setitimer'):
+            raise RuntimeError("El perfilado por muestreo necesita signal.setitimer (Linux o macOS)")
+        self.intervalo_s = intervalo_s
+        self.fraccion = fraccion
+        self.pilas = Counter()
+        self.agentes = {}
+        self._base = None
+        self._raiz = None
+        self._anterior = None
+        self._temporizador = None
+        self._marcos = {}
+
+    def vacio(self):
+        """Perfilador con la misma configuración y sin muestras (p. ej. para un worker)"""
+        return Perfilador(self.intervalo_s, self.fraccion)
+
+    def elige(self, clave):
+        """True para una fracción `fraccion` de las claves (determinista, sin gastar azar)
+
+        clave es un entero (p. ej. la semilla de una partida) o un nombre
+        (p. ej. el de una etapa del análisis).
+        """
+        if isinstance(clave, str):
+            clave = zlib.crc32(clave.encode('utf-8'))
+        return clave % 1_000_000 < self.fraccion * 1_000_000
+
+    def iniciar(self):
+        """Arma el temporizador del proceso (guardando el manejador y temporizador anteriores)"""
+        self._anterior = signal.signal(signal.SIGPROF, self._muestra)
+        self._temporizador = signal.setitimer(signal.ITIMER_PROF, self.intervalo_s, self.intervalo_s)
+
+    def detener(self):
+        """Restaura el temporizador y el manejador que había antes de iniciar"""
+        signal.setitimer(signal.ITIMER_PROF, *self._temporizador)
+        signal.signal(signal.SIGPROF, self._anterior or signal.SIG_DFL)
+        self._raiz = None
+
+    def activar(self, componente):
+        """Empieza a contar muestras; las pilas se cortan en la función que llama"""
+        self._base = componente
+        self._raiz = sys._getframe(1)
+
+    def desactivar(self):
+        self._raiz = None
+
+    def _marco(self, code):
+        etiqueta = self._marcos.get(code)
+        if etiqueta is None:
+            etiqueta = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._marcos[code] = etiqueta
+        return etiqueta
+
+    def _componente(self, frame):
+        code = frame.f_code
+        if code in _CODIGOS_AGENTE:
+            local = frame.f_locals
+            agente = local['self'].agent if 'self' in local else local['agent']
+            return self.agentes.get(id(agente))
+        if os.path.basename(code.co_filename) in _ARCHIVOS_IO:
+            return IO
+        return None
+
+    def _muestra(self, signum, frame):
+        if self._raiz is None:
+            return
+        componente = None
+        pila = []
+        while frame is not None:
+            pila.append(self._marco(frame.f_code))
+            if componente is None:
+                componente = self._componente(frame)
+            if frame is self._raiz:
+                break
+            frame = frame.f_back
+        pila.reverse()
+        self.pilas[(self._base if componente is None else componente, ';'.join(pila))] += 1
+
+    def extraer(self):
+        """Devuelve las muestras acumuladas y empieza de cero (las de un bloque)"""
+        pilas, self.pilas = self.pilas, Counter()
+        return pilas
+
+    def sumar(self, pilas):
+        """Añade las muestras de otro proceso (el Counter de su Perfilador)"""
+        self.pilas.update(pilas)
+
+    def envolver(self, funcion, componente):
+        """funcion perfilada entera en el proceso que la ejecute; devuelve (resultado, pilas)"""
+        return partial(_llamada_perfilada, self.intervalo_s, componente, funcion)
+
+    def por_componente(self, nombres=()):
+        """{componente: Counter de pilas}, con los índices de agente traducidos a nombres"""
+        componentes = defaultdict(Counter)
+        for (componente, pila), muestras in self.pilas.items():
+            if isinstance(componente, int):
+                componente = nombres[componente] if componente < len(nombres) else f'agente {componente}'
+            componentes[componente][pila] += muestras
+        return dict(componentes)
+
+    def escribir(self, directorio, nombres=(), top=15):
+        """Pilas plegadas por componente, todo.folded y resumen.txt; devuelve el resumen"""
+        os.makedirs(directorio, exist_ok=True)
+        componentes = self.por_componente(nombres)
+        total = sum(self.pilas.values())
+
+        for componente, pilas in componentes.items():
+            with open(os.path.join(directorio, f'{_archivo(componente)}.folded'), 'w', encoding='utf-8') as f:
+                for pila, muestras in pilas.most_common():
+                    f.write(f"{pila} {muestras}\n")
+        with open(os.path.join(directorio, 'todo.folded'), 'w', encoding='utf-8') as f:
+            for componente, pilas in componentes.items():
+                for pila, muestras in pilas.most_common():
+                    f.write(f"{_archivo(componente)};{pila} {muestras}\n")
+
+        lineas = [f"Muestras: {total} (intervalo {self.intervalo_s * 1000:g} ms de CPU, "
+                  f"fracción perfilada {self.fraccion:g})", ""]
+        for componente, pilas in sorted(componentes.items(), key=lambda c: -sum(c[1].values())):
+            muestras = sum(pilas.values())
+            lineas.append(f"{componente}: {muestras} muestras ({muestras / max(total, 1):.1%})")
+            # Tiempo propio: muestras en las que la función es la más interna de la pila
+            propio = Counter()
+            for pila, n in pilas.items():
+                propio[pila.rsplit(';', 1)[-1]] += n
+            for funcion, n in propio.most_common(top):
+                lineas.append(f"    {n / muestras:6.1%}  {funcion}")
+            lineas.append("")
+        resumen = '\n'.join(lineas)
+        with open(os.path.join(directorio, 'resumen.txt'), 'w', encoding='utf-8') as f:
+            f.write(resumen)
+        return resumen
+
+
+def _archivo(componente):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in str(componente))
+
+
+def _llamada_perfilada(intervalo_s, componente, funcion, *args):
+    perfil = Perfilador(intervalo_s, 1.0)
+    perfil.iniciar()
+    perfil.activar(componente)
+    try:
+        resultado = funcion(*args)
+    finally:
+        perfil.desactivar()
+        perfil.detener()
+    return resultado, perfil.pilas
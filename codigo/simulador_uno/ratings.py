@@ -0,0 +1,145 @@
+"""Ratings TrueSkill incrementales y emparejamiento adaptativo
+
+Cada agente tiene un rating gaussiano (mu, sigma) que se actualiza partida
+a partida con el resultado, según la actualización de TrueSkill para dos
+jugadores sin empates. En una mesa de más jugadores el ganador se actualiza
+contra cada perdedor por separado (la aproximación habitual por parejas).
+
+Con el emparejamiento adaptativo, en lugar de jugar todas las parejas, cada
+ronda elige las parejas más informativas: las de resultado más incierto
+(mayor calidad de partida de TrueSkill) entre agentes cuyo rating aún tiene
+mucha incertidumbre. Así un conjunto grande de agentes se ordena con muchas
+menos partidas que el round-robin completo.
+"""
+
+import math
+
+MU_INICIAL = 25.0
+SIGMA_INICIAL = MU_INICIAL / 3
+BETA = SIGMA_INICIAL / 2
+TAU = SIGMA_INICIAL / 100
+
+
+def _pdf(x):
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def _cdf(x):
+    return 0.5 * math.erfc(-x / math.sqrt(2))
+
+
+def _v_w(t):
+    """Factores de corrección de la media y la varianza (victoria, sin empates)"""
+    denominador = _cdf(t)
+    # Para t muy negativo el cociente tiende a -t (y w a 1)
+    v = _pdf(t) / denominador if denominador > 1e-300 else -t
+    return v, v * (v + t)
+
+
+class TablaRatings:
+    """Rating (mu, sigma) y partidas de cada agente, por índice en agents_dict"""
+
+    def __init__(self, num_agents, mu=MU_INICIAL, sigma=SIGMA_INICIAL, beta=BETA, tau=TAU):
+        self.mu = [mu] * num_agents
+        self.sigma = [sigma] * num_agents
+        self.partidas = [0] * num_agents
+        self.beta = beta
+        self.tau = tau
+
+    def _c2(self, i, j):
+        return 2 * self.beta ** 2 + self.sigma[i] ** 2 + self.sigma[j] ** 2
+
+    def actualizar(self, ganador, perdedor):
+        """Actualiza los dos ratings tras una victoria de ganador sobre perdedor"""
+        # Dinámica: un poco de incertidumbre extra antes de cada partida
+        var_g = self.sigma[ganador] ** 2 + self.tau ** 2
+        var_p = self.sigma[perdedor] ** 2 + self.tau ** 2
+        c2 = 2 * self.beta ** 2 + var_g + var_p
+        c = math.sqrt(c2)
+        v, w = _v_w((self.mu[ganador] - self.mu[perdedor]) / c)
+
+        self.mu[ganador] += var_g / c * v
+        self.mu[perdedor] -= var_p / c * v
+        self.sigma[ganador] = math.sqrt(var_g * max(1 - var_g / c2 * w, 1e-12))
+        self.sigma[perdedor] = math.sqrt(var_p * max(1 - var_p / c2 * w, 1e-12))
+
+    def registrar_partida(self, seat_agents, payoffs):
+        """Actualiza con una partida: agente (índice) y payoff de cada asiento"""
+        ganadores = [agent for agent, payoff in zip(seat_agents, payoffs) if payoff > 0]
+        for agent in seat_agents:
+            self.partidas[agent] += 1
+        if len(ganadores) != 1:
+            return
+        for agent in seat_agents:
+            if agent != ganadores[0]:
+                self.actualizar(ganadores[0], agent)
+
+    def calidad(self, i, j):
+        """Calidad de partida de TrueSkill: alta si el resultado es incierto"""
+        c2 = self._c2(i, j)
+        return math.sqrt(2 * self.beta ** 2 / c2) * math.exp(-(self.mu[i] - self.mu[j]) ** 2 / (2 * c2))
+
+    def informacion(self, i, j):
+        """Lo que se espera aprender de enfrentar a i y j: calidad por incertidumbre"""
+        return self.calidad(i, j) * (self.sigma[i] ** 2 + self.sigma[j] ** 2)
+
+    def conservador(self, i):
+        """Rating conservador mu - 3 sigma (cota inferior con ~99% de confianza)"""
+        return self.mu[i] - 3 * self.sigma[i]
+
+    def dataframe(self, agent_names):
+        """Ratings ordenados por el rating conservador"""
+        import pandas as pd
+        df = pd.DataFrame({
+            'Agente': agent_names,
+            'Mu': self.mu,
+            'Sigma': self.sigma,
+            'Rating_Conservador': [self.conservador(i) for i in range(len(agent_names))],
+            'Partidas': self.partidas
+        })
+        df = df.sort_values('Rating_Conservador', ascending=False, ignore_index=True)
+        df.insert(0, 'Posicion', range(1, len(df) + 1))
+        return df
+
+
+def elegir_emparejamientos(pairs, ratings, num_matchups):
+    """Las num_matchups parejas más informativas, con agentes distintos mientras se pueda
+
+    Se eligen de mayor a menor información; una pareja con un agente ya
+    elegido en esta ronda solo entra si no quedan parejas con agentes libres.
+    Los empates se deshacen por el orden de pairs, así que es determinista.
+    """
+    ordenadas = sorted(pairs, key=lambda pair: -ratings.informacion(*pair))
+    elegidas, usados = [], set()
+    for permitir_repetidos in (False, True):
+        for pair in ordenadas:
+            if len(elegidas) == num_matchups:
+                return elegidas
+            if pair in elegidas or (not permitir_repetidos and usados.intersection(pair)):
+                continue
+            elegidas.append(pair)
+            usados.update(pair)
+    return elegidas
+
+
+def planificar_ronda_adaptativa(pairs, stats, ratings, presupuesto, batch_size, chunk_size,
+                                num_matchups, duplicate=False):
+    """Bloques (pareja, inicio, fin) de una ronda con emparejamiento adaptativo
+
+    Como secuencial.planificar_ronda, pero solo para las num_matchups
+    parejas que elige elegir_emparejamientos con los ratings actuales.
+    """
+    elegidas = elegir_emparejamientos(pairs, ratings, num_matchups)
+    n = min(batch_size, presupuesto // max(len(elegidas), 1))
+    if duplicate:
+        n -= n % 2
+    if n <= 0:
+        return [], 0
+
+    tasks = []
+    for pair in sorted(elegidas):
+        start = stats[pair].siguiente
+        tasks.extend((pair, inicio, min(inicio + chunk_size, start + n))
+                     for inicio in range(start, start + n, chunk_size))
+        stats[pair].siguiente += n
+    return tasks, n * len(elegidas)
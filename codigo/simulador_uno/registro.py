@@ -0,0 +1,185 @@
+"""Registro en disco, por bloques, de los resultados de cada partida
+
+Cada partida terminada se añade como una fila a un CSV que se escribe en
+bloques de chunk_size filas. La memoria usada no crece con el número de
+partidas y, si la ejecución se interrumpe, lo ya volcado sigue en disco.
+Los CSV de resumen y detallado se derivan después leyendo este archivo
+también por bloques.
+"""
+
+import csv
+import os
+
+import numpy as np
+
+
+def columnas_registro(num_players):
+    """Columnas del registro para mesas de num_players jugadores
+
+    Mesa es el índice de la mesa en la evaluación. Agente_k/Payoff_k/Tiempo_k_ms
+    corresponden al asiento k - 1 (Agente_1 es el que empieza). Reparto
+    identifica la semilla de la partida: en modo duplicado se repite en las
+    partidas de la misma tanda de rotaciones.
+    """
+    asientos = range(1, num_players + 1)
+    return (['Mesa'] + [f'Agente_{k}' for k in asientos] + ['Partida_Mesa', 'Reparto']
+            + [f'Payoff_{k}' for k in asientos] + [f'Tiempo_{k}_ms' for k in asientos]
+            + ['Turnos_Totales'])
+
+
+def _num_asientos(chunk):
+    return sum(columna.startswith('Agente_') for columna in chunk.columns)
+
+
+class RegistroPartidas:
+    """Sink de partidas: acumula filas y las vuelca al CSV cada chunk_size"""
+
+    def __init__(self, path, num_players=2, chunk_size=1000, truncar_a=None):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._buffer = []
+
+        if truncar_a is not None:
+            # Reanudación: descartar lo escrito después del último checkpoint
+            with open(self.path, 'r+b') as f:
+                f.truncate(truncar_a)
+            return
+
+        # Empezar con un archivo nuevo que solo tenga la cabecera
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerow(columnas_registro(num_players))
+
+    def agregar(self, table_id, seat_names, game_num, deal, payoffs, move_times, total_turns):
+        """Añade una partida (nombres, payoffs y tiempos por asiento); vuelca al completar un bloque"""
+        self._buffer.append((table_id, *seat_names, game_num, deal,
+                             *(int(payoff) for payoff in payoffs),
+                             *(move_time * 1000 for move_time in move_times),
+                             total_turns))
+        if len(self._buffer) >= self.chunk_size:
+            self.volcar()
+
+    def volcar(self):
+        """Escribe las filas pendientes al final del archivo"""
+        if not self._buffer:
+            return
+        with open(self.path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(self._buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        self._buffer = []
+
+    def tamano(self):
+        """Vuelca lo pendiente y devuelve el tamaño del archivo en bytes"""
+        self.volcar()
+        return os.path.getsize(self.path)
+
+
+def leer_registro(path, chunksize=100000):
+    """Itera el registro de partidas en DataFrames de chunksize filas"""
+    import pandas as pd
+    return pd.read_csv(path, chunksize=chunksize, float_precision='round_trip')
+
+
+def _filas_agente(chunk, agent_name):
+    """Partidas del chunk en las que jugó el agente, con sus columnas ya elegidas
+
+    Returns:
+        tuple: (victoria, tiempo, turnos, mesa, asiento), arrays en el orden del registro
+    """
+    num_asientos = _num_asientos(chunk)
+    asiento = np.full(len(chunk), -1)
+    for k in range(num_asientos):
+        asiento[(chunk[f'Agente_{k + 1}'] == agent_name).to_numpy()] = k
+    jugadas = asiento >= 0
+    asiento = asiento[jugadas]
+    filas = np.flatnonzero(jugadas)
+
+    payoffs = chunk[[f'Payoff_{k + 1}' for k in range(num_asientos)]].to_numpy()
+    tiempos = chunk[[f'Tiempo_{k + 1}_ms' for k in range(num_asientos)]].to_numpy()
+    payoff = payoffs[filas, asiento]
+    tiempo = tiempos[filas, asiento]
+    turnos = chunk['Turnos_Totales'].to_numpy()[jugadas]
+    mesa = chunk['Mesa'].to_numpy()[jugadas]
+    return (payoff > 0).astype(int), tiempo, turnos, mesa, asiento
+
+
+def _bloques_detallado(path, agent_names, chunksize):
+    """Genera el detallado por bloques: para cada agente, sus partidas en orden"""
+    import pandas as pd
+    for agent_name in agent_names:
+        partida = 0
+        for chunk in leer_registro(path, chunksize):
+            victoria, tiempo, turnos, mesa, asiento = _filas_agente(chunk, agent_name)
+            if len(victoria) == 0:
+                continue
+            yield pd.DataFrame({
+                'Agente': agent_name,
+                'Partida': np.arange(partida + 1, partida + len(victoria) + 1),
+                'Victoria': victoria,
+                'Tiempo_Jugada_ms': tiempo,
+                'Turnos_Totales': turnos,
+                'Mesa': mesa,
+                'Asiento': asiento
+            })
+            partida += len(victoria)
+
+
+def escribir_detallado(path, agent_names, output_path, chunksize=100000):
+    """Escribe el CSV detallado (una fila por agente y partida) desde el registro
+
+    Mantiene el formato de siempre ('Partida' se numera desde 1 para cada
+    agente) con dos columnas más al final: Mesa y Asiento (0 = el que empieza).
+    """
+    header = True
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        for bloque in _bloques_detallado(path, agent_names, chunksize):
+            bloque.to_csv(f, header=header, index=False)
+            header = False
+
+
+def leer_detallado(path, agent_names, chunksize=100000):
+    """DataFrame detallado completo (carga todo en memoria; para datasets pequeños)"""
+    import pandas as pd
+    bloques = list(_bloques_detallado(path, agent_names, chunksize))
+    if not bloques:
+        return pd.DataFrame(columns=['Agente', 'Partida', 'Victoria', 'Tiempo_Jugada_ms', 'Turnos_Totales',
+                                     'Mesa', 'Asiento'])
+    return pd.concat(bloques, ignore_index=True)
+
+
+def agregar_registro(path, agent_names, chunksize=100000):
+    """Sumas por agente (partidas, victorias, tiempos, turnos) en una pasada"""
+    agregados = {name: {'partidas': 0, 'victorias': 0, 'suma_tiempo': 0.0,
+                        'suma_tiempo2': 0.0, 'suma_turnos': 0}
+                 for name in agent_names}
+
+    for chunk in leer_registro(path, chunksize):
+        for agent_name, agregado in agregados.items():
+            victoria, tiempo, turnos, _, _ = _filas_agente(chunk, agent_name)
+            agregado['partidas'] += len(victoria)
+            agregado['victorias'] += int(victoria.sum())
+            agregado['suma_tiempo'] += float(tiempo.sum())
+            agregado['suma_tiempo2'] += float(np.square(tiempo).sum())
+            agregado['suma_turnos'] += int(turnos.sum())
+
+    return agregados
+
+
+def agregar_asientos(path, agent_names, chunksize=100000):
+    """Partidas y victorias por (mesa, agente, asiento), en una pasada por el registro"""
+    import pandas as pd
+    partes = []
+    for chunk in leer_registro(path, chunksize):
+        for agent_name in agent_names:
+            victoria, _, _, mesa, asiento = _filas_agente(chunk, agent_name)
+            filas = pd.DataFrame({'Mesa': mesa, 'Agente': agent_name, 'Asiento': asiento,
+                                  'Victoria': victoria})
+            partes.append(filas.groupby(['Mesa', 'Agente', 'Asiento'])['Victoria']
+                          .agg(Partidas='count', Victorias='sum'))
+
+    if not partes:
+        return pd.DataFrame(columns=['Mesa', 'Agente', 'Asiento', 'Partidas', 'Victorias'])
+    conteos = pd.concat(partes).groupby(level=[0, 1, 2]).sum().reset_index()
+    # Agentes en el orden de agents_dict dentro de cada mesa
+    conteos['Agente'] = pd.Categorical(conteos['Agente'], categories=agent_names)
+    return conteos.sort_values(['Mesa', 'Agente', 'Asiento'], ignore_index=True)
@@ -0,0 +1,91 @@
+"""Planificación por rondas con parada temprana por pareja
+
+En vez de dar a cada pareja num_games // parejas partidas, se juegan rondas
+de batch_size partidas por pareja activa. Tras cada ronda se calcula el
+intervalo de confianza al 95% de la tasa de victoria de cada pareja y se
+detienen las que ya tienen un semiancho <= target_ci. El presupuesto que
+dejan libre se reparte entre las parejas que siguen indecisas.
+"""
+
+import numpy as np
+
+Z_95 = 1.96
+
+
+class EstadisticaPareja:
+    """Conteos de una pareja (desde el punto de vista de su primer agente)"""
+
+    def __init__(self):
+        self.partidas = 0
+        self.victorias = 0
+        self.siguiente = 0      # índice de la próxima partida a planificar
+        self.detenida = False
+        # Modo duplicado: puntuación media por reparto
+        self.repartos = 0
+        self.suma = 0.0
+        self.suma2 = 0.0
+        self._pendientes = {}
+
+    def registrar(self, deal, victoria):
+        """Añade el resultado (1/0) del primer agente de la pareja en una partida"""
+        self.partidas += 1
+        self.victorias += victoria
+
+        if deal not in self._pendientes:
+            self._pendientes[deal] = victoria
+            return
+        puntuacion = (self._pendientes.pop(deal) + victoria) / 2
+        self.repartos += 1
+        self.suma += puntuacion
+        self.suma2 += puntuacion ** 2
+
+    def tasa(self):
+        return self.victorias / self.partidas if self.partidas else 0.0
+
+    def semiancho_ic95(self, duplicate=False):
+        """Semiancho del IC95 de la tasa de victoria (pareado por reparto si duplicate)"""
+        if duplicate:
+            if self.repartos < 2:
+                return np.inf
+            media = self.suma / self.repartos
+            varianza = max((self.suma2 - self.repartos * media ** 2) / (self.repartos - 1), 0.0)
+            return Z_95 * np.sqrt(varianza / self.repartos)
+
+        if self.partidas == 0:
+            return np.inf
+        p = self.tasa()
+        return Z_95 * np.sqrt(p * (1 - p) / self.partidas)
+
+
+def planificar_ronda(pairs, stats, presupuesto, batch_size, chunk_size, duplicate=False):
+    """Bloques (pareja, inicio, fin) de la siguiente ronda para las parejas activas
+
+    Cada pareja activa recibe batch_size partidas, o una parte igual del
+    presupuesto restante si no llega para todas (en modo duplicado siempre
+    un número par). Devuelve la lista de bloques y las partidas que consume.
+    """
+    activas = [pair for pair in pairs if not stats[pair].detenida]
+    if not activas:
+        return [], 0
+
+    n = min(batch_size, presupuesto // len(activas))
+    if duplicate:
+        n -= n % 2
+    if n <= 0:
+        return [], 0
+
+    tasks = []
+    for pair in activas:
+        start = stats[pair].siguiente
+        tasks.extend((pair, inicio, min(inicio + chunk_size, start + n))
+                     for inicio in range(start, start + n, chunk_size))
+        stats[pair].siguiente += n
+    return tasks, n * len(activas)
+
+
+def aplicar_parada(pairs, stats, target_ci, duplicate):
+    """Detiene las parejas cuyo IC95 ya es suficientemente estrecho"""
+    for pair in pairs:
+        estadistica = stats[pair]
+        if not estadistica.detenida and estadistica.semiancho_ic95(duplicate) <= target_ci:
+            estadistica.detenida = True
@@ -0,0 +1,233 @@
+"""Telemetría de una evaluación en curso: eventos JSONL y métricas estilo Prometheus
+
+Cada intervalo_s segundos (y al terminar cada bloque, si ya toca) se añade
+a ruta_jsonl una línea con el progreso: partidas jugadas, partidas por
+segundo (total y de la última ventana), ETA, progreso de cada pareja o mesa,
+percentiles de latencia de cada agente y del motor, errores por tipo y
+memoria de cada worker. Cada error se escribe además como su propio evento,
+con el mensaje y la traza completos.
+
+ruta_metricas se reescribe de forma atómica con las mismas cifras en el
+formato de texto de Prometheus (apto para el textfile collector de
+node_exporter o para leerlo con cat/watch).
+
+Mientras se espera a los workers se siguen emitiendo latidos: un worker
+atascado se ve porque sus segundos desde el último bloque no dejan de crecer.
+"""
+
+import json
+import os
+import sys
+import time
+import traceback
+from collections import Counter
+
+from .mesas import etiqueta_mesa
+
+
+def describir_error(e, partida=None):
+    """Error de una partida como dict serializable (tipo, mensaje y traza completa)"""
+    return {'partida': partida, 'tipo': type(e).__name__, 'mensaje': str(e),
+            'traza': traceback.format_exc()}
+
+
+def memoria_mb():
+    """Memoria residente del proceso en MB (la actual en Linux, el pico en otros sistemas)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss va en bytes en macOS y en KB en Linux/BSD
+    return pico / 2**20 if sys.platform == 'darwin' else pico / 1024
+
+
+def info_proceso():
+    """Lo que cada bloque jugado dice de su proceso (pid y memoria)"""
+    return {'pid': os.getpid(), 'memoria_mb': memoria_mb()}
+
+
+def _etiqueta(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _escribir_atomico(ruta, texto):
+    temporal = ruta + '.tmp'
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    os.replace(temporal, ruta)
+
+
+class Telemetria:
+    """Progreso, ritmo, latencias, errores y workers de evaluate_agents
+
+    Sin ruta_jsonl ni ruta_metricas no escribe nada (activa es False).
+    """
+
+    def __init__(self, ruta_jsonl=None, ruta_metricas=None, intervalo_s=5.0):
+        self.ruta_jsonl = ruta_jsonl
+        self.ruta_metricas = ruta_metricas
+        self.intervalo_s = intervalo_s
+        self.activa = bool(ruta_jsonl or ruta_metricas)
+        self._archivo = None
+
+    def iniciar(self, results, pair_stats, engine_latency, agent_names, presupuesto, partidas,
+                num_workers):
+        """Empieza a medir; partidas son las ya jugadas (p. ej. al reanudar)"""
+        self.results = results
+        self.pair_stats = pair_stats
+        self.engine_latency = engine_latency
+        self.etiquetas = {table: etiqueta_mesa(table, agent_names) for table in pair_stats}
+        self.planificadas = {table: estadistica.partidas for table, estadistica in pair_stats.items()}
+        self.presupuesto = presupuesto
+        self.num_workers = num_workers
+
+        self.inicio = time.monotonic()
+        self.partidas = self.partidas_inicio = partidas
+        self.partidas_cache = 0
+        self.errores = Counter()
+        self.workers = {}
+        self._ultima_emision = (self.inicio, partidas)
+
+        if self.ruta_jsonl:
+            self._archivo = open(self.ruta_jsonl, 'a', encoding='utf-8')
+        self._evento({'evento': 'inicio', 'agentes': agent_names, 'mesas': list(self.etiquetas.values()),
+                      'presupuesto': presupuesto, 'partidas': partidas, 'num_workers': num_workers})
+
+    def planificar(self, ronda):
+        """Añade las partidas de una ronda (bloques (mesa, inicio, fin)) a las planificadas"""
+        for table, start, stop in ronda:
+            self.planificadas[table] += stop - start
+
+    def bloque(self, table, bloque):
+        """Registra un bloque ya fusionado (los de la caché no traen 'worker')"""
+        jugadas = len(bloque['games'])
+        self.partidas += jugadas
+        worker = bloque.get('worker')
+        if worker is None:
+            self.partidas_cache += jugadas
+        else:
+            estado = self.workers.setdefault(worker['pid'], {'bloques': 0})
+            estado.update(memoria_mb=worker['memoria_mb'], ultimo_bloque=time.monotonic(),
+                          bloques=estado['bloques'] + 1)
+
+        for error in bloque['errors']:
+            if isinstance(error, str):
+                # Bloques guardados en la caché antes de que los errores llevaran tipo
+                error = {'partida': None, 'tipo': 'desconocido', 'mensaje': error, 'traza': None}
+            self.errores[error['tipo']] += 1
+            self._evento({'evento': 'error', 'mesa': self.etiquetas[table], **error})
+
+        if time.monotonic() - self._ultima_emision[0] >= self.intervalo_s:
+            self.emitir()
+
+    def resumen(self, en_curso=None):
+        """Estado actual como dict (lo que se escribe en cada evento de progreso)"""
+        ahora = time.monotonic()
+        transcurrido = ahora - self.inicio
+        jugadas = self.partidas - self.partidas_inicio - self.partidas_cache
+        ritmo = jugadas / transcurrido if transcurrido > 0 else 0.0
+
+        t_anterior, partidas_anteriores = self._ultima_emision
+        ventana = ahora - t_anterior
+        reciente = (self.partidas - partidas_anteriores) / ventana if ventana > 0 else 0.0
+
+        restantes = max(self.presupuesto - self.partidas, 0)
+        ritmo_eta = reciente or ritmo
+        return {
+            'ts': time.time(),
+            'transcurrido_s': transcurrido,
+            'partidas': self.partidas,
+            'partidas_cache': self.partidas_cache,
+            'presupuesto': self.presupuesto,
+            'partidas_por_s': ritmo,
+            'partidas_por_s_reciente': reciente,
+            # Con parada temprana el presupuesto es un máximo: la ETA es una cota superior
+            'eta_s': restantes / ritmo_eta if ritmo_eta > 0 else None,
+            'mesas': [{'mesa': self.etiquetas[table], 'partidas': estadistica.partidas,
+                       'planificadas': self.planificadas[table], 'detenida': estadistica.detenida}
+                      for table, estadistica in self.pair_stats.items()],
+            'latencia_ms': {name: metrics['latency'].resumen_ms() for name, metrics in self.results.items()},
+            'motor_latencia_ms': self.engine_latency.resumen_ms(),
+            'errores': dict(self.errores),
+            'memoria_mb': memoria_mb(),
+            'workers': [{'pid': pid, 'bloques': estado['bloques'], 'memoria_mb': estado['memoria_mb'],
+                         's_desde_ultimo_bloque': ahora - estado['ultimo_bloque']}
+                        for pid, estado in sorted(self.workers.items())],
+            'bloques_en_curso': en_curso
+        }
+
+    def emitir(self, en_curso=None, evento='progreso'):
+        """Escribe un evento de progreso y reescribe las métricas"""
+        if not self.activa:
+            return
+        estado = self.resumen(en_curso)
+        self._ultima_emision = (time.monotonic(), self.partidas)
+        self._evento({'evento': evento, **estado})
+        if self.ruta_metricas:
+            _escribir_atomico(self.ruta_metricas, self.prometheus(estado))
+
+    def terminar(self):
+        self.emitir(evento='fin')
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def _evento(self, datos):
+        if self._archivo is None:
+            return
+        if 'ts' not in datos:
+            datos = {'ts': time.time(), **datos}
+        self._archivo.write(json.dumps(datos, ensure_ascii=False, default=str) + '\n')
+        self._archivo.flush()
+
+    @staticmethod
+    def prometheus(estado):
+        """Las cifras de un resumen en el formato de texto de Prometheus"""
+        lineas = []
+
+        def metrica(nombre, tipo, ayuda, valores):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            for etiquetas, valor in valores:
+                if valor is None:
+                    continue
+                texto = ','.join(f'{clave}="{_etiqueta(v)}"' for clave, v in etiquetas.items())
+                lineas.append(f"{nombre}{{{texto}}} {valor}" if texto else f"{nombre} {valor}")
+
+        metrica('uno_partidas_total', 'counter', 'Partidas jugadas (incluidas las de la caché)',
+                [({}, estado['partidas'])])
+        metrica('uno_partidas_cache_total', 'counter', 'Partidas reutilizadas de la caché',
+                [({}, estado['partidas_cache'])])
+        metrica('uno_presupuesto_partidas', 'gauge', 'Partidas planificadas como máximo',
+                [({}, estado['presupuesto'])])
+        metrica('uno_partidas_por_segundo', 'gauge', 'Partidas jugadas por segundo',
+                [({'ventana': 'total'}, estado['partidas_por_s']),
+                 ({'ventana': 'reciente'}, estado['partidas_por_s_reciente'])])
+        metrica('uno_eta_segundos', 'gauge', 'Tiempo estimado hasta agotar el presupuesto',
+                [({}, estado['eta_s'])])
+        metrica('uno_mesa_partidas', 'gauge', 'Partidas jugadas por mesa',
+                [({'mesa': m['mesa']}, m['partidas']) for m in estado['mesas']])
+        metrica('uno_mesa_planificadas', 'gauge', 'Partidas planificadas por mesa',
+                [({'mesa': m['mesa']}, m['planificadas']) for m in estado['mesas']])
+        metrica('uno_latencia_ms', 'gauge', 'Latencia por decisión (agentes) y por jugada (motor)',
+                [({'componente': nombre, 'quantile': q}, latencia[f'p{p}_ms'])
+                 for nombre, latencia in [*estado['latencia_ms'].items(), ('Motor', estado['motor_latencia_ms'])]
+                 for q, p in (('0.5', 50), ('0.95', 95), ('0.99', 99))])
+        metrica('uno_errores_total', 'counter', 'Partidas con error, por tipo de excepción',
+                [({'tipo': tipo}, n) for tipo, n in sorted(estado['errores'].items())])
+        metrica('uno_memoria_mb', 'gauge', 'Memoria residente del proceso principal',
+                [({}, estado['memoria_mb'])])
+        metrica('uno_worker_memoria_mb', 'gauge', 'Memoria residente de cada worker (último bloque)',
+                [({'pid': w['pid']}, w['memoria_mb']) for w in estado['workers']])
+        metrica('uno_worker_segundos_desde_ultimo_bloque', 'gauge',
+                'Segundos desde el último bloque terminado por cada worker',
+                [({'pid': w['pid']}, w['s_desde_ultimo_bloque']) for w in estado['workers']])
+        metrica('uno_bloques_en_curso', 'gauge', 'Bloques ejecutándose en el pool',
+                [({}, estado['bloques_en_curso'])])
+        return '\n'.join(lineas) + '\n'
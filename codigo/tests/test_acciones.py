@@ -0,0 +1,97 @@
+"""Prioridades por categoría de RuleBasedAgent y ProbabilisticAgent con estados fabricados"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+from rlcard.games.uno.utils import ACTION_LIST
+
+from simulador_uno.acciones import (CATEGORIAS, DRAW, DRAW2, NUMBER, REVERSE, SKIP, TABLA_UNO, WILD,
+                                    WILD_DRAW4)
+from simulador_uno.agentes import ProbabilisticAgent, RuleBasedAgent
+
+# Una acción de cada categoría
+ACCION = {
+    NUMBER: ACTION_LIST.index('r-5'),
+    SKIP: ACTION_LIST.index('g-skip'),
+    REVERSE: ACTION_LIST.index('b-reverse'),
+    DRAW2: ACTION_LIST.index('y-draw_2'),
+    WILD: ACTION_LIST.index('r-wild'),
+    WILD_DRAW4: ACTION_LIST.index('g-wild_draw_4'),
+    DRAW: ACTION_LIST.index('draw'),
+}
+TODAS = tuple(ACCION)
+
+
+def estado(categorias, cartas):
+    """Estado con una acción legal por categoría y una mano de `cartas` cartas"""
+    return {'legal_actions': OrderedDict((ACCION[c], None) for c in categorias),
+            'raw_obs': {'hand': ['r-1'] * cartas}}
+
+
+def elegidas(agente, state, repeticiones=200):
+    """Categorías que elige el agente para un estado en varias tiradas"""
+    np.random.seed(0)
+    return {int(TABLA_UNO.categoria[agente.step(state)]) for _ in range(repeticiones)}
+
+
+def test_tabla_clasifica_cada_categoria():
+    for categoria, accion in ACCION.items():
+        assert TABLA_UNO.categoria[accion] == categoria, CATEGORIAS[categoria]
+    assert TABLA_UNO.color[ACCION[DRAW]] == -1
+
+
+@pytest.mark.parametrize('legales, esperadas', [
+    (TODAS, {DRAW2, WILD_DRAW4}),
+    ((NUMBER, SKIP, REVERSE, WILD, DRAW), {SKIP, REVERSE}),
+    ((NUMBER, WILD, DRAW), {NUMBER, DRAW}),
+    ((WILD, DRAW), {DRAW}),
+    ((WILD,), {WILD}),
+])
+def test_reglas_ataca_con_mano_grande(legales, esperadas):
+    assert elegidas(RuleBasedAgent(61), estado(legales, 7)) == esperadas
+
+
+@pytest.mark.parametrize('legales, esperadas', [
+    (TODAS, {NUMBER, DRAW}),
+    ((SKIP, REVERSE, DRAW2, WILD_DRAW4, WILD), {DRAW2, WILD_DRAW4}),
+    ((SKIP, REVERSE, WILD), {SKIP, REVERSE}),
+])
+def test_reglas_numeros_primero_con_una_carta(legales, esperadas):
+    assert elegidas(RuleBasedAgent(61), estado(legales, 1)) == esperadas
+
+
+def test_reglas_robar_va_con_los_numeros():
+    prioridad = RuleBasedAgent.PRIORIDAD_ATAQUE
+    assert prioridad[DRAW] == prioridad[NUMBER]
+    assert RuleBasedAgent.PRIORIDAD_FINAL[DRAW] == RuleBasedAgent.PRIORIDAD_FINAL[NUMBER]
+
+
+def test_reglas_batch_step_respeta_las_prioridades():
+    agente = RuleBasedAgent(61)
+    mask = np.zeros((2, 61), dtype=bool)
+    mask[:, list(ACCION.values())] = True
+    np.random.seed(0)
+    acciones = agente.batch_step({'legal_mask': mask, 'hand_size': np.array([7, 1])})
+    assert TABLA_UNO.categoria[acciones[0]] in (DRAW2, WILD_DRAW4)
+    assert TABLA_UNO.categoria[acciones[1]] in (NUMBER, DRAW)
+
+
+@pytest.mark.parametrize('especial', [WILD, WILD_DRAW4, DRAW2])
+def test_probabilistico_reserva_especiales_para_el_final(especial):
+    """El peso relativo de comodines y +2/+4 frente a los números sube al final de la mano"""
+    temprano = ProbabilisticAgent.pesos_categoria(7)
+    final = ProbabilisticAgent.pesos_categoria(2)
+    assert final[especial] / final[NUMBER] > temprano[especial] / temprano[NUMBER]
+    assert temprano[especial] < temprano[NUMBER]
+
+
+def test_probabilistico_juega_mas_comodines_al_final():
+    def frecuencia_comodin(cartas):
+        agente = ProbabilisticAgent(61, seed=0)
+        state = estado((NUMBER, WILD, WILD_DRAW4), cartas)
+        jugadas = [TABLA_UNO.categoria[agente.step(state)] for _ in range(2000)]
+        return np.isin(jugadas, (WILD, WILD_DRAW4)).mean()
+
+    assert frecuencia_comodin(2) > 0.4
+    assert frecuencia_comodin(7) < 0.1
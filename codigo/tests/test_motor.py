@@ -0,0 +1,30 @@
+"""El motor nativo juega exactamente las mismas partidas que el env 'uno' de rlcard"""
+
+import pytest
+
+from simulador_uno.agentes import ProbabilisticAgent, RandomAgent, RuleBasedAgent
+from simulador_uno.benchmarks import comparar_con_rlcard
+from simulador_uno.evaluador import jugar_bloque
+from simulador_uno.motor import EntornoUNO
+from simulador_uno.partida import crear_entorno
+
+
+@pytest.mark.parametrize('num_players, seed', [(2, 0), (2, 1000), (4, 0), (4, 1000)])
+def test_mismos_estados_acciones_y_resultados(num_players, seed):
+    """Paso a paso: estados y acciones legales en cada jugada, ganador y cartas al final"""
+    assert comparar_con_rlcard(num_games=40, seed=seed, num_players=num_players) == []
+
+
+@pytest.mark.parametrize('num_players, duplicate', [(2, False), (2, True), (4, True)])
+def test_mismas_mesas_en_el_evaluador(num_players, duplicate):
+    """Un bloque de una mesa jugado con cada motor: mismos repartos, asientos, turnos y resultados"""
+    def jugar(env):
+        agents = [RandomAgent(61), RuleBasedAgent(61), ProbabilisticAgent(61, seed=0),
+                  RuleBasedAgent(61)][:num_players]
+        return jugar_bloque(env, agents, 7, tuple(range(num_players)), range(24), duplicate=duplicate)
+
+    rlcard = jugar(crear_entorno('uno', num_players))
+    nativo = jugar(EntornoUNO(num_players))
+    assert rlcard['errors'] == nativo['errors'] == []
+    for clave in ('games', 'deals', 'rotations', 'turns', 'payoffs'):
+        assert rlcard[clave] == nativo[clave], clave